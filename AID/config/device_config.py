@@ -1,10 +1,24 @@
 # config/device_config.py
-DEVICE_ID = ''  # 设备ID
+import os
+
+# 以 AID_ 开头的环境变量可覆盖设备和路径配置（CI / 多机部署时使用）
+DEVICE_ID = os.environ.get("AID_DEVICE_ID", '')  # 设备ID
+DEVICE_IDS = []  # 多设备并行（pytest -n auto）使用的设备列表，为空则自动发现已连接设备
 DATA_PATH = "/sdcard/DCIM/Camera"  # 保存路径
 CAMERA_APP_PACKAGE = "com.android.camera"  # 相机应用的包名
 CAMERA_APP_ACTIVITY = "com.android.camera/.Camera"  # 相机应用的Activity
-OUTPUT_PATH = "/home/***/AID/output" #测试结果问题照片文件路径
+OUTPUT_PATH = os.environ.get("AID_OUTPUT_PATH", "/home/***/AID/output") #测试结果问题照片文件路径
 REPORT_XLSX = "/home/***/AID/tests/test_report.xlsx" #测试报告
 REPORT_HTML = "/home/***/AID/tests/report.html" #测试报告html
-FAIL_DIR = "/home/***/AID/output/pic_fail" #测试失败图片收集
-REPORT_PATH = "/home/***/AID/report" #测试报告路径
+FAIL_DIR = os.environ.get("AID_FAIL_DIR", "/home/***/AID/output/pic_fail") #测试失败图片收集
+REPORT_PATH = os.environ.get("AID_REPORT_PATH", "/home/***/AID/report") #测试报告路径
+ANALYSIS_WORKERS = 1  # 图片分析进程数，0 表示使用全部 CPU 核心
+ANALYSIS_CACHE = False  # validate_and_collect 默认是否使用分析结果缓存
+ANALYSIS_CACHE_PATH = os.environ.get("AID_ANALYSIS_CACHE", "/home/***/AID/cache/analysis.sqlite")  # 分析结果缓存
+ANALYSIS_CACHE_MB = 512  # 分析结果缓存大小上限（MB），超出按 LRU 淘汰
+PRESCREEN = os.environ.get("AID_PRESCREEN", "") == "1"  # 压测照片先读 EXIF 缩略图预筛，只拉取可疑或抽样的原图
+PRESCREEN_SAMPLE_RATE = 0.05  # 预筛正常的照片中仍拉取原图做完整校验的比例
+CHECK_DUPLICATE = os.environ.get("AID_CHECK_DUPLICATE", "") == "1"  # 压测检查相邻照片是否为重复帧（阈值需先用真机样本校准）
+WARM_CAMERA = True  # 相机处于基线状态时热启动（不 force-stop），会话内复用同一个 UIAutomatorHelper
+UI_LOG_FILE = True  # UIAutomatorHelper 是否把日志写到 logs/uiautomator.log
+TRACE = os.environ.get("AID_TRACE", "") == "1"  # 阶段埋点：每条 case 导出 Chrome trace，报告增加 Stages 列
@@ -1,19 +1,12 @@
 import pytest
 import time,logging
-from utils.uiautomator_helper import UIAutomatorHelper
 from utils.opencv_utils import OpenCVUtils
 from utils.report_utils import SimpleReport
-from config.device_config import DEVICE_ID, OUTPUT_PATH
+from config.device_config import OUTPUT_PATH
 
 logger = logging.getLogger(__name__)
 loops = 1
 
-@pytest.fixture
-def setup_device():
-    ui = UIAutomatorHelper(DEVICE_ID)
-    yield ui
-    ui.back_to_home()
-
 def test_record_video(setup_device):
     """录制并校验"""
     report = SimpleReport()
@@ -31,7 +24,7 @@ def test_record_video(setup_device):
     assert len(local_photos) > 0
 
     # report
-    result, comments = OpenCVUtils.validate_and_collect(OUTPUT_PATH, check_video=True)
+    result, comments = OpenCVUtils.validate_and_collect(OUTPUT_PATH, check_video=True, video_mode="basic")
     report.add_result(case_name, loops, result, comments)
     if result == "FAIL":
         raise AssertionError(comments)
\ No newline at end of file
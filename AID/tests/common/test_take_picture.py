@@ -1,19 +1,12 @@
 import pytest
 import time,logging
-from utils.uiautomator_helper import UIAutomatorHelper
 from utils.opencv_utils import OpenCVUtils
 from utils.report_utils import SimpleReport
-from config.device_config import DEVICE_ID, OUTPUT_PATH
+from config.device_config import OUTPUT_PATH
 
 logger = logging.getLogger(__name__)
 loops = 1
 
-@pytest.fixture
-def setup_device():
-    ui = UIAutomatorHelper(DEVICE_ID)
-    yield ui
-    ui.back_to_home()
-
 def test_take_picture(setup_device):
     """拍照并校验"""
     report = SimpleReport()
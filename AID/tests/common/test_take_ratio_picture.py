@@ -1,29 +1,25 @@
+import os
 import pytest
 import time,logging
-from utils.uiautomator_helper import UIAutomatorHelper
 from utils.opencv_utils import OpenCVUtils
 from utils.report_utils import SimpleReport
-from config.device_config import DEVICE_ID, OUTPUT_PATH
+from utils import jpeg_meta
+from config.device_config import OUTPUT_PATH
 
 logger = logging.getLogger(__name__)
 loops = 1
 RATIO_LEVELS = ["1:1", "3:4", "9:16", "full"]
 
-@pytest.fixture
-def setup_device():
-    ui = UIAutomatorHelper(DEVICE_ID)
-    yield ui
-    ui.back_to_home()
-
 def test_take_ratio_picture(setup_device):
     """拍照并校验"""
     report = SimpleReport()
     case_name = "test_take_ratio_picture"
     ui = setup_device
     ui.open_camera()
+    shots = []
     for ratio in RATIO_LEVELS:
         ui.set_ratio(ratio)
-        ui.take_picture(loops)
+        shots += [(ratio, remote) for remote in ui.take_picture(loops)]
     ui.set_ratio()
 
     # 自动拉取照片
@@ -31,8 +27,21 @@ def test_take_ratio_picture(setup_device):
     logger.info(f"已拉取照片: {local_photos}")
     assert len(local_photos) > 0
 
+    # 画幅校验只读 JPEG 头，需在 validate_and_collect 移动失败图片之前完成
+    ratio_failures = []
+    for ratio, remote in shots:
+        path = os.path.join(OUTPUT_PATH, os.path.basename(remote))
+        if os.path.exists(path):
+            ratio_failures.append(jpeg_meta.check_aspect(path, ratio))
+        else:
+            ratio_failures.append(f"RATIO FAIL ({ratio}): {remote} 未拉取到本地")
+
     # report
     result, comments = OpenCVUtils.validate_and_collect(OUTPUT_PATH, check_3a=False, check_abnormal=True)
+    ratio_failures = [f for f in ratio_failures if f]
+    if ratio_failures:
+        result = "FAIL"
+        comments = ";".join(filter(None, [comments] + ratio_failures))
     report.add_result(case_name, loops, result, comments)
     if result == "FAIL":
         raise AssertionError(comments)
\ No newline at end of file
@@ -1,37 +1,51 @@
+import os
 import pytest
 import time,logging
-from utils.uiautomator_helper import UIAutomatorHelper
 from utils.opencv_utils import OpenCVUtils
 from utils.report_utils import SimpleReport
-from config.device_config import DEVICE_ID, OUTPUT_PATH
+from utils import jpeg_meta
+from config.device_config import OUTPUT_PATH
 
 logger = logging.getLogger(__name__)
 loops = 1
 ZOOM_LEVELS = [0.7, 1.0, 2.0, 5.0, 10.0]
 
-@pytest.fixture
-def setup_device():
-    ui = UIAutomatorHelper(DEVICE_ID)
-    yield ui
-    ui.back_to_home()
-
 def test_take_zoom_picture(setup_device):
     """拍照并校验"""
     report = SimpleReport()
     case_name = "test_take_zoom_picture"
     ui = setup_device
     ui.open_camera()
+    shots = []
     for zoom in ZOOM_LEVELS:
         ui.set_zoom(zoom)
-        ui.take_picture(loops)
+        shots += [(zoom, remote) for remote in ui.take_picture(loops)]
 
     # 自动拉取照片
     local_photos = ui.pull_all_photo()
     logger.info(f"已拉取照片: {local_photos}")
     assert len(local_photos) > 0
 
+    # 倍率校验只读 JPEG 头，以 1.0x 照片为基准，需在 validate_and_collect 移动失败图片之前完成
+    metas, zoom_failures = [], []
+    for zoom, remote in shots:
+        path = os.path.join(OUTPUT_PATH, os.path.basename(remote))
+        if os.path.exists(path):
+            metas.append((zoom, path, jpeg_meta.read_meta(path)))
+        else:
+            zoom_failures.append(f"ZOOM FAIL ({zoom}x): {remote} 未拉取到本地")
+    base = next((meta for zoom, _, meta in metas if zoom == 1.0), None)
+    if base is None:
+        zoom_failures.append("ZOOM FAIL: 没有 1.0x 基准照片")
+    else:
+        zoom_failures += [jpeg_meta.check_zoom(path, zoom, base, meta) for zoom, path, meta in metas]
+
     # report
     result, comments = OpenCVUtils.validate_and_collect(OUTPUT_PATH, check_3a=False, check_abnormal=True)
+    zoom_failures = [f for f in zoom_failures if f]
+    if zoom_failures:
+        result = "FAIL"
+        comments = ";".join(filter(None, [comments] + zoom_failures))
     report.add_result(case_name, loops, result, comments)
     if result == "FAIL":
         raise AssertionError(comments)
\ No newline at end of file
@@ -1,21 +1,94 @@
 # tests/conftest.py
 import pytest
 import os
+import re
 import logging
+from datetime import datetime
 from utils.adb_utils import AdbUtils
-from config.device_config import DATA_PATH, DEVICE_ID, OUTPUT_PATH, REPORT_XLSX, REPORT_HTML, FAIL_DIR
+from utils.report_utils import SimpleReport
+from utils import device_pool
+from utils import trace
+from utils.image_hash import DuplicateDetector
+from config import device_config
+from config.device_config import DATA_PATH
 
 logger = logging.getLogger("conftest")
 
+# 多设备并行（pytest-xdist）时各 worker 共用的运行 ID，用于归集各 worker 的报告
+RUN_ID = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config):
+    """pytest -n auto 时每台设备一个 worker"""
+    return len(device_pool.resolve_devices())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """controller 把运行 ID 下发给各 worker"""
+    node.workerinput["aid_run_id"] = RUN_ID
+
+
+def pytest_configure(config):
+    """xdist worker 启动时绑定设备并隔离 OUTPUT_PATH / FAIL_DIR / 报告目录"""
+    trace.enable(device_config.TRACE)
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is None:
+        return
+
+    worker_id = workerinput["workerid"]
+    devices = device_pool.resolve_devices()
+    index = device_pool.worker_index(worker_id)
+    if index >= len(devices):
+        raise pytest.UsageError(f"worker 数量超过设备数量 ({len(devices)}): {devices}")
+    device_pool.apply_worker_config(worker_id, devices[index], workerinput.get("aid_run_id"))
+
+@pytest.fixture(scope="session")
+def adb_session():
+    """整个测试会话共用一个常驻 adb shell 连接"""
+    adb = AdbUtils(device_id=device_config.DEVICE_ID, persistent=True)
+    yield adb
+    adb.close()
+
+
+@pytest.fixture(scope="session")
+def ui_session():
+    """整个测试会话共用的 UIAutomatorHelper（uiautomator2 连接 + 常驻 adb shell），会话结束时回到主屏"""
+    yield device_pool.get_helper(device_config.DEVICE_ID)
+    device_pool.release_helpers()
+
+
+@pytest.fixture
+def setup_device(ui_session):
+    """用例使用会话级设备连接；相机保持在前台，下一条用例的 open_camera 按基线状态决定热启动或冷启动"""
+    ui_session.use_prescreen(False)
+    return ui_session
+
+
+@pytest.fixture(scope="session")
+def duplicate_detector():
+    """整个测试会话共用的重复帧检测，case 之间相邻的两张照片也会比对"""
+    return DuplicateDetector()
+
+
 @pytest.fixture(autouse=True, scope="function")
-def clear_camera_files():
-    """每条 case 执行前：保持亮屏 + 清理相机目录"""
-    adb = AdbUtils(device_id=DEVICE_ID)  # 可以改成读取环境变量
-    adb.shell("root")
-    adb.shell("remount")
+def trace_case(request):
+    """AID_TRACE=1 时记录每条 case 的阶段时间线，导出到 REPORT_PATH/trace/<case>.json"""
+    if not trace.enabled():
+        yield
+        return
+    trace.begin(request.node.nodeid)
+    yield
+    name = re.sub(r"[^\w.-]+", "_", request.node.nodeid)
+    trace.end(os.path.join(device_config.REPORT_PATH, "trace", name + ".json"))
 
-    # 设置充电时保持亮屏
-    adb.keep_screen_on_while_charging(True)
+
+@pytest.fixture(autouse=True, scope="function")
+def clear_camera_files(adb_session):
+    """每条 case 执行前：清理相机目录；root/remount/保持亮屏每个会话只做一次"""
+    adb = adb_session
+    device_pool.prepare_device(adb)
 
     # 清理手机端和本地端的jpg/mp4
     adb.clear_media_files(remote_dir=DATA_PATH)
@@ -26,16 +99,26 @@ def pytest_sessionstart(session):
     # 清理失败图片目录
     try:
         # 清理手机端和本地端的jpg/mp4
-        adb = AdbUtils(device_id=DEVICE_ID)
-        adb.clear_media_files(local_dir=OUTPUT_PATH)
-        if os.path.exists(FAIL_DIR):
-            for filename in os.listdir(FAIL_DIR):
+        fail_dir = device_config.FAIL_DIR
+        adb = AdbUtils(device_id=device_config.DEVICE_ID)
+        adb.clear_media_files(local_dir=device_config.OUTPUT_PATH)
+        if os.path.exists(fail_dir):
+            for filename in os.listdir(fail_dir):
                 if filename.lower().endswith((".jpg", ".mp4")):
-                    file_path = os.path.join(FAIL_DIR, filename)
+                    file_path = os.path.join(fail_dir, filename)
                     try:
                         os.remove(file_path)
                         logger.info(f"[pytest] 已删除旧的失败文件: {file_path}")
                     except Exception as e:
                         logger.warning(f"[pytest] 删除 {file_path} 失败: {e}")
     except Exception as e:
-        logger.warning(f"[pytest] 清理 {FAIL_DIR} 失败: {e}")
\ No newline at end of file
+        logger.warning(f"[pytest] 清理 {device_config.FAIL_DIR} 失败: {e}")
+
+def pytest_sessionfinish(session, exitstatus):
+    """pytest 结束时把结果日志渲染成 Excel 报告；多设备并行时由 controller 合并各 worker 的报告"""
+    SimpleReport.close()
+    if getattr(session.config, "workerinput", None) is None and session.config.getoption("dist", "no") != "no":
+        device_pool.merge_reports(
+            os.path.join(device_config.REPORT_PATH, f"run_{RUN_ID}"),
+            os.path.join(device_config.REPORT_PATH, f"test_report_{RUN_ID}_merged.xlsx")
+        )
@@ -0,0 +1,25 @@
+# tests/perf/test_camera_perf.py
+import pytest
+import logging
+from utils.perf_metrics import CameraPerfSuite
+from utils.report_utils import SimpleReport
+
+logger = logging.getLogger(__name__)
+runs = 10
+video_runs = 5
+
+def test_camera_perf(setup_device):
+    """启动耗时、快门到落盘、录像开始/停止延迟，按 build 保存并与上一个 build 对比"""
+    report = SimpleReport()
+    ui = setup_device
+    suite = CameraPerfSuite(ui)
+    suite.measure_launch(runs)
+    suite.measure_shot_latency(runs)
+    ui.switch_video_mode()
+    suite.measure_video_latency(video_runs)
+    ui.switch_camera_mode()
+
+    regressions = suite.publish(report)
+    logger.info(f"性能统计: {suite.summary()}")
+    if regressions:
+        raise AssertionError(";".join(regressions))
@@ -1,3 +1,5 @@
 #!/bin/bash
 REPORT_HTML="/home/***/AID/report/report.html"
-pytest -s -v --html="$REPORT_HTML" --self-contained-html
\ No newline at end of file
+pytest -s -v --html="$REPORT_HTML" --self-contained-html "$@"
+# 多设备并行：每台已连接设备一个 worker，报告自动合并
+# ./setup.sh -n auto
\ No newline at end of file
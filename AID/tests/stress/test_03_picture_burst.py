@@ -0,0 +1,41 @@
+# tests/test_03_picture_burst.py
+import pytest
+import time,logging
+from utils.opencv_utils import OpenCVUtils
+from utils.report_utils import SimpleReport
+from config.device_config import OUTPUT_PATH, PRESCREEN, CHECK_DUPLICATE
+
+logger = logging.getLogger(__name__)
+loops = 20
+interval = 0.5  # 连拍间隔（秒），None 为批量注入
+
+@pytest.fixture
+def setup_device(ui_session):
+    ui_session.use_prescreen(PRESCREEN)
+    return ui_session
+
+def test_03_picture_burst(setup_device, duplicate_detector):
+    """坐标连拍并校验"""
+    report = SimpleReport()
+    case_name = "test_03_picture_burst"
+    ui = setup_device
+    ui.open_camera()
+    ui.burst_shots(loops, interval=interval)
+    logger.info(f"拍摄间隔统计: {ui.last_burst_stats}")
+    # 自动拉取照片
+    local_photos = ui.pull_all_photo()
+    saved = ui.media_sync.captured("jpg")
+    logger.info(f"已拉取照片: {len(local_photos)}/{saved} 张, 传输统计: {ui.media_sync.transfer}")
+    assert saved > 0
+
+    # report（预筛模式下可能没有需要拉取原图的照片）
+    result, comments = "PASS", ""
+    if local_photos:
+        result, comments = OpenCVUtils.validate_and_collect(OUTPUT_PATH, check_3a=False, check_abnormal=True,
+                                                            check_duplicate=CHECK_DUPLICATE, duplicate_detector=duplicate_detector)
+    if saved < loops:
+        result = "FAIL"
+        comments = ";".join(filter(None, [comments, f"SHOT FAIL: {saved}/{loops} photos saved"]))
+    report.add_result(case_name, loops, result, comments)
+    if result == "FAIL":
+        raise AssertionError(comments)
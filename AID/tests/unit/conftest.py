@@ -0,0 +1,137 @@
+# tests/unit/conftest.py
+import os
+import struct
+import pytest
+import cv2
+import numpy as np
+from config import device_config
+from tools.fakes import fake_adb as fake_adb_module
+
+
+@pytest.fixture(autouse=True, scope="function")
+def clear_camera_files():
+    """单元测试不连接设备，覆盖上层的设备清理 fixture"""
+    yield
+
+
+@pytest.fixture(autouse=True)
+def no_ui_log_file(monkeypatch):
+    """单元测试构造 UIAutomatorHelper 时不在工作目录下生成 logs/uiautomator.log"""
+    monkeypatch.setattr(device_config, "UI_LOG_FILE", False)
+
+
+def write_jpg(path, bgr=(128, 128, 128), size=(240, 320), noise=40, seed=0):
+    """生成一张纯色 + 随机纹理的测试图片"""
+    rng = np.random.default_rng(seed)
+    img = np.empty((size[0], size[1], 3), dtype=np.float32)
+    img[:] = bgr
+    img += rng.normal(0, noise, img.shape) if noise else 0
+    cv2.imwrite(str(path), np.clip(img, 0, 255).astype(np.uint8))
+    return str(path)
+
+
+_TIFF_FORMATS = {2: "s", 3: "H", 4: "I", 5: "I"}
+
+
+def _tiff_ifd(entries, offset, next_ifd=0):
+    """按 TIFF 规则编码一个 IFD：entries 为 [(tag, 类型, 值)]，offset 为该 IFD 在 TIFF 中的偏移"""
+    table_size = 2 + 12 * len(entries) + 4
+    table, data = struct.pack("<H", len(entries)), b""
+    for tag, typ, value in sorted(entries):
+        if typ == 2:
+            raw = value.encode() + b"\0"
+            count = len(raw)
+        else:
+            values = value if isinstance(value, (list, tuple)) else [value]
+            if typ == 5:
+                values = [v for pair in values for v in pair]
+            count = len(values) // 2 if typ == 5 else len(values)
+            raw = struct.pack("<" + _TIFF_FORMATS[typ] * len(values), *values)
+        if len(raw) <= 4:
+            table += struct.pack("<HHI", tag, typ, count) + raw.ljust(4, b"\0")
+        else:
+            table += struct.pack("<HHII", tag, typ, count, offset + table_size + len(data))
+            data += raw + b"\0" * (len(raw) % 2)
+    return table + struct.pack("<I", next_ifd) + data
+
+
+def write_exif_jpg(path, bgr=(128, 128, 128), size=(240, 320), noise=40, seed=0, thumb_bgr=None,
+                   ifd0=(), exif=()):
+    """
+    生成带 EXIF 的测试图片：IFD1 嵌入 160x120 JPEG 缩略图
+    :param thumb_bgr: 缩略图颜色，默认与原图一致（用于构造缩略图与原图不符的情况）
+    :param ifd0: 额外的 IFD0 条目 [(tag, 类型, 值)]
+    :param exif: Exif 子 IFD 条目 [(tag, 类型, 值)]
+    """
+    write_jpg(path, bgr, size, noise, seed)
+    with open(path, "rb") as fp:
+        body = fp.read()
+    small = np.full((120, 160, 3), thumb_bgr or bgr, dtype=np.uint8)
+    thumb = cv2.imencode(".jpg", small)[1].tobytes()
+
+    def layout(offsets):
+        exif_at, ifd1_at, thumb_at = offsets
+        entries0 = list(ifd0) + ([(0x8769, 4, exif_at)] if exif else [])
+        blocks = [_tiff_ifd(entries0, 8, ifd1_at)]
+        if exif:
+            blocks.append(_tiff_ifd(list(exif), exif_at))
+        blocks.append(_tiff_ifd([(0x0103, 3, 6), (0x0201, 4, thumb_at), (0x0202, 4, len(thumb))], ifd1_at))
+        return blocks
+
+    # IFD 长度与偏移值无关：先用占位偏移算出各块长度，再按实际偏移重新编码
+    blocks = layout((1, 1, 1))
+    exif_at = 8 + len(blocks[0])
+    ifd1_at = exif_at + (len(blocks[1]) if exif else 0)
+    thumb_at = ifd1_at + len(blocks[-1])
+    tiff = b"II*\0" + struct.pack("<I", 8) + b"".join(layout((exif_at, ifd1_at, thumb_at))) + thumb
+
+    app1 = b"Exif\0\0" + tiff
+    with open(path, "wb") as fp:
+        fp.write(body[:2] + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + body[2:])
+    return str(path)
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    """包含正常图、黑图、绿图的目录"""
+    d = tmp_path / "output"
+    d.mkdir()
+    write_jpg(d / "IMG_001.jpg", seed=1)
+    write_jpg(d / "IMG_002.jpg", bgr=(5, 5, 5), noise=0)
+    write_jpg(d / "IMG_003.jpg", bgr=(40, 200, 40), seed=3)
+    write_jpg(d / "IMG_004.jpg", seed=4)
+    return d
+
+
+class FakeAdb:
+    """fake adb 句柄：device_path() 定位模拟设备上的文件，calls() 返回调用记录"""
+
+    def __init__(self, root, log):
+        self.root = root
+        self.log = log
+
+    def device_path(self, remote):
+        path = os.path.join(self.root, remote.lstrip("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def calls(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log, encoding="utf-8") as fp:
+            return fp.read().splitlines()
+
+
+@pytest.fixture
+def fake_adb(tmp_path, monkeypatch):
+    """在 PATH 最前面放一个 fake adb 可执行文件"""
+    bin_dir = tmp_path / "bin"
+    fake_adb_module.install(str(bin_dir))
+
+    root = tmp_path / "device"
+    root.mkdir()
+    log = tmp_path / "adb_calls.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_ADB_ROOT", str(root))
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log))
+    return FakeAdb(str(root), str(log))
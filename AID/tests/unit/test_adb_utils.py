@@ -0,0 +1,92 @@
+# tests/unit/test_adb_utils.py
+import pytest
+from utils.adb_utils import AdbUtils
+
+DATA_PATH = "/sdcard/DCIM/Camera"
+
+
+def _make_remote(fake_adb, count, ext="jpg", size=1024):
+    paths = []
+    for i in range(count):
+        remote = f"{DATA_PATH}/IMG_{i:03d}.{ext}"
+        with open(fake_adb.device_path(remote), "wb") as fp:
+            fp.write(bytes([i % 256]) * size)
+        paths.append(remote)
+    return paths
+
+
+def test_pull_all_file_uses_one_adb_pull(fake_adb, tmp_path):
+    _make_remote(fake_adb, 30)
+    _make_remote(fake_adb, 2, ext="mp4")
+    adb = AdbUtils("emulator-5554")
+
+    local_files = adb.pull_all_file(DATA_PATH, "jpg", str(tmp_path / "out"))
+
+    assert len(local_files) == 30
+    pulls = [c for c in fake_adb.calls() if " pull " in f" {c} "]
+    assert len(pulls) == 1
+    stats = adb.last_pull_stats
+    assert stats["files"] == 30 and stats["bytes"] == 30 * 1024 and stats["processes"] == 1
+    assert len(stats["per_file"]) == 30 and stats["bytes_per_sec"] > 0
+
+
+def test_pull_files_splits_large_batches(fake_adb, tmp_path):
+    remote = _make_remote(fake_adb, 5)
+    adb = AdbUtils("emulator-5554")
+    local_files = adb.pull_files(remote, str(tmp_path / "out"), batch_size=2)
+    assert [p.rsplit("/", 1)[1] for p in local_files] == [r.rsplit("/", 1)[1] for r in remote]
+    assert adb.last_pull_stats["processes"] == 3
+
+
+def test_pull_one_by_one_without_serial(fake_adb, tmp_path):
+    _make_remote(fake_adb, 2)
+    local_files = AdbUtils("").pull_all_file(DATA_PATH, "jpg", str(tmp_path / "out dir"), batch=False)
+    assert [p.rsplit("/", 1)[1] for p in local_files] == ["IMG_000.jpg", "IMG_001.jpg"]
+    assert len([c for c in fake_adb.calls() if c.startswith("pull ")]) == 2
+
+
+def test_pull_all_file_raises_when_empty(fake_adb, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        AdbUtils("").pull_all_file(DATA_PATH, "jpg", str(tmp_path / "out"))
+
+
+def test_persistent_shell_reuses_one_process(fake_adb):
+    _make_remote(fake_adb, 3)
+    adb = AdbUtils("emulator-5554", persistent=True)
+    try:
+        assert adb.shell("echo hello") == (0, "hello")
+        missing = adb.shell("ls /sdcard/none/*.jpg")
+        assert missing.code == 1 and "No such file" in missing.output
+        assert len(adb.list_files(DATA_PATH, "jpg")) == 3
+        adb.keep_screen_on_while_charging(True)
+        adb.clear_media_files(remote_dir=DATA_PATH)
+        assert adb.list_files(DATA_PATH, "jpg") == []
+    finally:
+        adb.close()
+
+    assert fake_adb.calls() == ["-s emulator-5554 shell"]
+
+
+def test_stopping_pipelined_shell_early_keeps_session_in_sync(fake_adb):
+    adb = AdbUtils("emulator-5554", persistent=True)
+    try:
+        for result in adb.iter_shell([f"echo {i}" for i in range(5)]):
+            assert result.output == "0"
+            break
+        assert adb.shell("echo after") == (0, "after")
+
+        with pytest.raises(RuntimeError):
+            for result in adb.iter_shell(["echo a", "echo b", "echo c"]):
+                raise RuntimeError(result.output)
+        assert adb.shell_many(["echo x", "echo y"]) == [(0, "x"), (0, "y")]
+    finally:
+        adb.close()
+
+    assert fake_adb.calls() == ["-s emulator-5554 shell"]
+
+
+def test_shell_captures_exit_code_without_session(fake_adb):
+    adb = AdbUtils("emulator-5554")
+    assert adb.shell("echo hi").ok
+    assert adb.shell("no_such_cmd").code == 127
+    assert len(fake_adb.calls()) == 2
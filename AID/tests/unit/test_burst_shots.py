@@ -0,0 +1,57 @@
+# tests/unit/test_burst_shots.py
+import pytest
+from tools.fakes.fake_device import FakeCameraDevice
+from utils import trace, uiautomator_helper
+from utils.uiautomator_helper import UIAutomatorHelper
+
+
+class FakeClock:
+    """替换 uiautomator_helper 的 time：sleep 只推进时钟并记录，间隔断言与调度器无关"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+@pytest.fixture
+def ui(fake_adb):
+    helper = UIAutomatorHelper(device=FakeCameraDevice())
+    yield helper
+    helper.adb.close()
+
+
+def test_batched_burst_resolves_shutter_once(ui, fake_adb):
+    records = ui.burst_shots(10)
+
+    assert [r["shot"] for r in records] == list(range(1, 11))
+    assert all(r["acked"] >= r["sent"] for r in records)
+    assert ui.ui.dumps == 1
+    # 一个常驻 shell 进程完成全部点击
+    assert fake_adb.calls() == ["-s fake-device shell"]
+    assert ui.last_burst_stats["shots"] == 10
+
+
+def test_fixed_interval_burst(ui, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(uiautomator_helper, "time", clock)
+    monkeypatch.setattr(trace, "sleep", clock.sleep)
+
+    records = ui.burst_shots(4, interval=0.05)
+    gaps = [round(b["sent"] - a["sent"], 6) for a, b in zip(records, records[1:])]
+    assert gaps == [0.05] * 3
+    assert clock.sleeps == [0.05] * 3
+    assert ui.last_burst_stats["min"] == pytest.approx(0.05)
+
+
+def test_u2_method_clicks_cached_coordinates(ui):
+    ui.burst_shots(3, interval=0, method="u2")
+    assert [n["resource-id"] for n in ui.device.taps] == ["com.android.camera:id/snap_layout"] * 3
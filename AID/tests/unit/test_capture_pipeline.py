@@ -0,0 +1,43 @@
+# tests/unit/test_capture_pipeline.py
+import shutil
+import time
+from utils.adb_utils import AdbUtils
+from utils.capture_pipeline import CapturePipeline
+from utils.media_sync import MediaSync
+from utils.opencv_utils import OpenCVUtils
+
+DATA_PATH = "/sdcard/DCIM/Camera"
+
+
+class FakeCameraUI:
+    """每次 take_picture 把一张样张"拍"到 fake adb 的相册目录"""
+
+    def __init__(self, fake_adb, samples, local_dir, shot_delay=0.05):
+        self.fake_adb = fake_adb
+        self.samples = list(samples)
+        self.shot_delay = shot_delay
+        self.media_sync = MediaSync(AdbUtils("emulator-5554"), DATA_PATH, local_dir)
+
+    def take_picture(self, loops):
+        landed = []
+        for _ in range(loops):
+            time.sleep(self.shot_delay)
+            src = self.samples.pop(0)
+            remote = f"{DATA_PATH}/{src.name}"
+            shutil.copyfile(src, self.fake_adb.device_path(remote))
+            landed.append(remote)
+        return landed
+
+
+def test_pipeline_matches_validate_and_collect(fake_adb, media_dir, tmp_path):
+    samples = sorted(media_dir.glob("*.jpg"))
+    ui = FakeCameraUI(fake_adb, samples, str(tmp_path / "out"))
+
+    pipeline = CapturePipeline(ui, workers=2, fail_dir=str(tmp_path / "fail"))
+    result = pipeline.run(len(samples))
+
+    expected = OpenCVUtils.validate_and_collect(str(media_dir), fail_dir=str(tmp_path / "fail2"))
+    normalize = lambda r: (r[0], r[1].replace(str(tmp_path / "fail2"), str(tmp_path / "fail")))
+    assert result == normalize(expected)
+    assert pipeline.stats["analysed"] == len(samples)
+    assert pipeline.stats["capture_seconds"] > 0
@@ -0,0 +1,73 @@
+# tests/unit/test_capture_waiter.py
+import pytest
+from utils.capture_waiter import CaptureWaiter
+
+
+class SimulatedDir:
+    """模拟相册目录：events 为 (出现时间, 路径, [(时间, 大小), ...])，配合虚拟时钟使用"""
+
+    def __init__(self, events):
+        self.events = events
+        self.now = 0.0
+        self.polls = 0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def lister(self, extension):
+        self.polls += 1
+        files = {}
+        for path, sizes in self.events:
+            if not path.endswith(f".{extension}"):
+                continue
+            current = [size for t, size in sizes if t <= self.now]
+            if current:
+                files[path] = current[-1]
+        return files
+
+    def waiter(self):
+        return CaptureWaiter(None, "/sdcard/DCIM/Camera", lister=self.lister, clock=self.clock, sleep=self.sleep)
+
+
+def test_returns_once_new_file_is_finalized():
+    sim = SimulatedDir([
+        ("/sdcard/DCIM/Camera/old.jpg", [(0, 100)]),
+        ("/sdcard/DCIM/Camera/IMG_1.jpg", [(0.5, 10), (0.9, 5000), (1.3, 9000)]),
+    ])
+    waiter = sim.waiter()
+    waiter.snapshot(("jpg",))
+
+    assert waiter.wait_for_new(1) == ["/sdcard/DCIM/Camera/IMG_1.jpg"]
+    # 最后一次增长在 1.3s，稳定判定应在其后不久完成
+    assert 1.3 < sim.now < 4
+
+
+def test_waits_for_expected_count_and_ignores_other_extensions():
+    sim = SimulatedDir([
+        ("/sdcard/DCIM/Camera/VID_1.mp4", [(0.1, 10)]),
+        ("/sdcard/DCIM/Camera/IMG_1.jpg", [(0.2, 10)]),
+        ("/sdcard/DCIM/Camera/IMG_2.jpg", [(3.0, 10)]),
+    ])
+    waiter = sim.waiter()
+    waiter.snapshot(("jpg",))
+    assert len(waiter.wait_for_new(2)) == 2
+    assert sim.now >= 3.0
+
+
+def test_timeout_raises():
+    sim = SimulatedDir([])
+    waiter = sim.waiter()
+    waiter.snapshot()
+    with pytest.raises(TimeoutError):
+        waiter.wait_for_new(1, timeout=5)
+    assert sim.now == pytest.approx(5)
+    # 退避后轮询次数远少于固定 0.2s 间隔
+    assert sim.polls < 25
+
+
+def test_wait_stable():
+    sim = SimulatedDir([("/sdcard/DCIM/Camera/VID_1.mp4", [(0, 10), (0.15, 15), (0.35, 20)])])
+    assert sim.waiter().wait_stable(("mp4",)) == {"/sdcard/DCIM/Camera/VID_1.mp4": 20}
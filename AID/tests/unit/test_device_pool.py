@@ -0,0 +1,56 @@
+# tests/unit/test_device_pool.py
+import os
+import subprocess
+import sys
+from glob import glob
+
+from openpyxl import load_workbook
+from config import device_config
+from utils import device_pool
+
+TESTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_list_devices_parses_adb_output(fake_adb, monkeypatch):
+    monkeypatch.delenv(device_pool.FAKE_DEVICES_ENV, raising=False)
+    monkeypatch.setenv("FAKE_ADB_DEVICES", "emu-1,192.168.1.5:5555")
+    assert device_pool.list_devices() == ["emu-1", "192.168.1.5:5555"]
+
+    monkeypatch.setenv(device_pool.FAKE_DEVICES_ENV, "a, b")
+    assert device_pool.list_devices() == ["a", "b"]
+
+
+def test_apply_worker_config_isolates_paths(monkeypatch, tmp_path):
+    for name in ("DEVICE_ID", "OUTPUT_PATH", "FAIL_DIR", "REPORT_PATH"):
+        monkeypatch.setattr(device_config, name, getattr(device_config, name))
+    monkeypatch.setattr(device_config, "OUTPUT_PATH", str(tmp_path / "output"))
+    monkeypatch.setattr(device_config, "REPORT_PATH", str(tmp_path / "report"))
+
+    out = device_pool.apply_worker_config("gw1", "192.168.1.5:5555", "r1")
+    assert device_config.DEVICE_ID == "192.168.1.5:5555"
+    assert out == str(tmp_path / "output" / "gw1_192.168.1.5_5555")
+    assert device_config.FAIL_DIR == os.path.join(out, "pic_fail")
+    assert device_config.REPORT_PATH == str(tmp_path / "report" / "run_r1" / "gw1_192.168.1.5_5555")
+
+
+def test_xdist_fans_out_one_worker_per_fake_device(fake_adb, tmp_path):
+    env = dict(os.environ,
+               AID_FAKE_DEVICES="emu-1,emu-2",
+               AID_OUTPUT_PATH=str(tmp_path / "output"),
+               AID_FAIL_DIR=str(tmp_path / "output" / "pic_fail"),
+               AID_REPORT_PATH=str(tmp_path / "report"))
+    proc = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-n", "auto", "-p", "no:cacheprovider",
+         os.path.join("unit", "xdist_probe.py")],
+        cwd=TESTS_DIR, env=env, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "4 passed" in proc.stdout
+
+    run_dirs = glob(str(tmp_path / "report" / "run_*"))
+    assert len(run_dirs) == 1
+    assert sorted(d for d in os.listdir(run_dirs[0]) if d.startswith("gw")) == ["gw0_emu-1", "gw1_emu-2"]
+    merged = glob(str(tmp_path / "report" / "*_merged.xlsx"))
+    assert len(merged) == 1
+    cases = [row[0].value for row in load_workbook(merged[0]).active.iter_rows(min_row=2)]
+    assert len(cases) == 4 and {c.split(" [")[1] for c in cases} <= {"emu-1]", "emu-2]"}
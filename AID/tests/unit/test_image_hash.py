@@ -0,0 +1,80 @@
+# tests/unit/test_image_hash.py
+import random
+import shutil
+import cv2
+import numpy as np
+from utils.image_hash import HammingIndex, DuplicateDetector, hamming
+from utils.opencv_utils import OpenCVUtils
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    # 加入若干近似哈希（翻转 1~4 位）
+    for i in range(0, 2000, 50):
+        h = hashes[i]
+        for bit in rng.sample(range(64), rng.randint(1, 4)):
+            h ^= 1 << bit
+        hashes.append(h)
+
+    index = HammingIndex(max_distance=4)
+    for i, h in enumerate(hashes):
+        expected = sorted((hamming(h, o), j) for j, o in enumerate(hashes[:i]) if hamming(h, o) <= 4)
+        assert sorted(index.query(h)) == expected
+        index.add(h)
+    assert len(index) == len(hashes)
+
+
+def test_static_scene_queries_are_capped():
+    index = HammingIndex()
+    for _ in range(1000):
+        index.add(0xABCDEF)
+    assert index.query(0xABCDEF, limit=16) == [(0, i) for i in range(999, 983, -1)]
+
+
+def _check(detector, media_dir, name):
+    m = OpenCVUtils.compute_metrics(str(media_dir / name), with_hash=True)
+    return detector.check(name, m.dhash, m.thumb)
+
+
+def test_detector_flags_consecutive_stale_frame(media_dir):
+    shutil.copy(media_dir / "IMG_004.jpg", media_dir / "IMG_005.jpg")
+    shutil.copy(media_dir / "IMG_001.jpg", media_dir / "IMG_006.jpg")
+    detector, session = DuplicateDetector(), DuplicateDetector(window=None)
+    names = ["IMG_001.jpg", "IMG_004.jpg", "IMG_005.jpg", "IMG_006.jpg"]
+    verdicts = {name: _check(detector, media_dir, name) for name in names}
+    assert verdicts == {"IMG_001.jpg": None, "IMG_004.jpg": None,
+                        "IMG_005.jpg": ("IMG_004.jpg", 0, 0.0), "IMG_006.jpg": None}
+    # 与全部照片比对时，隔几张的旧帧也能发现
+    assert [_check(session, media_dir, name) for name in names][3] == ("IMG_001.jpg", 0, 0.0)
+    # 重复校验同一文件不算重复
+    assert _check(detector, media_dir, "IMG_005.jpg") is None
+
+
+def test_static_scene_noise_is_not_duplicate(tmp_path):
+    rng = np.random.default_rng(0)
+    scene = rng.integers(40, 216, (3000, 4000), dtype=np.uint8)
+    scene = cv2.GaussianBlur(scene, (0, 0), 25)
+    detector = DuplicateDetector()
+    for i, sigma in enumerate((1, 1, 2, 4)):
+        shot = np.clip(scene + rng.normal(0, sigma, scene.shape), 0, 255).astype(np.uint8)
+        path = tmp_path / f"IMG_{i}.jpg"
+        cv2.imwrite(str(path), shot)
+        assert _check(detector, tmp_path, path.name) is None
+
+
+def test_reencoded_frame_needs_calibrated_threshold(media_dir):
+    cv2.imwrite(str(media_dir / "IMG_005.jpg"), cv2.imread(str(media_dir / "IMG_004.jpg")),
+                [cv2.IMWRITE_JPEG_QUALITY, 95])
+    calibrated = DuplicateDetector(max_diff=1.0)
+    _check(calibrated, media_dir, "IMG_004.jpg")
+    assert _check(calibrated, media_dir, "IMG_005.jpg")[0] == "IMG_004.jpg"
+
+
+def test_validate_and_collect_duplicate_category(media_dir, tmp_path):
+    shutil.copy(media_dir / "IMG_004.jpg", media_dir / "IMG_005.jpg")
+    fail_dir = tmp_path / "fail"
+    result, comments = OpenCVUtils.validate_and_collect(str(media_dir), fail_dir=str(fail_dir), check_3a=False,
+                                                        check_abnormal=False, check_duplicate=True)
+    assert result == "FAIL"
+    assert comments == f"DUPLICATE FAIL (same as IMG_004.jpg, distance=0, diff=0.0): {fail_dir}/IMG_005.jpg"
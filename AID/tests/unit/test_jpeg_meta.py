@@ -0,0 +1,61 @@
+# tests/unit/test_jpeg_meta.py
+import time
+import pytest
+from utils import jpeg_meta
+from .conftest import write_exif_jpg, write_jpg
+
+CAMERA_EXIF = [
+    (0x829A, 5, [(1, 120)]),  # ExposureTime
+    (0x8827, 3, 400),  # ISO
+    (0x920A, 5, [(5400, 1000)]),  # FocalLength
+    (0xA404, 5, [(200, 100)]),  # DigitalZoomRatio
+    (0xA405, 3, 48),  # FocalLengthIn35mmFilm
+]
+
+
+def _shot(tmp_path, name, size, focal_35mm=24, zoom=(0, 1), orientation=1):
+    exif = [(0xA404, 5, [zoom]), (0xA405, 3, focal_35mm)]
+    return write_exif_jpg(tmp_path / name, size=size, noise=0, ifd0=[(0x0112, 3, orientation)], exif=exif)
+
+
+def test_read_meta_without_decoding(tmp_path):
+    path = write_exif_jpg(tmp_path / "a.jpg", size=(300, 400), ifd0=[(0x0112, 3, 6), (0x010F, 2, "AID")],
+                          exif=CAMERA_EXIF)
+    meta = jpeg_meta.read_meta(path)
+    assert (meta.width, meta.height, meta.orientation) == (400, 300, 6)
+    assert meta.exposure_time == pytest.approx(1 / 120)
+    assert meta.iso == 400
+    assert meta.focal_length == pytest.approx(5.4)
+    assert meta.focal_length_35mm == 48
+    assert meta.digital_zoom == pytest.approx(2.0)
+    assert meta.aspect == pytest.approx(4 / 3)
+
+    plain = jpeg_meta.read_meta(write_jpg(tmp_path / "plain.jpg", size=(90, 160)))
+    assert (plain.width, plain.height, plain.orientation, plain.iso, plain.digital_zoom) == (160, 90, 1, None, 1.0)
+
+
+def test_read_meta_is_fast(tmp_path):
+    path = write_exif_jpg(tmp_path / "a.jpg", size=(900, 1200), exif=CAMERA_EXIF)
+    start = time.perf_counter()
+    for _ in range(200):
+        jpeg_meta.read_meta(path)
+    assert (time.perf_counter() - start) / 200 < 1e-3
+
+
+def test_check_aspect(tmp_path):
+    square = _shot(tmp_path, "square.jpg", (300, 300))
+    tall = _shot(tmp_path, "tall.jpg", (320, 180), orientation=6)
+    assert jpeg_meta.check_aspect(square, "1:1") is None
+    assert jpeg_meta.check_aspect(tall, "9:16") is None
+    assert jpeg_meta.check_aspect(tall, "full") is None
+    assert jpeg_meta.check_aspect(square, "3:4") == f"RATIO FAIL (3:4): {square} 300x300"
+
+
+def test_check_zoom_combines_lens_switch_and_digital_zoom(tmp_path):
+    base = jpeg_meta.read_meta(_shot(tmp_path, "1x.jpg", (90, 120)))
+    wide = _shot(tmp_path, "0.7x.jpg", (90, 120), focal_35mm=17)
+    tele = _shot(tmp_path, "10x.jpg", (90, 120), focal_35mm=120, zoom=(200, 100))
+    stuck = _shot(tmp_path, "stuck.jpg", (90, 120))
+    assert jpeg_meta.check_zoom(wide, 0.7, base) is None
+    assert jpeg_meta.check_zoom(tele, 10.0, base) is None
+    assert jpeg_meta.check_zoom(stuck, 5.0, base) == f"ZOOM FAIL (5.0x): {stuck} zoom=1.00x"
@@ -0,0 +1,59 @@
+# tests/unit/test_lazy_imports.py
+import subprocess
+import sys
+import pytest
+from tools import bench_import
+from tools.fakes.fake_device import FakeCameraDevice
+from utils._lazy import LazyModule, lazy_import
+
+
+def test_utils_import_is_light_and_side_effect_free(tmp_path):
+    # 只检查是否加载了重模块；耗时预算由 python -m tools.bench_import 检查，不放进单元测试
+    assert bench_import.measure(cwd=str(tmp_path))["heavy"] == []
+
+    code = ("import logging\nimport utils.uiautomator_helper, utils.opencv_utils, utils.report_utils\n"
+            "print(len(logging.getLogger().handlers), len(logging.getLogger('UIAutomatorHelper').handlers))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True,
+                         env={"PYTHONPATH": bench_import.AID_ROOT}, check=True).stdout
+    assert out.split() == ["0", "0"]
+    assert not (tmp_path / "logs").exists()
+
+
+def test_ui_log_file_is_explicit(tmp_path, monkeypatch):
+    from utils.uiautomator_helper import UIAutomatorHelper, logger
+    monkeypatch.chdir(tmp_path)
+    UIAutomatorHelper(device=FakeCameraDevice()).adb.close()
+    assert not (tmp_path / "logs").exists()
+
+    # 注入的设备对象（会话复用的真机连接）照常写文件日志
+    monkeypatch.setattr(logger, "handlers", [])
+    UIAutomatorHelper(device=FakeCameraDevice(), log_file=True).adb.close()
+    assert (tmp_path / "logs" / "uiautomator.log").exists()
+    for handler in logger.handlers:
+        handler.close()
+
+
+def test_lazy_module_rebinds_namespace_on_first_use():
+    namespace = {}
+    proxy = namespace["json_mod"] = LazyModule("json", namespace, "json_mod")
+    assert "not loaded" in repr(proxy)
+    assert proxy.dumps([1]) == "[1]"
+    assert namespace["json_mod"] is sys.modules["json"]
+    # 代理对象被别处持有时仍然可用
+    assert proxy.loads("2") == 2
+
+    assert lazy_import("json") is sys.modules["json"]
+
+
+def test_heavy_modules_load_on_first_use(media_dir):
+    from utils import opencv_utils
+    m = opencv_utils.OpenCVUtils.compute_metrics(str(media_dir / "IMG_001.jpg"), decode_scale=2)
+    assert m.brightness > 0
+    assert opencv_utils.cv2 is sys.modules["cv2"]
+    assert opencv_utils.np is sys.modules["numpy"]
+
+
+def test_missing_module_fails_on_use_not_import():
+    proxy = lazy_import("aid_missing_module_for_test")
+    with pytest.raises(ModuleNotFoundError):
+        proxy.anything
@@ -0,0 +1,49 @@
+# tests/unit/test_low_memory.py
+import inspect
+import shutil
+import cv2
+import pytest
+from utils.opencv_utils import OpenCVUtils
+
+
+@pytest.mark.parametrize("strip_rows", [7, 64, 1000])
+def test_strip_metrics_match_full_image(media_dir, strip_rows):
+    img = cv2.imread(str(media_dir / "IMG_001.jpg"))
+    full = OpenCVUtils.compute_metrics(img)
+    brightness, sharpness = OpenCVUtils._strip_metrics(img, strip_rows=strip_rows)
+    assert brightness == pytest.approx(full.brightness, abs=1e-9)
+    assert sharpness == pytest.approx(full.sharpness, rel=1e-9)
+
+
+def test_buffers_are_reused_across_images(media_dir):
+    OpenCVUtils.compute_metrics(str(media_dir / "IMG_001.jpg"), low_memory=True)
+    buffers = dict(OpenCVUtils._buffers)
+    m = OpenCVUtils.compute_metrics(str(media_dir / "IMG_004.jpg"), low_memory=True, with_hash=True)
+    assert all(OpenCVUtils._buffers[k] is v for k, v in buffers.items())
+    assert m.thumb.shape == (36, 64) and m.dhash is not None
+
+
+def test_iter_validate_streams_per_file_results(media_dir, tmp_path):
+    fail_dir = tmp_path / "fail"
+    stream = OpenCVUtils.iter_validate(str(media_dir), fail_dir=str(fail_dir), check_3a=False, low_memory=True)
+    assert inspect.isgenerator(stream)
+    results = [(r["path"].rsplit("/", 1)[1], r["failures"]) for r in stream]
+    assert results == [
+        ("IMG_001.jpg", []),
+        ("IMG_002.jpg", [f"Abnormal FAIL (black): {fail_dir}/IMG_002.jpg"]),
+        ("IMG_003.jpg", [f"Abnormal FAIL (green): {fail_dir}/IMG_003.jpg"]),
+        ("IMG_004.jpg", []),
+    ]
+    assert OpenCVUtils.last_stats["files"] == 4
+    assert OpenCVUtils.last_stats["peak_rss_mb"]["self"] > 0
+
+
+def test_low_memory_mode_keeps_verdicts(media_dir, tmp_path):
+    verdicts = []
+    for low_memory in (False, True):
+        src = tmp_path / f"low_{low_memory}"
+        shutil.copytree(media_dir, src)
+        result, comments = OpenCVUtils.validate_and_collect(str(src), fail_dir=str(tmp_path / "fail"),
+                                                            low_memory=low_memory)
+        verdicts.append((result, comments.replace(str(src), "")))
+    assert verdicts[0] == verdicts[1]
@@ -0,0 +1,49 @@
+# tests/unit/test_media_sync.py
+import os
+from utils.adb_utils import AdbUtils
+from utils.media_sync import MediaSync
+
+DATA_PATH = "/sdcard/DCIM/Camera"
+
+
+def _shoot(fake_adb, name, data=b"jpeg"):
+    with open(fake_adb.device_path(f"{DATA_PATH}/{name}"), "wb") as fp:
+        fp.write(data)
+
+
+def _pulled(fake_adb):
+    return [c for c in fake_adb.calls() if " pull " in f" {c} "]
+
+
+def test_sync_only_transfers_delta(fake_adb, tmp_path):
+    sync = MediaSync(AdbUtils("emulator-5554"), DATA_PATH, str(tmp_path / "out"))
+
+    _shoot(fake_adb, "IMG_1.jpg")
+    _shoot(fake_adb, "IMG_2.jpg")
+    assert [os.path.basename(p) for p in sync.sync("jpg")] == ["IMG_1.jpg", "IMG_2.jpg"]
+
+    _shoot(fake_adb, "IMG_3.jpg")
+    assert [os.path.basename(p) for p in sync.sync("jpg")] == ["IMG_3.jpg"]
+    assert sync.sync("jpg") == []
+
+    pulls = _pulled(fake_adb)
+    assert len(pulls) == 2 and "IMG_1.jpg" not in pulls[1]
+    assert len(sync.local_files("jpg")) == 3
+
+
+def test_sync_refetches_changed_or_missing_files(fake_adb, tmp_path):
+    out = tmp_path / "out"
+    sync = MediaSync(AdbUtils("emulator-5554"), DATA_PATH, str(out))
+    _shoot(fake_adb, "IMG_1.jpg")
+    _shoot(fake_adb, "IMG_2.jpg")
+    sync.sync("jpg")
+
+    # 新实例从磁盘 manifest 恢复状态
+    sync = MediaSync(AdbUtils("emulator-5554"), DATA_PATH, str(out))
+    _shoot(fake_adb, "IMG_1.jpg", b"a larger jpeg")
+    os.remove(out / "IMG_2.jpg")
+    assert sorted(os.path.basename(p) for p in sync.sync("jpg")) == ["IMG_1.jpg", "IMG_2.jpg"]
+
+    os.remove(fake_adb.device_path(f"{DATA_PATH}/IMG_1.jpg"))
+    sync.sync("jpg")
+    assert list(sync.manifest) == [f"{DATA_PATH}/IMG_2.jpg"]
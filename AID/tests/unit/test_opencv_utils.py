@@ -0,0 +1,45 @@
+# tests/unit/test_opencv_utils.py
+import shutil
+from utils.opencv_utils import OpenCVUtils
+
+
+def _run(media_dir, tmp_path, name, **kwargs):
+    src = tmp_path / name
+    shutil.copytree(media_dir, src)
+    fail_dir = tmp_path / f"{name}_fail"
+    result, comments = OpenCVUtils.validate_and_collect(str(src), fail_dir=str(fail_dir), **kwargs)
+    return result, comments.replace(str(fail_dir), "<fail>")
+
+
+def test_validate_and_collect_fail_strings(media_dir, tmp_path):
+    result, comments = _run(media_dir, tmp_path, "serial", check_3a=False)
+    assert result == "FAIL"
+    assert comments.split(";") == [
+        "Abnormal FAIL (black): <fail>/IMG_002.jpg",
+        "Abnormal FAIL (green): <fail>/IMG_003.jpg",
+    ]
+
+
+def test_parallel_matches_serial(media_dir, tmp_path):
+    serial = _run(media_dir, tmp_path, "serial", workers=1)
+    parallel = _run(media_dir, tmp_path, "parallel", workers=3)
+    assert serial == parallel
+    assert serial[0] == "FAIL"
+
+
+def test_checks_are_views_over_compute_metrics(media_dir):
+    path = str(media_dir / "IMG_003.jpg")
+    m = OpenCVUtils.compute_metrics(path)
+    r3a = OpenCVUtils.check_3a(path)
+    assert r3a["metrics"]["brightness"] == round(m.brightness, 2)
+    assert r3a["metrics"]["sharpness"] == round(m.sharpness, 2)
+    assert OpenCVUtils.check_abnormal_image(path) == m.abnormal == "green"
+
+
+def test_fast_decode_mode_keeps_abnormal_verdicts(media_dir, tmp_path):
+    serial = _run(media_dir, tmp_path, "full", check_3a=False)
+    fast = _run(media_dir, tmp_path, "fast", check_3a=False, decode_scale=4, sharpness_scale=2)
+    assert serial == fast
+
+    m = OpenCVUtils.compute_metrics(str(media_dir / "IMG_001.jpg"), decode_scale=4, sharpness_scale=2)
+    assert abs(m.brightness - OpenCVUtils.compute_metrics(str(media_dir / "IMG_001.jpg")).brightness) < 2
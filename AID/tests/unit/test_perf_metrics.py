@@ -0,0 +1,91 @@
+# tests/unit/test_perf_metrics.py
+import json
+import numpy as np
+import pytest
+from tools.fakes.fake_device import FakeCameraDevice
+from utils.perf_metrics import (parse_am_start, percentile, summarize, compare,
+                                PerfStore, CameraPerfSuite)
+from utils.uiautomator_helper import UIAutomatorHelper
+
+AM_OUTPUT = """Stopping: com.android.camera
+Starting: Intent { act=android.intent.action.MAIN cmp=com.android.camera/.Camera }
+Status: ok
+LaunchState: COLD
+Activity: com.android.camera/.Camera
+TotalTime: 812
+WaitTime: 830
+Complete
+"""
+
+
+def test_parse_am_start():
+    assert parse_am_start(AM_OUTPUT) == {"Status": "ok", "LaunchState": "COLD", "TotalTime": 812, "WaitTime": 830}
+    assert parse_am_start("Error: Activity not started") == {}
+
+
+def test_percentiles_match_numpy():
+    values = [812, 790, 845, 1203, 801, 799, 820, 815, 808, 930, 1500]
+    for p in (0, 50, 90, 99, 100):
+        assert percentile(values, p) == pytest.approx(np.percentile(values, p))
+    summary = summarize(values)
+    assert summary["runs"] == 11 and summary["p50"] == 815.0 and summary["max"] == 1500
+    assert summarize([]) == {"runs": 0}
+
+
+def test_compare_flags_p50_regression():
+    base = {"launch_TotalTime": summarize([800] * 5), "shot_to_file": summarize([300] * 5)}
+    cur = {"launch_TotalTime": summarize([950] * 5), "shot_to_file": summarize([310] * 5)}
+    assert compare(base, cur) == ["PERF REGRESSION: launch_TotalTime p50 800.0→950.0ms (+18.8%)"]
+
+
+def test_store_keeps_runs_per_build(tmp_path):
+    store = PerfStore(str(tmp_path))
+    store.save("vendor/cam:14/A/1:user", {"m": summarize([1, 2])})
+    store.save("vendor/cam:14/A/1:user", {"m": summarize([3])})
+    store.save("vendor/cam:14/A/2:user", {"m": summarize([5])})
+
+    assert len(store.load("vendor/cam:14/A/1:user")["runs"]) == 2
+    build, summary = store.baseline("vendor/cam:14/A/2:user")
+    assert build == "vendor/cam:14/A/1:user" and summary["m"]["runs"] == 1
+    assert store.baseline("other")[0] is not None
+    assert PerfStore(str(tmp_path / "none")).baseline("x") == (None, None)
+
+
+@pytest.fixture
+def ui(fake_adb, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_SHUTTER_DIR", "/sdcard/DCIM/Camera")
+    helper = UIAutomatorHelper(device=FakeCameraDevice())
+    yield helper
+    helper.adb.close()
+
+
+def test_open_camera_parses_launch_time(ui, monkeypatch):
+    monkeypatch.setattr("utils.uiautomator_helper.time.sleep", lambda s: None)
+    launch = ui.open_camera()
+    assert launch["TotalTime"] == 800 and launch["WaitTime"] == 815
+    assert launch["ready_ms"] >= 0
+    assert ui.last_launch is launch
+
+
+def test_suite_measures_and_publishes(ui, tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.uiautomator_helper.time.sleep", lambda s: None)
+    store = PerfStore(str(tmp_path / "perf"))
+    store.save("old/build", {"launch_TotalTime": summarize([500])})
+
+    suite = CameraPerfSuite(ui, store=store, poll_interval=0.01)
+    suite.measure_launch(2)
+    shots = suite.measure_shot_latency(3)
+    assert shots["shot_to_file"]["runs"] == 3 and shots["shot_cycle"]["runs"] == 2
+
+    rows = []
+
+    class Report:
+        def add_result(self, *args, highlight=True):
+            rows.append(args + (highlight,))
+
+    regressions = suite.publish(Report())
+    assert regressions[0].startswith("PERF REGRESSION: launch_TotalTime p50 500.0→800.0ms")
+    assert {r[0] for r in rows} >= {"perf_launch_TotalTime", "perf_shot_to_file"}
+    assert all(r[-1] == (r[2] == "FAIL") for r in rows)
+    saved = json.loads(open(store.path("fake/camera/device:14/UP1A/1:user/release-keys")).read())
+    assert saved["runs"][0]["samples"]["shot_to_file"]
@@ -0,0 +1,79 @@
+# tests/unit/test_prescreen.py
+import os
+import cv2
+import numpy as np
+import pytest
+from utils.adb_utils import AdbUtils
+from utils.jpeg_meta import HEAD_BYTES, exif_thumbnail
+from utils.media_sync import MediaSync
+from utils.prescreen import Prescreener
+from .conftest import write_exif_jpg, write_jpg
+
+DATA_PATH = "/sdcard/DCIM/Camera"
+
+
+def test_exif_thumbnail_from_header_only(tmp_path):
+    path = write_exif_jpg(tmp_path / "a.jpg", bgr=(40, 200, 40), size=(480, 640))
+    with open(path, "rb") as fp:
+        head = fp.read(HEAD_BYTES)
+    thumb = cv2.imdecode(np.frombuffer(exif_thumbnail(head), np.uint8), cv2.IMREAD_COLOR)
+    assert thumb.shape == (120, 160, 3)
+    assert np.abs(thumb.mean(axis=(0, 1)) - (40, 200, 40)).max() < 3
+
+    with open(write_jpg(tmp_path / "plain.jpg"), "rb") as fp:
+        assert exif_thumbnail(fp.read()) is None
+    assert exif_thumbnail(head[:200]) is None
+
+
+def test_read_heads_splits_one_exec_out(fake_adb):
+    sizes = {}
+    for name, n in (("IMG_1.jpg", 10), ("IMG_2.jpg", 5000), ("IMG_3.jpg", 300)):
+        data = os.urandom(n)
+        with open(fake_adb.device_path(f"{DATA_PATH}/{name}"), "wb") as fp:
+            fp.write(data)
+        sizes[f"{DATA_PATH}/{name}"] = data
+
+    adb = AdbUtils("emulator-5554")
+    heads = adb.read_heads([(r, len(d)) for r, d in sizes.items()], 1024)
+    assert heads == {r: d[:1024] for r, d in sizes.items()}
+    assert sum("exec-out" in c for c in fake_adb.calls()) == 1
+
+    # 文件大小与 stat 不符时整批放弃，由调用方改为完整拉取
+    assert adb.read_heads([(f"{DATA_PATH}/IMG_1.jpg", 20)], 1024) == {}
+
+
+def test_sync_pulls_only_suspicious_captures(fake_adb, tmp_path):
+    for i in range(12):
+        write_exif_jpg(fake_adb.device_path(f"{DATA_PATH}/IMG_{i:02d}.jpg"), size=(900, 1200), seed=i)
+    write_exif_jpg(fake_adb.device_path(f"{DATA_PATH}/IMG_black.jpg"), bgr=(5, 5, 5), noise=0,
+                   size=(900, 1200))
+    write_exif_jpg(fake_adb.device_path(f"{DATA_PATH}/IMG_cast.jpg"), size=(900, 1200), thumb_bgr=(180, 90, 60))
+    write_jpg(fake_adb.device_path(f"{DATA_PATH}/IMG_noexif.jpg"), size=(900, 1200))
+
+    adb = AdbUtils("emulator-5554")
+    prescreen = Prescreener(adb, sample_rate=0, min_bytes=1024)
+    sync = MediaSync(adb, DATA_PATH, str(tmp_path / "out"), prescreen=prescreen)
+    pulled = sorted(os.path.basename(p) for p in sync.sync("jpg"))
+    assert pulled == ["IMG_black.jpg", "IMG_cast.jpg", "IMG_noexif.jpg"]
+    assert prescreen.last_stats["reasons"] == {"ok": 12, "abnormal:black": 1, "AWB": 1, "no_thumbnail": 1}
+    assert sync.captured("jpg") == 15
+    assert len(sync.local_files("jpg")) == 3
+
+    transfer = sync.transfer
+    total = transfer["pull_bytes"] + transfer["skipped_bytes"]
+    assert transfer["head_bytes"] + transfer["pull_bytes"] < 0.3 * total
+
+    # 预筛通过的文件记入 manifest，再次同步不重复读取
+    calls = len(fake_adb.calls())
+    assert sync.sync("jpg") == []
+    assert not any("exec-out" in c or " pull " in c for c in fake_adb.calls()[calls:])
+    assert MediaSync(adb, DATA_PATH, str(tmp_path / "out")).captured("jpg") == 15
+
+
+def test_sampling_is_deterministic(fake_adb):
+    prescreen = Prescreener(AdbUtils("emulator-5554"), sample_rate=0.2)
+    names = [f"{DATA_PATH}/IMG_{i}.jpg" for i in range(2000)]
+    picked = [n for n in names if prescreen.sampled(n)]
+    assert len(picked) == pytest.approx(400, abs=60)
+    assert picked == [n for n in names if prescreen.sampled(n)]
+    assert all(Prescreener(None, sample_rate=1).sampled(n) for n in names[:10])
@@ -0,0 +1,46 @@
+# tests/unit/test_report_utils.py
+import pytest
+from openpyxl import load_workbook
+from utils.report_utils import SimpleReport
+
+
+@pytest.fixture
+def report(tmp_path, monkeypatch):
+    monkeypatch.setattr(SimpleReport, "_instance", None)
+    monkeypatch.setattr(SimpleReport, "_dirty", False)
+    return SimpleReport(str(tmp_path))
+
+
+def test_rows_are_journaled_then_rendered(report):
+    report.add_result("test_a", 1, "PASS")
+    report.add_result("test_b", 2, "FAIL", "AE FAIL: x;Abnormal FAIL (black): y")
+
+    with open(report.journal_file, encoding="utf-8") as fp:
+        assert len(fp.readlines()) == 2
+
+    path = SimpleReport.close()
+    assert path == report.report_file
+    ws = load_workbook(path).active
+    assert [c.value for c in ws[1]] == ["Case_Name", "Loops", "Result", "Comments", "Stages"]
+    assert [c.value for c in ws[3]] == ["test_b", 2, "FAIL", "AE FAIL: x\nAbnormal FAIL (black): y", None]
+    assert ws["C2"].fill.start_color.rgb.endswith("00FF00")
+    assert ws["D3"].fill.start_color.rgb.endswith("FF0000")
+    assert ws["D3"].alignment.wrap_text
+    assert SimpleReport.close() is None
+
+
+def test_comments_highlight(report):
+    report.add_result("test_warn", 1, "PASS", "SHOT WARN: slow")
+    report.add_result("perf_shot_to_file", 3, "PASS", "p50 800ms", highlight=False)
+    ws = load_workbook(SimpleReport.close()).active
+    assert ws["D2"].fill.start_color.rgb.endswith("FF0000")
+    assert ws["D3"].fill.fill_type is None
+
+
+def test_render_recovers_from_killed_run(report, tmp_path):
+    report.add_result("test_a", 1, "PASS")
+    with open(report.journal_file, "a", encoding="utf-8") as fp:
+        fp.write('{"case_name": "test_b", "lo')  # 进程被杀时写了一半
+
+    path = SimpleReport.render(report.journal_file, str(tmp_path / "recovered.xlsx"))
+    assert load_workbook(path).active.max_row == 2
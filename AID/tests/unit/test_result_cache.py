@@ -0,0 +1,91 @@
+# tests/unit/test_result_cache.py
+import os
+import shutil
+import pytest
+from utils.opencv_utils import OpenCVUtils
+from utils.result_cache import ResultCache
+from .conftest import write_jpg
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ResultCache(str(tmp_path / "cache" / "analysis.sqlite"), max_mb=16)
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def analysed(monkeypatch):
+    """记录真正执行分析的文件"""
+    calls = []
+    original = OpenCVUtils._analyze_file
+
+    def spy(f, **options):
+        calls.append(os.path.basename(f))
+        return original(f, **options)
+
+    monkeypatch.setattr(OpenCVUtils, "_analyze_file", staticmethod(spy))
+    return calls
+
+
+def _run(media_dir, tmp_path, name, cache, **kwargs):
+    src = tmp_path / name
+    shutil.copytree(media_dir, src)
+    fail_dir = tmp_path / f"{name}_fail"
+    result, comments = OpenCVUtils.validate_and_collect(str(src), fail_dir=str(fail_dir), cache=cache, **kwargs)
+    return result, comments.replace(str(fail_dir), "<fail>")
+
+
+def test_second_run_is_served_from_cache(media_dir, tmp_path, cache, analysed):
+    first = _run(media_dir, tmp_path, "a", cache)
+    assert len(analysed) == 4
+    second = _run(media_dir, tmp_path, "b", cache)
+    assert second == first
+    assert len(analysed) == 4 and cache.hits == 4
+
+
+def test_stopping_early_commits_cache(media_dir, tmp_path, cache):
+    _run(media_dir, tmp_path, "a", cache)
+    # 全部命中：只有 last_used 更新，要靠结束时的 flush 提交
+    results = OpenCVUtils.iter_validate(str(media_dir), fail_dir=str(tmp_path / "fail"), cache=cache)
+    next(results)
+    results.close()
+    assert not cache._db.in_transaction
+
+
+def test_threshold_change_invalidates(media_dir, tmp_path, cache, analysed):
+    _run(media_dir, tmp_path, "a", cache, sharpness_threshold=80)
+    result, comments = _run(media_dir, tmp_path, "b", cache, sharpness_threshold=1e9)
+    assert len(analysed) == 8
+    assert "AF FAIL" in comments
+
+
+def test_content_change_invalidates(media_dir, cache):
+    path = str(media_dir / "IMG_001.jpg")
+    params = ResultCache.params_key({"check_3a": True})
+    cache.put(path, params, OpenCVUtils._analyze_file(path))
+    assert cache.get(path, params)["path"] == path
+
+    write_jpg(path, bgr=(5, 5, 5), noise=0)
+    assert cache.get(path, params) is None
+    # 同内容换路径（移入 FAIL_DIR）仍命中
+    moved = str(media_dir / "moved.jpg")
+    shutil.copy(str(media_dir / "IMG_004.jpg"), moved)
+    cache.put(str(media_dir / "IMG_004.jpg"), params, OpenCVUtils._analyze_file(moved))
+    assert cache.get(moved, params)["path"] == moved
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_mb=0.01)
+    files = []
+    for i in range(6):
+        path = tmp_path / f"f{i}.bin"
+        path.write_bytes(os.urandom(16))
+        files.append(str(path))
+        cache.put(files[-1], "p", {"blob": b"x" * 3000})
+        cache.get(files[0], "p")  # f0 一直被访问，不应被淘汰
+
+    assert cache.get(files[0], "p") is not None
+    assert cache.get(files[1], "p") is None
+    assert cache.get(files[-1], "p") is not None
+    cache.close()
@@ -0,0 +1,95 @@
+# tests/unit/test_session_device.py
+import pytest
+from tools.fakes.fake_device import FakeCameraDevice
+from utils import device_pool
+from utils.uiautomator_helper import UIAutomatorHelper
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr("utils.uiautomator_helper.time.sleep", lambda s: None)
+
+
+@pytest.fixture
+def ui(fake_adb, no_sleep):
+    helper = UIAutomatorHelper(device=FakeCameraDevice(), warm=True)
+    yield helper
+    helper.adb.close()
+
+
+def _state(ui, **kwargs):
+    return ui.open_camera(**kwargs)["LaunchState"]
+
+
+def test_warm_start_only_from_baseline(ui):
+    assert _state(ui) == "COLD"  # 状态未知，第一次必须冷启动
+    assert _state(ui) == "HOT"
+
+    ui.set_zoom(2.0)
+    assert _state(ui) == "COLD"
+    ui.set_zoom(5.0)
+    ui.set_zoom(1.0)
+    assert _state(ui) == "HOT"
+
+    ui.switch_video_mode()
+    ui.start_recording()
+    ui.stop_recording()
+    assert not ui.at_baseline
+    ui.switch_camera_mode()
+    assert _state(ui) == "HOT"
+
+    # 画幅是持久设置，选完菜单收起即回到基线
+    ui.set_ratio("1:1")
+    assert _state(ui) == "HOT"
+    assert _state(ui, cold=True) == "COLD"
+
+
+def test_warm_start_falls_back_to_cold(ui):
+    ui.open_camera()
+    ui.device.screen = "menu"  # 基线被用例之外的操作破坏，热启动等不到快门
+    launch = ui.open_camera(ready_timeout=0.1)
+    assert launch["LaunchState"] == "COLD" and "ready_ms" in launch
+    assert ui.at_baseline
+
+
+def test_cold_mode_never_reuses_process(fake_adb, no_sleep):
+    helper = UIAutomatorHelper(device=FakeCameraDevice(), warm=False)
+    try:
+        assert [_state(helper) for _ in range(3)] == ["COLD"] * 3
+    finally:
+        helper.adb.close()
+
+
+def test_session_pool_reuses_helper(fake_adb, no_sleep, monkeypatch):
+    monkeypatch.setattr(device_pool, "_helpers", {})
+    first = device_pool.get_helper("emulator-5554", device=FakeCameraDevice())
+    assert device_pool.get_helper("emulator-5554") is first
+    first.use_prescreen(True)
+    assert first.media_sync.prescreen is not None
+    first.use_prescreen(False)
+    assert first.media_sync.prescreen is None
+
+    device_pool.release_helpers()
+    assert device_pool._helpers == {}
+    assert first.device.screen == "main"
+
+
+class _RecordingAdb:
+    def __init__(self, device_id):
+        self.device_id = device_id
+        self.commands = []
+
+    def shell(self, cmd):
+        self.commands.append(cmd)
+
+    def keep_screen_on_while_charging(self, enable=True):
+        self.commands.append(f"stay_on {enable}")
+
+
+def test_prepare_device_once_per_session(monkeypatch):
+    monkeypatch.setattr(device_pool, "_prepared", set())
+    a, b = _RecordingAdb("A"), _RecordingAdb("B")
+    assert device_pool.prepare_device(a) is True
+    assert device_pool.prepare_device(a) is False
+    assert device_pool.prepare_device(b) is True
+    assert a.commands == ["root", "remount", "stay_on True"]
@@ -0,0 +1,34 @@
+# tests/unit/test_threshold_sweep.py
+import itertools
+from glob import glob
+from tools.threshold_sweep import extract, load, sweep
+from utils.opencv_utils import OpenCVUtils
+from .conftest import write_jpg
+
+
+def test_sweep_matches_eval_3a(media_dir, tmp_path):
+    write_jpg(media_dir / "IMG_005.jpg", bgr=(200, 60, 200), seed=5)  # 紫图
+    files = sorted(glob(str(media_dir / "*.jpg")))
+    out = str(tmp_path / "metrics.npz")
+    extract(files[:3], out)
+    metrics = extract(files, out)  # 增量追加
+    assert list(load(out)["path"]) == files == list(metrics["path"])
+
+    grid = dict(brightness_ranges=[(50, 200), (100, 140)], wb_tolerances=[10, 25], sharpness_thresholds=[80, 5000],
+                brightness_thresholds=[30], color_ratios=[1.2, 1.5])
+    rows = sweep(metrics, **grid)
+    assert len(rows) == 16
+
+    combos = itertools.product(*grid.values())
+    for row, (rng, tol, sharp, bt, cr) in zip(rows, combos):
+        passed = 0
+        abnormal = {"black": 0, "green": 0, "purple": 0}
+        for f in files:
+            m = OpenCVUtils.compute_metrics(f, brightness_threshold=bt, color_ratio=cr)
+            r = OpenCVUtils._eval_3a(m, f, rng, tol, sharp)
+            passed += r["exposure"] and r["white_balance"] and r["focus"] and not m.abnormal
+            if m.abnormal:
+                abnormal[m.abnormal] += 1
+        assert row["pass"] == passed
+        assert {k: row[k] for k in abnormal} == abnormal
+        assert row["pass"] + row["fail"] == len(files)
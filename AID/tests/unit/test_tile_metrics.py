@@ -0,0 +1,52 @@
+# tests/unit/test_tile_metrics.py
+import os
+import cv2
+import numpy as np
+import pytest
+from utils.opencv_utils import OpenCVUtils
+
+
+def _half_blurred(path):
+    rng = np.random.default_rng(0)
+    img = np.clip(rng.normal(128, 40, (301, 403, 3)), 0, 255).astype(np.uint8)
+    img[:, 200:] = cv2.GaussianBlur(img[:, 200:], (0, 0), 6)
+    cv2.imwrite(str(path), img, [cv2.IMWRITE_JPEG_QUALITY, 98])
+    return str(path)
+
+
+def test_tiles_match_per_tile_reference(media_dir):
+    img = cv2.imread(str(media_dir / "IMG_003.jpg"))
+    t = OpenCVUtils.compute_tile_metrics(img, grid=(3, 5))
+    th, tw = img.shape[0] // 3, img.shape[1] // 5
+    lap = cv2.Laplacian(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.CV_64F)
+    for r in range(3):
+        for c in range(5):
+            tile = img[r * th:(r + 1) * th, c * tw:(c + 1) * tw]
+            b, g, rr = cv2.mean(tile)[:3]
+            assert (t.mean_r[r, c], t.mean_g[r, c], t.mean_b[r, c]) == pytest.approx((rr, g, b))
+            assert t.brightness[r, c] == pytest.approx(cv2.mean(cv2.cvtColor(tile, cv2.COLOR_BGR2GRAY))[0])
+            assert t.sharpness[r, c] == pytest.approx(lap[r * th:(r + 1) * th, c * tw:(c + 1) * tw].var())
+
+
+def test_blurry_half_fails_only_in_tile_mode(tmp_path):
+    path = _half_blurred(tmp_path / "half.jpg")
+    assert OpenCVUtils.check_3a(path, sharpness_threshold=80)["focus"]
+
+    heatmap = str(tmp_path / "heat.png")
+    r = OpenCVUtils.check_3a_tiles(path, grid=(2, 4), sharpness_threshold=80, heatmap_path=heatmap)
+    assert not r["focus"]
+    assert sorted(r["bad_tiles"]["AF"]) == [(0, 2), (0, 3), (1, 2), (1, 3)]
+    assert r["worst_tiles"][0]["tile"][1] >= 2
+    assert cv2.imread(heatmap).shape[1] == 640
+
+
+def test_validate_and_collect_tile_mode(tmp_path):
+    src = tmp_path / "out"
+    src.mkdir()
+    _half_blurred(src / "IMG_001.jpg")
+    fail_dir = tmp_path / "fail"
+    result, comments = OpenCVUtils.validate_and_collect(str(src), fail_dir=str(fail_dir), check_ae=False,
+                                                        check_awb=False, tile_grid=(1, 2))
+    assert result == "FAIL"
+    assert comments.startswith("AF FAIL (sharpness=") and "tiles=[(0, 1)]" in comments
+    assert os.path.exists(fail_dir / "IMG_001_heatmap.png")
@@ -0,0 +1,97 @@
+# tests/unit/test_trace.py
+import json
+import pytest
+from openpyxl import load_workbook
+from utils import trace
+from utils.report_utils import SimpleReport
+
+
+class FakeClock:
+    """可控时钟：advance() 模拟耗时，计时结果与机器负载无关"""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(trace, "_clock", fake)
+    return fake
+
+
+@pytest.fixture
+def tracing(clock):
+    trace.enable(True)
+    trace.begin("unit::case")
+    yield clock
+    trace.end()
+    trace.enable(False)
+
+
+def _outer(clock):
+    @trace.traced("outer")
+    def run():
+        with trace.span("inner", files=2):
+            clock.advance(0.03)
+        clock.advance(0.01)
+    run()
+
+
+def test_self_time_excludes_nested_spans(tracing):
+    tracing.advance(0.005)
+    _outer(tracing)
+    tracing.advance(0.002)
+    stages = dict(trace.stages())
+    assert stages["inner"] == pytest.approx(0.03)
+    assert stages["outer"] == pytest.approx(0.01)
+    assert stages["untraced"] == pytest.approx(0.007)
+
+    text = trace.format_stages(limit=1)
+    assert text.splitlines()[0].startswith("inner ")
+    assert [line.split()[0] for line in text.splitlines()] == ["inner", "others", "untraced"]
+
+
+def test_export_writes_chrome_trace(tracing, tmp_path):
+    _outer(tracing)
+    path = trace.export(str(tmp_path / "trace" / "case.json"))
+    with open(path, encoding="utf-8") as fp:
+        data = json.load(fp)
+    events = {e["name"]: e for e in data["traceEvents"] if e["ph"] == "X"}
+    assert set(events) == {"outer", "inner"}
+    assert events["inner"]["args"] == {"files": 2}
+    assert events["outer"]["ts"] == events["inner"]["ts"]
+    assert (events["outer"]["dur"], events["inner"]["dur"]) == (40000.0, 30000.0)
+    assert data["otherData"]["test"] == "unit::case"
+
+
+def test_disabled_records_nothing(clock):
+    trace.enable(False)
+    trace.begin("unit::disabled")
+    assert trace.span("x") is trace.span("y")
+
+    wrapped = trace.traced("plain")(lambda: clock.advance(1) or 1)
+    assert wrapped() == 1
+    with trace.span("x"):
+        clock.advance(1)
+    assert trace.end() == [("untraced", 2.0)]
+
+
+def test_report_stages_column(tracing, tmp_path, monkeypatch):
+    monkeypatch.setattr(SimpleReport, "_instance", None)
+    monkeypatch.setattr(SimpleReport, "_dirty", False)
+    report = SimpleReport(str(tmp_path))
+    _outer(tracing)
+    report.add_result("test_a", 1, "PASS")
+
+    ws = load_workbook(SimpleReport.close()).active
+    assert ws["E1"].value == "Stages"
+    lines = ws["E2"].value.splitlines()
+    assert lines[0].startswith("inner ") and lines[-1].startswith("untraced ")
+    assert ws["E2"].alignment.wrap_text
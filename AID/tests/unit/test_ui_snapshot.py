@@ -0,0 +1,51 @@
+# tests/unit/test_ui_snapshot.py
+import pytest
+from tools.fakes.fake_device import FakeCameraDevice
+from utils import uiautomator_helper
+from utils.ui_snapshot import UISnapshot
+from utils.uiautomator_helper import UIAutomatorHelper
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(uiautomator_helper.time, "sleep", lambda _: None)
+
+
+def test_snapshot_resolves_selectors_from_one_dump():
+    device = FakeCameraDevice()
+    ui = UISnapshot(device)
+    assert ui.exists(text="录像")
+    assert not ui.exists(text="画幅")
+    assert ui.bounds(description="2.0倍变焦") == (500, 1700, 580, 1780)
+    assert device.rpc == 1
+
+    ui.click(resourceId="com.android.camera:id/menu_indicator")
+    assert ui.exists(text="画幅")
+    assert device.rpc == 3 and ui.dumps == 2
+
+
+def test_snapshot_rejects_unknown_selector():
+    with pytest.raises(ValueError):
+        UISnapshot(FakeCameraDevice()).exists(className="android.widget.Button")
+
+
+@pytest.mark.parametrize("use_snapshot", [False, True])
+def test_helper_actions_behave_the_same(use_snapshot):
+    device = FakeCameraDevice()
+    ui = UIAutomatorHelper(use_snapshot=use_snapshot, device=device)
+    ui.set_live_photo(True)
+    ui.set_zoom(5.0)
+    ui.set_ratio("9:16")
+
+    assert device.live_photo and device.screen == "main"
+    assert [n.get("content-desc") for n in device.taps][-3:] == [None, None, "画幅九比十六"]
+    assert device.taps[1]["content-desc"] == "5.0倍变焦"
+
+
+def test_snapshot_reduces_rpc_for_ratio_switch():
+    counts = {}
+    for use_snapshot in (False, True):
+        device = FakeCameraDevice()
+        UIAutomatorHelper(use_snapshot=use_snapshot, device=device).set_ratio("1:1")
+        counts[use_snapshot] = device.rpc
+    assert counts[True] < counts[False]
@@ -0,0 +1,87 @@
+# tests/unit/test_video_stream.py
+import cv2
+import numpy as np
+from utils.opencv_utils import OpenCVUtils
+
+FPS = 30
+
+
+def write_mp4(path, frames):
+    h, w = frames[0].shape[:2]
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), FPS, (w, h))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def moving_frames(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [cv2.GaussianBlur(rng.integers(40, 220, (120, 160, 3), dtype=np.uint8), (5, 5), 0)
+            for _ in range(count)]
+
+
+def test_healthy_video_passes(tmp_path):
+    path = write_mp4(tmp_path / "ok.mp4", moving_frames(60))
+    v = OpenCVUtils.analyze_video_stream(path)
+    assert v["frames_decoded"] == 60
+    assert v["issues"] == []
+    assert abs(v["fps_effective"] - FPS) < 1
+
+
+def test_static_scene_noise_is_not_frozen(tmp_path):
+    rng = np.random.default_rng(1)
+    scene = cv2.GaussianBlur(rng.integers(40, 216, (120, 160, 3), dtype=np.uint8), (0, 0), 5)
+    frames = [np.clip(scene + rng.normal(0, sigma, scene.shape), 0, 255).astype(np.uint8)
+              for sigma in (1, 4) for _ in range(45)]
+    v = OpenCVUtils.analyze_video_stream(write_mp4(tmp_path / "static.mp4", frames))
+    assert v["frozen_frames"] == 0
+    assert v["issues"] == []
+
+
+def test_frozen_and_black_segments(tmp_path):
+    frames = moving_frames(30)
+    frames += [frames[-1]] * 45
+    frames += [np.zeros_like(frames[0])] * 15
+    path = write_mp4(tmp_path / "bad.mp4", frames)
+
+    v = OpenCVUtils.analyze_video_stream(path)
+    assert v["longest_frozen"] >= 45
+    assert v["black_frames"] == 15
+    assert any(i.startswith("frozen") for i in v["issues"])
+    assert any(i.startswith("black frames") for i in v["issues"])
+
+
+def test_pts_gaps_count_dropped_frames():
+    frame = np.full((36, 64, 3), 128, np.uint8)
+    pts = [0, 33.3, 66.7, 166.7, 200.0]  # 66.7 -> 166.7 丢了 2 帧
+    frames = ((i, t, frame + i) for i, t in enumerate(pts))
+    stats = OpenCVUtils._analyze_frames(frames, FPS)
+    assert stats["pts_gaps"] == 1
+    assert stats["dropped_frames"] == 2
+    assert stats["gap_events"] == [(3, 66.7, 166.7)]
+
+
+def test_validate_and_collect_stream_mode(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    frames = moving_frames(20) + [np.zeros((120, 160, 3), np.uint8)] * 20
+    write_mp4(out / "VID_1.mp4", frames)
+    basic = OpenCVUtils.validate_and_collect(str(out), fail_dir=str(tmp_path / "fail"))
+    stream = OpenCVUtils.validate_and_collect(str(out), fail_dir=str(tmp_path / "fail"), video_mode="stream")
+    assert basic == ("PASS", "")
+    assert stream[0] == "FAIL" and "VIDEO FAIL: black frames (20/40)" in stream[1]
+
+
+def test_sampled_mode_reports_throughput(tmp_path):
+    frames = moving_frames(40) + [np.zeros((120, 160, 3), np.uint8)] * 20
+    path = write_mp4(tmp_path / "mixed.mp4", frames)
+
+    v = OpenCVUtils.analyze_video_sampled(path, samples=6)
+    assert v["frames_analysed"] == 6
+    assert [s["frame"] for s in v["samples"]] == [0, 10, 20, 30, 40, 50]
+    assert v["wall_time"] > 0 and v["frames_per_sec"] > 0
+    assert "Abnormal FAIL on 2/6 sampled frames [40, 50]" in v["issues"]
+
+    v = OpenCVUtils.analyze_video_sampled(path, stride=15)
+    assert [s["frame"] for s in v["samples"]] == [0, 15, 30, 45]
@@ -0,0 +1,11 @@
+# tests/unit/xdist_probe.py
+# 由 test_device_pool 以子进程 + pytest -n 方式运行，不会被默认收集
+import pytest
+from config.device_config import DEVICE_ID, OUTPUT_PATH, FAIL_DIR
+from utils.report_utils import SimpleReport
+
+
+@pytest.mark.parametrize("case", range(4))
+def test_probe(case):
+    assert DEVICE_ID and OUTPUT_PATH.endswith(DEVICE_ID) and FAIL_DIR.startswith(OUTPUT_PATH)
+    SimpleReport().add_result(f"probe_{case}", 1, "PASS")
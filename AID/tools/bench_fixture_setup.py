@@ -0,0 +1,66 @@
+# tools/bench_fixture_setup.py
+"""
+基于 fake adb 测量 clear_camera_files fixture 的准备耗时：
+每条命令启动一个 adb 进程（旧实现） vs 常驻 adb shell 会话
+
+FAKE_ADB_DELAY 模拟每次 adb 进程启动 + USB 握手的开销
+用法（在 AID 目录下）：
+    python -m tools.bench_fixture_setup --cases 20 --delay 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from tools.fakes import fake_adb
+from utils.adb_utils import AdbUtils
+
+DATA_PATH = "/sdcard/DCIM/Camera"
+
+
+def install_fake_adb(tmp, delay):
+    bin_dir = os.path.join(tmp, "bin")
+    fake_adb.install(bin_dir)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+    os.environ["FAKE_ADB_ROOT"] = os.path.join(tmp, "device")
+    os.environ["FAKE_ADB_DELAY"] = str(delay)
+    os.makedirs(os.path.join(tmp, "device", DATA_PATH.lstrip("/")))
+
+
+def setup_case(adb):
+    """与 conftest.clear_camera_files 相同的命令序列"""
+    adb.shell("root")
+    adb.shell("remount")
+    adb.keep_screen_on_while_charging(True)
+    adb.clear_media_files(remote_dir=DATA_PATH)
+
+
+def bench(persistent, cases):
+    adb = AdbUtils("emulator-5554", persistent=persistent)
+    start = time.perf_counter()
+    for _ in range(cases):
+        setup_case(adb)
+    elapsed = time.perf_counter() - start
+    adb.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=20, help="模拟的 case 数")
+    parser.add_argument("--delay", type=float, default=0.05, help="每次 adb 进程启动的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        install_fake_adb(tmp, args.delay)
+        legacy = bench(False, args.cases)
+        session = bench(True, args.cases)
+
+    print(f"cases: {args.cases}, simulated adb startup: {args.delay * 1000:.0f} ms")
+    print(f"per-command process : {legacy / args.cases * 1000:8.1f} ms / case")
+    print(f"persistent session  : {session / args.cases * 1000:8.1f} ms / case")
+    print(f"speedup             : {legacy / session:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
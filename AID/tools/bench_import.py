@@ -0,0 +1,72 @@
+# tools/bench_import.py
+"""
+基于 python -X importtime 测量 utils 模块的导入耗时，并检查导入后是否加载了重模块
+（cv2 / numpy / openpyxl / uiautomator2），用于防止 pytest 收集阶段的导入开销回退
+
+每次在全新子进程中导入，取多次运行的中位数；超过 --budget-ms 时返回码为 1
+用法（在 AID 目录下）：
+    python -m tools.bench_import --runs 5
+    python -m tools.bench_import --modules utils.opencv_utils --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+AID_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+MODULES = ("utils.uiautomator_helper", "utils.opencv_utils", "utils.report_utils", "utils.capture_pipeline")
+HEAVY_MODULES = ("cv2", "numpy", "openpyxl", "uiautomator2")
+IMPORT_BUDGET_MS = 250  # 以上模块一起导入的累计耗时上限（不含解释器启动）
+
+
+def measure(modules=MODULES, cwd=AID_ROOT):
+    """
+    在子进程中导入 modules
+    :return: {"total_ms": 累计耗时, "self_ms": {模块: 自身耗时}, "heavy": 已加载的重模块}
+    """
+    code = (f"import sys\nimport {', '.join(modules)}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                            capture_output=True, text=True, env={**os.environ, "PYTHONPATH": AID_ROOT})
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    self_us, total_us = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        self_us[name.strip()] = int(own)
+        # 顶层（无缩进）条目的累计耗时之和即本次导入的总耗时；site 属于解释器启动
+        if name.startswith(" ") and not name.startswith("  ") and name.strip() != "site":
+            total_us += int(cumulative)
+    return {
+        "total_ms": total_us / 1000,
+        "self_ms": {k: v / 1000 for k, v in self_us.items()},
+        "heavy": [m for m in result.stdout.strip().split(",") if m]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=list(MODULES), help="要导入的模块")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数，取中位数")
+    parser.add_argument("--top", type=int, default=10, help="列出自身耗时最高的模块数")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="累计导入耗时上限")
+    args = parser.parse_args()
+
+    runs = [measure(args.modules) for _ in range(args.runs)]
+    total = statistics.median(r["total_ms"] for r in runs)
+    slowest = sorted(runs[-1]["self_ms"].items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+
+    print(f"modules: {', '.join(args.modules)}")
+    print(f"import time (median of {args.runs}): {total:.1f} ms, budget {args.budget_ms:.0f} ms")
+    print(f"heavy modules loaded: {', '.join(runs[-1]['heavy']) or 'none'}")
+    for name, ms in slowest:
+        print(f"  {ms:8.2f} ms  {name}")
+    sys.exit(0 if total <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
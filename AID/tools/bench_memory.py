@@ -0,0 +1,68 @@
+# tools/bench_memory.py
+"""
+峰值内存基准：在独立子进程中对同一批图片执行 validate_and_collect，
+对比默认模式与低内存模式（条带 float32 Laplacian + 复用缓冲区）的峰值常驻内存
+
+用法（在 AID 目录下）：
+    python -m tools.bench_memory --mp 50 --images 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys
+from utils.opencv_utils import OpenCVUtils, peak_rss_mb
+baseline = peak_rss_mb()["self"]
+result, _ = OpenCVUtils.validate_and_collect(sys.argv[1], fail_dir=sys.argv[2], workers=1,
+                                             low_memory=sys.argv[3] == "1")
+print(json.dumps({"baseline": baseline, "peak": OpenCVUtils.last_stats["peak_rss_mb"]["self"],
+                  "seconds": OpenCVUtils.last_stats["seconds"]}))
+"""
+
+
+def run(image_dir, low_memory):
+    # 失败图片会被移走，每次在副本上运行
+    work = tempfile.mkdtemp()
+    try:
+        images = shutil.copytree(image_dir, os.path.join(work, "images"))
+        out = subprocess.run([sys.executable, "-c", CHILD, images, os.path.join(work, "fail"),
+                              "1" if low_memory else "0"],
+                             check=True, capture_output=True, text=True, cwd=ROOT)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mp", type=float, default=50, help="合成图片像素数（百万）")
+    parser.add_argument("--images", type=int, default=4, help="合成图片数量")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first = os.path.join(tmp, "IMG_000.jpg")
+        # Linux 子进程会继承父进程的 ru_maxrss，合成大图也放到子进程里做，保持父进程内存很小
+        out = subprocess.run([sys.executable, "-c", "import sys; from tools.bench_metrics import make_image; "
+                              "print(*make_image(sys.argv[1], float(sys.argv[2])))", first, str(args.mp)],
+                             check=True, capture_output=True, text=True, cwd=ROOT)
+        w, h = out.stdout.split()
+        for i in range(1, args.images):
+            shutil.copy(first, os.path.join(tmp, f"IMG_{i:03d}.jpg"))
+        print(f"{args.images} synthetic images: {w}x{h}")
+
+        for low_memory in (False, True):
+            r = run(tmp, low_memory)
+            name = "low-memory" if low_memory else "default"
+            print(f"{name:<11}: peak RSS {r['peak']:8.1f} MB (import baseline {r['baseline']:.1f} MB), "
+                  f"{r['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# tools/bench_metrics.py
+"""
+图片指标计算微基准：对比旧路径（check_3a + check_abnormal_image 各自解码）、融合指标计算与分块检查
+
+用法（在 AID 目录下）：
+    python -m tools.bench_metrics --mp 50 --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from utils.opencv_utils import OpenCVUtils
+
+
+def legacy_check(image_path):
+    """旧实现：两个检查各自 imread + cvtColor + mean"""
+    def load():
+        return cv2.imread(image_path)
+
+    # check_3a
+    img = load()
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    brightness = float(np.mean(gray))
+    mean_b, mean_g, mean_r = cv2.mean(img)[:3]
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+    # check_abnormal_image
+    img = load()
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    brightness = float(np.mean(gray))
+    mean_b, mean_g, mean_r = cv2.mean(img)[:3]
+    return brightness, (mean_r, mean_g, mean_b), sharpness
+
+
+def fused_check(image_path):
+    m = OpenCVUtils.compute_metrics(image_path)
+    return m.brightness, (m.mean_r, m.mean_g, m.mean_b), m.sharpness
+
+
+def tiled_check(image_path, grid=(4, 4)):
+    img = OpenCVUtils._load_image(image_path)
+    m = OpenCVUtils.compute_metrics(img, with_sharpness=False)
+    t = OpenCVUtils.compute_tile_metrics(img, grid)
+    return m.brightness, t
+
+
+def make_image(path, megapixels):
+    h = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    w = int(h * 4 / 3)
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 255, (h // 16, w // 16, 3), dtype=np.uint8)
+    img = cv2.resize(small, (w, h), interpolation=cv2.INTER_CUBIC)
+    cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return w, h
+
+
+def timeit(fn, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image", help="使用已有 JPG，不指定则生成合成图片")
+    parser.add_argument("--mp", type=float, default=12, help="合成图片像素数（百万）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--grid", type=int, nargs=2, default=[4, 4], metavar=("ROWS", "COLS"), help="分块网格")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.image
+        if not path:
+            path = os.path.join(tmp, "bench.jpg")
+            w, h = make_image(path, args.mp)
+            print(f"synthetic image: {w}x{h}")
+
+        legacy = timeit(legacy_check, path, args.repeat)
+        fused = timeit(fused_check, path, args.repeat)
+        tiled = timeit(lambda p: tiled_check(p, tuple(args.grid)), path, args.repeat)
+
+    print(f"legacy (2 decodes): {legacy * 1000:8.1f} ms")
+    print(f"fused  (1 decode) : {fused * 1000:8.1f} ms")
+    print(f"speedup           : {legacy / fused:8.2f}x")
+    print(f"tiled {args.grid[0]}x{args.grid[1]} (1 decode): {tiled * 1000:8.1f} ms ({tiled / fused:.2f}x fused)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# tools/bench_trace.py
+"""
+测量埋点关闭时 trace.traced / trace.span 的额外开销（每次调用），
+超过 --budget-us 时返回码为 1，用于防止关闭埋点后仍拖慢热点路径
+
+用法（在 AID 目录下）：
+    python -m tools.bench_trace --calls 1000000
+"""
+import argparse
+import sys
+import time
+
+from utils import trace
+
+OVERHEAD_BUDGET_US = 2.0  # 埋点关闭时每次调用的额外开销上限（微秒）
+
+
+def _loop(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(calls=1000000, repeat=5):
+    """
+    :return: {"traced_us": 装饰器开销, "span_us": with span 开销}，各取多次运行的最小值
+    """
+    def plain():
+        return 1
+
+    def with_span():
+        with trace.span("x"):
+            return 1
+
+    wrapped = trace.traced("plain")(plain)
+    trace.enable(False)
+    base = min(_loop(plain, calls) for _ in range(repeat))
+    return {
+        "traced_us": (min(_loop(wrapped, calls) for _ in range(repeat)) - base) / calls * 1e6,
+        "span_us": (min(_loop(with_span, calls) for _ in range(repeat)) - base) / calls * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000000, help="每轮调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="运行轮数，取最小值")
+    parser.add_argument("--budget-us", type=float, default=OVERHEAD_BUDGET_US, help="每次调用的额外开销上限")
+    args = parser.parse_args()
+
+    stats = measure(args.calls, args.repeat)
+    print(f"disabled trace.traced: {stats['traced_us']:.3f} us / call")
+    print(f"disabled trace.span  : {stats['span_us']:.3f} us / call")
+    print(f"budget               : {args.budget_us:.3f} us / call")
+    sys.exit(0 if max(stats.values()) <= args.budget_us else 1)
+
+
+if __name__ == "__main__":
+    main()
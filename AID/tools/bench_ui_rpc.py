@@ -0,0 +1,49 @@
+# tools/bench_ui_rpc.py
+"""
+统计 UIAutomatorHelper 常用操作的 RPC 次数：直接选择器（旧行为） vs 界面快照
+
+用法（在 AID 目录下）：
+    python -m tools.bench_ui_rpc
+"""
+import logging
+from unittest import mock
+
+from tools.fakes.fake_device import FakeCameraDevice
+from utils import uiautomator_helper
+from utils.uiautomator_helper import UIAutomatorHelper
+
+SCENARIOS = [
+    ("set_live_photo(True)", lambda ui: ui.set_live_photo(True)),
+    ("set_live_photo(False)", lambda ui: ui.set_live_photo(False)),
+    ("set_zoom(2.0)", lambda ui: ui.set_zoom(2.0)),
+    ("set_ratio('1:1')", lambda ui: ui.set_ratio("1:1")),
+    ("switch_video_mode", lambda ui: ui.switch_video_mode()),
+    ("switch_camera_mode", lambda ui: ui.switch_camera_mode()),
+]
+
+# 与 tests/common/test_take_zoom_picture.py、test_take_ratio_picture.py 一致的操作序列
+TEST_CASES = {
+    "test_take_zoom_picture": lambda ui: [ui.set_zoom(z) for z in (0.7, 1.0, 2.0, 5.0, 10.0)],
+    "test_take_ratio_picture": lambda ui: [ui.set_ratio(r) for r in ("1:1", "3:4", "9:16", "full", "3:4")],
+    "test_take_livephoto_picture": lambda ui: (ui.set_live_photo(True), ui.set_live_photo(False)),
+}
+
+
+def count_rpc(action, use_snapshot):
+    device = FakeCameraDevice()
+    ui = UIAutomatorHelper(use_snapshot=use_snapshot, device=device)
+    action(ui)
+    return device.rpc
+
+
+def main():
+    logging.disable(logging.INFO)
+    # 界面等待与 RPC 次数无关，基准中跳过
+    with mock.patch.object(uiautomator_helper.time, "sleep"):
+        print(f"{'operation':<30}{'direct':>8}{'snapshot':>10}")
+        for name, action in list(SCENARIOS) + list(TEST_CASES.items()):
+            print(f"{name:<30}{count_rpc(action, False):>8}{count_rpc(action, True):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# tools/calibrate_fast_mode.py
+"""
+快速解码模式校准报告：对比原图与缩放解码下的指标漂移、判定翻转、耗时与峰值常驻内存
+（每种解码模式在独立子进程中计算，峰值 RSS 包含 OpenCV / numpy 的原生缓冲区）
+
+用法（在 AID 目录下）：
+    python -m tools.calibrate_fast_mode /path/to/jpgs --decode-scale 4 --sharpness-scale 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from glob import glob
+
+from utils.opencv_utils import OpenCVUtils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程先导入 cv2 / numpy 记下基线，再按指定解码参数计算全部图片，输出自身的峰值 RSS
+CHILD = """
+import json, sys
+import cv2, numpy
+from utils.opencv_utils import OpenCVUtils, peak_rss_mb
+job = json.load(sys.stdin)
+baseline = peak_rss_mb()
+for f in job["files"]:
+    OpenCVUtils.compute_metrics(f, **job["kwargs"])
+peak = peak_rss_mb()
+print(json.dumps(peak and {"baseline": baseline["self"], "peak": peak["self"]}))
+"""
+
+
+def measure(path, **kwargs):
+    """返回 (ImageMetrics, 耗时秒)"""
+    start = time.perf_counter()
+    m = OpenCVUtils.compute_metrics(path, **kwargs)
+    return m, time.perf_counter() - start
+
+
+def peak_rss(files, **kwargs):
+    """
+    在独立子进程中按 kwargs 解码并计算全部图片
+    :return: {"baseline": 导入后 MB, "peak": 峰值 MB}，不支持 resource 模块的平台返回 None
+    """
+    out = subprocess.run([sys.executable, "-c", CHILD], input=json.dumps({"files": files, "kwargs": kwargs}),
+                         check=True, capture_output=True, text=True, cwd=ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def verdicts(m, sharpness_threshold, brightness_range=(50, 200), wb_tolerance=25):
+    r = OpenCVUtils._eval_3a(m, "", brightness_range, wb_tolerance, sharpness_threshold)
+    return {"AE": r["exposure"], "AWB": r["white_balance"], "AF": r["focus"], "Abnormal": m.abnormal}
+
+
+def calibrate(files, decode_scale, sharpness_scale=None, sharpness_threshold=80):
+    drift = {"brightness": [], "mean_r": [], "mean_g": [], "mean_b": []}
+    sharp_ratio = []
+    # Linux 子进程会继承父进程的 ru_maxrss：在本进程解码大图之前先测内存
+    rss = {"full": peak_rss(files),
+           "fast": peak_rss(files, decode_scale=decode_scale, sharpness_scale=sharpness_scale)}
+    full_time = fast_time = 0.0
+    samples = []
+
+    for f in files:
+        full, t_full = measure(f)
+        fast, t_fast = measure(f, decode_scale=decode_scale, sharpness_scale=sharpness_scale)
+        full_time += t_full
+        fast_time += t_fast
+
+        for key in drift:
+            drift[key].append(abs(getattr(fast, key) - getattr(full, key)))
+        if full.sharpness:
+            sharp_ratio.append(fast.sharpness / full.sharpness)
+        samples.append((full, fast))
+
+    # 清晰度随分辨率变化，按中位比例换算阈值后再比较判定
+    ratio = statistics.median(sharp_ratio) if sharp_ratio else 1.0
+    fast_threshold = sharpness_threshold * ratio
+    flips = {"AE": 0, "AWB": 0, "AF": 0, "Abnormal": 0}
+    for full, fast in samples:
+        a = verdicts(full, sharpness_threshold)
+        b = verdicts(fast, fast_threshold)
+        for key in flips:
+            flips[key] += a[key] != b[key]
+
+    n = len(files)
+    return {
+        "images": n,
+        "decode_scale": decode_scale,
+        "sharpness_scale": sharpness_scale or decode_scale,
+        "drift": {
+            key: {"mean": round(statistics.fmean(v), 3), "max": round(max(v), 3)}
+            for key, v in drift.items()
+        },
+        "sharpness_ratio_median": round(ratio, 4),
+        "suggested_sharpness_threshold": round(fast_threshold, 2),
+        "verdict_flips": flips,
+        "avg_ms": {"full": round(full_time / n * 1000, 1), "fast": round(fast_time / n * 1000, 1)},
+        "peak_rss_mb": rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JPG 目录")
+    parser.add_argument("--decode-scale", type=int, default=4, choices=[2, 4, 8])
+    parser.add_argument("--sharpness-scale", type=int, choices=[1, 2, 4, 8])
+    parser.add_argument("--sharpness-threshold", type=float, default=80)
+    parser.add_argument("--json", help="把报告写入该 JSON 文件")
+    args = parser.parse_args()
+
+    files = sorted(glob(os.path.join(args.path, "*.jpg")))
+    if not files:
+        raise FileNotFoundError(f"No images found in: {args.path}")
+
+    report = calibrate(files, args.decode_scale, args.sharpness_scale, args.sharpness_threshold)
+
+    print(f"images: {report['images']}  decode_scale: {report['decode_scale']}  "
+          f"sharpness_scale: {report['sharpness_scale']}")
+    for key, d in report["drift"].items():
+        print(f"  {key:<10} drift mean={d['mean']:<8} max={d['max']}")
+    print(f"  sharpness ratio (fast/full) median={report['sharpness_ratio_median']} "
+          f"-> suggested sharpness_threshold={report['suggested_sharpness_threshold']}")
+    print(f"  verdict flips: {report['verdict_flips']}")
+    print(f"  avg decode+metrics: full={report['avg_ms']['full']} ms  fast={report['avg_ms']['fast']} ms")
+    for mode, rss in report["peak_rss_mb"].items():
+        if rss is None:
+            print(f"  peak RSS ({mode}): 当前平台不支持 resource 模块")
+        else:
+            print(f"  peak RSS ({mode}):   {rss['peak']:.1f} MB (+{rss['peak'] - rss['baseline']:.1f} MB over import baseline)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+无真机时使用的模拟设备：fake_adb（adb 可执行文件）、fake_device（uiautomator2 设备），
+单元测试与 tools 下的基准工具共用
+"""
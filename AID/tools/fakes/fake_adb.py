@@ -0,0 +1,200 @@
+# tools/fakes/fake_adb.py
+"""
+模拟 adb 可执行文件，设备文件系统映射到 FAKE_ADB_ROOT 目录下
+
+环境变量：
+    FAKE_ADB_ROOT   设备根目录（/sdcard/... -> $FAKE_ADB_ROOT/sdcard/...）
+    FAKE_ADB_LOG    每次调用追加一行参数，便于统计进程数
+    FAKE_ADB_DELAY  每次进程启动的模拟延迟（秒）
+    FAKE_ADB_DEVICES adb devices 输出的设备列表（逗号分隔）
+    FAKE_ADB_SHUTTER_DIR 设置后每次 input tap 在该目录下生成一张照片，模拟按下快门
+    FAKE_ADB_LAUNCH_MS am start -W 输出的启动耗时（毫秒）；带 -S 时 LaunchState 为 COLD，否则为 HOT
+
+单元测试（conftest.fake_adb）和基准工具（tools.bench_fixture_setup）都通过 install() 安装
+"""
+import glob
+import os
+import shlex
+import shutil
+import sys
+import time
+
+ROOT = os.environ.get("FAKE_ADB_ROOT", "/tmp/fake_adb_root")
+
+
+def local(remote):
+    return os.path.join(ROOT, remote.lstrip("/"))
+
+
+def remote(local_path):
+    return "/" + os.path.relpath(local_path, ROOT)
+
+
+def install(bin_dir):
+    """
+    在 bin_dir 下生成名为 adb 的可执行脚本，转发到本模块；调用方把 bin_dir 放到 PATH 最前面
+    :return: 脚本路径
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    adb = os.path.join(bin_dir, "adb")
+    with open(adb, "w") as fp:
+        fp.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.abspath(__file__)}" "$@"\n')
+    os.chmod(adb, 0o755)
+    return adb
+
+
+def expand(pattern):
+    return sorted(glob.glob(local(pattern)))
+
+
+def run_shell(argv):
+    """执行一条设备端 shell 命令，返回退出码"""
+    if not argv:
+        return 0
+    cmd, args = argv[0], argv[1:]
+
+    if cmd == "ls":
+        matches = [m for a in args for m in expand(a)]
+        if not matches:
+            print(f"ls: {' '.join(args)}: No such file or directory", file=sys.stderr)
+            return 1
+        print("\n".join(remote(m) for m in matches))
+        return 0
+
+    if cmd == "rm":
+        code = 0
+        for a in (a for a in args if not a.startswith("-")):
+            matches = expand(a)
+            if not matches:
+                print(f"rm: {a}: No such file or directory", file=sys.stderr)
+                code = 1
+            for m in matches:
+                os.remove(m)
+        return code
+
+    if cmd == "stat" and args[:1] == ["-c"]:
+        fmt, paths = args[1], args[2:]
+        matches = [m for a in paths for m in expand(a)]
+        for m in matches:
+            st = os.stat(m)
+            print(fmt.replace("%n", remote(m)).replace("%s", str(st.st_size)).replace("%Y", str(int(st.st_mtime))))
+        return 0 if matches else 1
+
+    if cmd == "head" and args[:1] == ["-c"]:
+        code = 0
+        for path in args[2:]:
+            if not os.path.exists(local(path)):
+                print(f"head: {path}: No such file or directory", file=sys.stderr)
+                code = 1
+                continue
+            with open(local(path), "rb") as fp:
+                sys.stdout.flush()
+                sys.stdout.buffer.write(fp.read(int(args[1])))
+                sys.stdout.buffer.flush()
+        return code
+
+    if cmd == "input" and args[:1] == ["tap"] and os.environ.get("FAKE_ADB_SHUTTER_DIR"):
+        shutter_dir = local(os.environ["FAKE_ADB_SHUTTER_DIR"])
+        os.makedirs(shutter_dir, exist_ok=True)
+        with open(os.path.join(shutter_dir, f"IMG_{time.time_ns()}.jpg"), "wb") as fp:
+            fp.write(b"\xff\xd8" + b"\0" * 1024)
+        return 0
+
+    if cmd == "am":
+        if args[:1] == ["start"] and "-W" in args:
+            ms = int(os.environ.get("FAKE_ADB_LAUNCH_MS", "800"))
+            state = "COLD" if "-S" in args else "HOT"
+            print(f"Starting: Intent {{ cmp={args[-1]} }}\nStatus: ok\nLaunchState: {state}\n"
+                  f"Activity: {args[-1]}\nThisTime: {ms}\nTotalTime: {ms}\nWaitTime: {ms + 15}\nComplete")
+        return 0
+
+    if cmd == "getprop":
+        if args == ["ro.build.fingerprint"]:
+            print(os.environ.get("FAKE_ADB_FINGERPRINT", "fake/camera/device:14/UP1A/1:user/release-keys"))
+        return 0
+
+    if cmd in ("settings", "input", "root", "remount", "true", "echo"):
+        if cmd == "echo":
+            print(" ".join(args))
+        return 0
+
+    print(f"/system/bin/sh: {cmd}: not found", file=sys.stderr)
+    return 127
+
+
+def interactive_shell():
+    """
+    无参数 adb shell：从 stdin 逐行读取命令，支持 AdbShellSession 追加的
+    "cmd 2>&1; printf '\\n%s %s\\n' MARKER $?" 结束标记
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        cmd, sep, tail = line.partition(" 2>&1; printf ")
+        cmd = cmd.strip()
+        code = 0
+        for part in cmd.split(";"):
+            sys.stderr = sys.stdout
+            code = run_shell(shlex.split(part))
+            sys.stderr = sys.__stderr__
+        if sep:
+            marker = shlex.split(tail)[1]
+            sys.stdout.write(f"\n{marker} {code}\n")
+        sys.stdout.flush()
+    return 0
+
+
+def main(argv):
+    if os.environ.get("FAKE_ADB_DELAY"):
+        time.sleep(float(os.environ["FAKE_ADB_DELAY"]))
+    if os.environ.get("FAKE_ADB_LOG"):
+        with open(os.environ["FAKE_ADB_LOG"], "a", encoding="utf-8") as fp:
+            fp.write(" ".join(argv) + "\n")
+
+    if argv[:1] == ["-s"]:
+        argv = argv[2:]
+    if not argv:
+        return 1
+    cmd, args = argv[0], argv[1:]
+
+    if cmd == "shell" and not args:
+        return interactive_shell()
+
+    if cmd == "shell":
+        # adb 会把参数拼接成一条命令交给设备端 sh
+        return run_shell(shlex.split(" ".join(args)))
+
+    if cmd == "exec-out":
+        # 与 shell 相同，但 stdout 为原始字节流；支持以 ; 分隔的多条命令
+        code = 0
+        for part in " ".join(args).split(";"):
+            code = run_shell(shlex.split(part))
+        return code
+
+    if cmd == "pull":
+        *sources, dest = args
+        sources = [s for s in sources if not s.startswith("-")]
+        pulled = 0
+        for s in sources:
+            src = local(s)
+            if not os.path.exists(src):
+                print(f"adb: error: remote object '{s}' does not exist", file=sys.stderr)
+                return 1
+            target = os.path.join(dest, os.path.basename(s)) if os.path.isdir(dest) else dest
+            shutil.copyfile(src, target)
+            pulled += 1
+        print(f"{pulled} files pulled, 0 skipped.")
+        return 0
+
+    if cmd == "devices":
+        print("List of devices attached")
+        for serial in filter(None, os.environ.get("FAKE_ADB_DEVICES", "").split(",")):
+            print(f"{serial}\tdevice")
+        return 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
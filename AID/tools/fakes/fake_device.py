@@ -0,0 +1,118 @@
+# tools/fakes/fake_device.py
+"""
+模拟 uiautomator2 设备：界面由若干控件组成，点击控件可切换界面状态，
+统计与 uiautomator2 server 之间的 RPC 次数，用于在无真机时评估 UI 层开销
+"""
+import time
+
+
+class FakeUiObject:
+    def __init__(self, device, selector):
+        self.device = device
+        self.selector = selector
+
+    @property
+    def exists(self):
+        self.device.rpc += 1
+        return self.device.find(self.selector) is not None
+
+    @property
+    def info(self):
+        self.device.rpc += 1
+        left, top, right, bottom = self.device.find(self.selector)["bounds"]
+        return {"bounds": {"left": left, "top": top, "right": right, "bottom": bottom}}
+
+    def wait(self, exists=True, timeout=None):
+        self.device.rpc += 1
+        return (self.device.find(self.selector) is not None) == exists
+
+    def click(self):
+        # uiautomator2 的 UiObject.click 先等待控件出现再取坐标点击，至少两次往返
+        self.device.rpc += 2
+        node = self.device.find(self.selector)
+        if node is None:
+            raise RuntimeError(f"UiObjectNotFoundError: {self.selector}")
+        self.device.tap(node)
+
+
+class FakeCameraDevice:
+    """
+    相机界面：主界面含快门、模式切换、Live Photo、变焦按钮；
+    点击“更多”进入菜单，点击“画幅”进入画幅选择，选择后返回主界面
+    """
+
+    serial = "fake-device"
+    KEYS = {"resourceId": "resource-id", "text": "text", "description": "content-desc"}
+
+    def __init__(self, rpc_latency=0.0):
+        self.rpc = 0
+        self.rpc_latency = rpc_latency
+        self.live_photo = False
+        self.screen = "main"
+        self.taps = []
+
+    def nodes(self):
+        live = "动态照片，开启状态" if self.live_photo else "动态照片，关闭状态"
+        if self.screen == "main":
+            nodes = [
+                {"resource-id": "com.android.camera:id/snap_layout", "bounds": (480, 2000, 600, 2120)},
+                {"resource-id": "com.android.camera:id/menu_indicator", "bounds": (40, 100, 120, 180)},
+                {"content-desc": live, "bounds": (200, 100, 280, 180)},
+                {"text": "拍照", "bounds": (400, 1850, 480, 1900)},
+                {"text": "录像", "bounds": (520, 1850, 600, 1900)},
+                {"text": "人像", "bounds": (640, 1850, 720, 1900)},
+            ]
+            nodes += [{"content-desc": f"{z:.1f}倍变焦", "bounds": (300 + i * 100, 1700, 380 + i * 100, 1780)}
+                      for i, z in enumerate((0.7, 1.0, 2.0, 5.0, 10.0))]
+            return nodes
+        if self.screen == "menu":
+            return [{"text": "画幅", "bounds": (100, 600, 300, 680)}]
+        return [{"content-desc": d, "bounds": (100, 600 + i * 100, 300, 680 + i * 100)}
+                for i, d in enumerate(("画幅一比一", "画幅三比四", "画幅九比十六", "画幅全屏"))]
+
+    def find(self, selector):
+        for node in self.nodes():
+            if all(node.get(self.KEYS[k]) == v for k, v in selector.items()):
+                return node
+        return None
+
+    def tap(self, node):
+        self.taps.append(node)
+        desc, text = node.get("content-desc", ""), node.get("text")
+        if desc.startswith("动态照片"):
+            self.live_photo = not self.live_photo
+        elif node.get("resource-id", "").endswith("menu_indicator"):
+            self.screen = "menu"
+        elif text == "画幅":
+            self.screen = "ratio"
+        elif desc.startswith("画幅"):
+            self.screen = "main"
+
+    def _call(self):
+        self.rpc += 1
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+    def __call__(self, **selector):
+        return FakeUiObject(self, selector)
+
+    def dump_hierarchy(self):
+        self._call()
+        rows = []
+        for node in self.nodes():
+            left, top, right, bottom = node["bounds"]
+            attrs = " ".join(f'{k}="{v}"' for k, v in node.items() if k != "bounds")
+            rows.append(f'<node {attrs} bounds="[{left},{top}][{right},{bottom}]" />')
+        return "<hierarchy>" + "".join(rows) + "</hierarchy>"
+
+    def click(self, x, y):
+        self._call()
+        for node in self.nodes():
+            left, top, right, bottom = node["bounds"]
+            if left <= x <= right and top <= y <= bottom:
+                self.tap(node)
+                return
+
+    def press(self, key):
+        self._call()
+        self.screen = "main"
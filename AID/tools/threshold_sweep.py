@@ -0,0 +1,181 @@
+"""
+阈值扫描：历史照片的原始指标只计算一次，按列存成 .npz，之后在内存中向量化地
+扫描 brightness_range / wb_tolerance / sharpness_threshold / brightness_threshold / color_ratio
+的组合，输出每组阈值的通过/失败数，无需重新跑真机用例
+
+用法（在 AID 目录下）：
+    python -m tools.threshold_sweep extract /path/to/jpgs metrics.npz --workers 0
+    python -m tools.threshold_sweep sweep metrics.npz --brightness-range 50:200 40:210 \\
+        --wb-tolerance 20 25 30 --sharpness-threshold 60 80 100 --color-ratio 1.3 1.5 --csv sweep.csv
+"""
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from glob import glob
+
+import numpy as np
+
+from utils.opencv_utils import OpenCVUtils
+
+COLUMNS = ("brightness", "mean_r", "mean_g", "mean_b", "sharpness")
+
+
+def _raw_metrics(path, decode_scale=1, sharpness_scale=None):
+    m = OpenCVUtils.compute_metrics(path, decode_scale=decode_scale, sharpness_scale=sharpness_scale)
+    return tuple(getattr(m, c) for c in COLUMNS)
+
+
+def extract(files, out_path, workers=1, decode_scale=1, sharpness_scale=None):
+    """
+    计算原始指标并按列写入 out_path（.npz）；out_path 已存在时只计算新增文件
+    :return: 指标字典 {"path": ndarray[str], 各列: ndarray[float64]}
+    """
+    existing = load(out_path) if os.path.exists(out_path) else None
+    if existing is not None:
+        if (int(existing["decode_scale"]), int(existing["sharpness_scale"])) != (decode_scale, sharpness_scale or 0):
+            raise ValueError(f"{out_path} 使用了不同的 decode_scale/sharpness_scale，请换一个输出文件")
+        done = set(existing["path"].tolist())
+        files = [f for f in files if f not in done]
+
+    compute = partial(_raw_metrics, decode_scale=decode_scale, sharpness_scale=sharpness_scale)
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    if workers <= 1:
+        rows = list(map(compute, files))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=OpenCVUtils._init_worker) as pool:
+            rows = list(pool.map(compute, files, chunksize=16))
+
+    table = np.array(rows, dtype=np.float64).reshape(len(rows), len(COLUMNS))
+    data = {"path": np.array(files, dtype=str)}
+    data.update({c: table[:, i] for i, c in enumerate(COLUMNS)})
+    if existing is not None:
+        data = {k: np.concatenate([existing[k], data[k]]) for k in ("path",) + COLUMNS}
+
+    np.savez_compressed(out_path, decode_scale=decode_scale, sharpness_scale=sharpness_scale or 0, **data)
+    return data
+
+
+def load(path):
+    with np.load(path, allow_pickle=False) as npz:
+        return {k: npz[k] for k in npz.files}
+
+
+def sweep(metrics, brightness_ranges=((50, 200),), wb_tolerances=(25,), sharpness_thresholds=(80,),
+          brightness_thresholds=(30,), color_ratios=(1.5,)):
+    """
+    对所有阈值组合向量化求值，判定规则与 OpenCVUtils._eval_3a / _classify_abnormal 一致
+    :return: 每个组合一行 dict：阈值 + AE/AWB/AF/black/green/purple 失败数 + pass/fail
+    """
+    b = metrics["brightness"]
+    r, g, bl = metrics["mean_r"], metrics["mean_g"], metrics["mean_b"]
+    n = len(b)
+
+    # 每个维度单独求出 [取值数, 图片数] 的通过矩阵
+    ae = np.array([(b >= lo) & (b <= hi) for lo, hi in brightness_ranges]).reshape(-1, n)
+    spread = np.maximum(np.maximum(np.abs(r - g), np.abs(g - bl)), np.abs(r - bl))
+    awb = spread[None, :] < np.asarray(wb_tolerances, dtype=np.float64)[:, None]
+    af = metrics["sharpness"][None, :] >= np.asarray(sharpness_thresholds, dtype=np.float64)[:, None]
+
+    black = b[None, :] < np.asarray(brightness_thresholds, dtype=np.float64)[:, None]
+    ratio = np.asarray(color_ratios, dtype=np.float64)[:, None]
+    green = (g > r * ratio) & (g > bl * ratio)
+    purple = (r + bl) / 2 > g * ratio
+
+    # 异常图分类只依赖 (brightness_threshold, color_ratio)：[nB, nC, 图片数]
+    not_black = ~black[:, None, :]
+    is_green = green[None, :, :] & not_black
+    is_purple = purple[None, :, :] & not_black & ~green[None, :, :]
+    clean = not_black & ~green[None, :, :] & ~purple[None, :, :]
+
+    # 通过数 = Σ_图片 ae[i]·awb[j]·af[k]·clean[m, c]，einsum 按矩阵乘法收缩图片维度，
+    # 不生成 [组合数, 图片数] 的中间矩阵
+    passed = np.einsum("in,jn,kn,mcn->ijkmc", ae.astype(np.float64), awb.astype(np.float64),
+                       af.astype(np.float64), clean.astype(np.float64), optimize=True).round().astype(np.int64)
+    fail_ae = n - np.count_nonzero(ae, axis=1)
+    fail_awb = n - np.count_nonzero(awb, axis=1)
+    fail_af = n - np.count_nonzero(af, axis=1)
+    n_black = np.count_nonzero(black, axis=1)
+    n_green = np.count_nonzero(is_green, axis=2)
+    n_purple = np.count_nonzero(is_purple, axis=2)
+
+    # 以下只组装输出行，顺序与 itertools.product(各维度) 一致
+    rows = []
+    for i, j, k, m, c in np.ndindex(passed.shape):
+        lo, hi = brightness_ranges[i]
+        rows.append({
+            "brightness_range": f"{lo:g}:{hi:g}",
+            "wb_tolerance": wb_tolerances[j],
+            "sharpness_threshold": sharpness_thresholds[k],
+            "brightness_threshold": brightness_thresholds[m],
+            "color_ratio": color_ratios[c],
+            "AE": int(fail_ae[i]),
+            "AWB": int(fail_awb[j]),
+            "AF": int(fail_af[k]),
+            "black": int(n_black[m]),
+            "green": int(n_green[m, c]),
+            "purple": int(n_purple[m, c]),
+            "pass": int(passed[i, j, k, m, c]),
+            "fail": n - int(passed[i, j, k, m, c]),
+        })
+    return rows
+
+
+def _range(text):
+    lo, _, hi = text.partition(":")
+    return float(lo), float(hi)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("extract", help="计算原始指标并写入 .npz")
+    p.add_argument("path", help="JPG 目录（递归查找）")
+    p.add_argument("out", help="输出 .npz 文件，已存在时增量追加")
+    p.add_argument("--workers", type=int, default=0, help="进程数，0 为全部 CPU 核心")
+    p.add_argument("--decode-scale", type=int, default=1, choices=[1, 2, 4, 8])
+    p.add_argument("--sharpness-scale", type=int, choices=[1, 2, 4, 8])
+
+    p = sub.add_parser("sweep", help="在已保存的指标上扫描阈值组合")
+    p.add_argument("metrics", help="extract 生成的 .npz 文件")
+    p.add_argument("--brightness-range", type=_range, nargs="+", default=[(50, 200)], metavar="LO:HI")
+    p.add_argument("--wb-tolerance", type=float, nargs="+", default=[25])
+    p.add_argument("--sharpness-threshold", type=float, nargs="+", default=[80])
+    p.add_argument("--brightness-threshold", type=float, nargs="+", default=[30])
+    p.add_argument("--color-ratio", type=float, nargs="+", default=[1.5])
+    p.add_argument("--csv", help="把结果写入该 CSV 文件")
+    args = parser.parse_args()
+
+    if args.command == "extract":
+        files = sorted(glob(os.path.join(args.path, "**", "*.jpg"), recursive=True))
+        if not files:
+            raise FileNotFoundError(f"No images found in: {args.path}")
+        start = time.perf_counter()
+        data = extract(files, args.out, args.workers, args.decode_scale, args.sharpness_scale)
+        print(f"{len(data['path'])} images -> {args.out} ({time.perf_counter() - start:.1f}s)")
+        return
+
+    metrics = load(args.metrics)
+    start = time.perf_counter()
+    rows = sweep(metrics, args.brightness_range, args.wb_tolerance, args.sharpness_threshold,
+                 args.brightness_threshold, args.color_ratio)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    header = list(rows[0])
+    print(" ".join(f"{h:>20}" if i < 5 else f"{h:>7}" for i, h in enumerate(header)))
+    for row in rows:
+        print(" ".join(f"{str(row[h]):>20}" if i < 5 else f"{row[h]:>7}" for i, h in enumerate(header)))
+    print(f"{len(rows)} combinations over {len(metrics['path'])} images in {elapsed:.1f} ms")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as fp:
+            writer = csv.DictWriter(fp, fieldnames=header)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+延迟导入与延迟日志配置：cv2 / numpy / openpyxl / uiautomator2 在第一次真正使用时才导入，
+pytest 收集用例（--collect-only）和只用到 adb 的工具不再承担几百毫秒的导入开销
+"""
+import sys
+import logging
+import importlib
+
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+
+class LazyModule:
+    """
+    模块代理：第一次访问属性时导入真实模块；传入 namespace 时同时把 namespace[alias] 替换为真实模块，
+    之后该模块内的访问不再经过代理，热点循环中没有额外开销
+    """
+    __slots__ = ("_name", "_namespace", "_alias", "_module")
+
+    def __init__(self, name, namespace=None, alias=None):
+        self._name = name
+        self._namespace = namespace
+        self._alias = alias
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+            if self._namespace is not None and self._namespace.get(self._alias) is self:
+                self._namespace[self._alias] = self._module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name, namespace=None, alias=None):
+    """
+    用法：cv2 = lazy_import("cv2", globals())
+    :param namespace: 调用方模块的 globals()，导入后把代理替换为真实模块
+    :param alias: 在 namespace 中的变量名，默认取模块名最后一段
+    :return: 已导入时直接返回模块，否则返回 LazyModule
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name, namespace, alias or name.rsplit(".", 1)[-1])
+
+
+def basic_logging(level=logging.INFO):
+    """第一次真正做事（分析图片、写报告）时再配置根日志，import 本身没有副作用；已配置时不覆盖"""
+    logging.basicConfig(level=level, format=LOG_FORMAT)
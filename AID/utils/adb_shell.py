@@ -0,0 +1,138 @@
+import uuid
+import queue
+import logging
+import threading
+import subprocess
+from typing import NamedTuple
+
+logger = logging.getLogger("AdbShell")
+
+
+class ShellResult(NamedTuple):
+    """单条 shell 命令的执行结果"""
+    code: int
+    output: str
+
+    @property
+    def ok(self):
+        return self.code == 0
+
+
+class AdbShellSession:
+    """
+    常驻 adb shell 连接：只启动一个 adb 进程，命令通过 stdin 逐条写入，
+    每条命令后追加结束标记和退出码，从 stdout 中按标记切分出各自的输出
+    """
+
+    def __init__(self, adb_cmd, timeout=30):
+        """
+        :param adb_cmd: adb 命令前缀，例如 ["adb", "-s", "serial"]
+        :param timeout: 单条命令默认超时时间（秒）
+        """
+        self.adb_cmd = list(adb_cmd)
+        self.timeout = timeout
+        self._proc = None
+        self._lines = None
+        self._marker = f"__AID_END_{uuid.uuid4().hex}__"
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self):
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self):
+        if self.alive:
+            return
+        self._proc = subprocess.Popen(
+            self.adb_cmd + ["shell"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace", bufsize=1
+        )
+        self._lines = queue.Queue()
+        threading.Thread(target=self._reader, args=(self._proc.stdout, self._lines), daemon=True).start()
+        logger.debug(f"adb shell 会话已建立: {' '.join(self.adb_cmd)}")
+
+    @staticmethod
+    def _reader(stream, lines):
+        for line in stream:
+            lines.put(line.rstrip("\n"))
+        lines.put(None)
+
+    def _send(self, cmd):
+        # 先求值 $? 再打印，保证拿到的是 cmd 的退出码
+        self._proc.stdin.write(f"{cmd} 2>&1; printf '\\n%s %s\\n' {self._marker} $?\n")
+
+    def _receive(self, timeout):
+        output = []
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                self.close()
+                raise TimeoutError(f"adb shell 命令超时 ({timeout}s)")
+            if line is None:
+                self.close()
+                raise ConnectionError("adb shell 会话意外断开")
+            if line.startswith(self._marker):
+                code = int(line.split()[-1])
+                return ShellResult(code, "\n".join(output).rstrip("\n"))
+            output.append(line)
+
+    def iter_many(self, cmds, timeout=None):
+        """
+        流水线执行多条命令：全部写入后逐条返回结果（每条结果到达即产出，便于记录完成时间）；
+        调用方中途停止迭代时，剩余命令的输出会被读完丢弃，不会串到之后的命令上
+        :return: 迭代与 cmds 顺序一致的 ShellResult
+        """
+        cmds = list(cmds)
+        timeout = timeout or self.timeout
+        with self._lock:
+            self.start()
+            try:
+                for cmd in cmds:
+                    self._send(cmd)
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                self.close()
+                raise ConnectionError(f"adb shell 会话写入失败: {e}")
+            pending = len(cmds)
+            try:
+                while pending:
+                    result = self._receive(timeout)
+                    pending -= 1
+                    yield result
+            finally:
+                if pending:
+                    self._drain(pending, timeout)
+
+    def _drain(self, pending, timeout):
+        """读完并丢弃 pending 条命令的输出；读不完时关闭会话，下次使用重新建立"""
+        try:
+            for _ in range(pending):
+                self._receive(timeout)
+        except (TimeoutError, ConnectionError):
+            logger.warning(f"丢弃剩余 {pending} 条命令输出失败，已重置 adb shell 会话")
+
+    def run_many(self, cmds, timeout=None):
+        """
+        流水线执行多条命令：全部写入后再依次读取结果
+        :return: 与 cmds 顺序一致的 ShellResult 列表
+        """
+        return list(self.iter_many(cmds, timeout))
+
+    def run(self, cmd, timeout=None):
+        return self.run_many([cmd], timeout)[0]
+
+    def close(self):
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
@@ -1,27 +1,79 @@
 # utils/adb_utils.py
 import os
+import time
 import logging
+import subprocess
+from utils import trace
+from utils.adb_shell import AdbShellSession, ShellResult
 
 logger = logging.getLogger("AdbUtils")
+
+PULL_BATCH_SIZE = 200  # 单次 adb pull 携带的文件数，避免命令行过长
+
+
 class AdbUtils:
-    def __init__(self, device_id: str):
+    def __init__(self, device_id: str, persistent: bool = False):
+        """
+        :param persistent: True 时 shell 命令复用同一个常驻 adb shell 连接，不再每条命令启动一个进程
+        """
         self.device_id = device_id
+        self.persistent = persistent
+        self.last_pull_stats = None
+        self._session = None
+
+    def _adb_cmd(self, *args):
+        """拼接 adb 命令参数，device_id 为空时使用默认设备"""
+        serial = ["-s", self.device_id] if self.device_id else []
+        return ["adb", *serial, *args]
+
+    def _run(self, *args):
+        """执行 adb 命令并返回 CompletedProcess（stdout/stderr 为文本）"""
+        return subprocess.run(self._adb_cmd(*args), capture_output=True, text=True)
+
+    def list_files(self, remote_dir: str, extension: str):
+        """
+        列出手机目录下某类文件
+        :return: 远端文件路径列表
+        """
+        result = self.shell(f"ls {remote_dir}/*.{extension}")
+        return [line.strip() for line in result.output.splitlines()
+                if line.strip().endswith(f".{extension}")]
 
-    def pull_all_file(self, remote_dir: str, extension: str, local_dir: str) -> str:
+    def stat_files(self, remote_dir: str, extension: str):
+        """
+        列出手机目录下某类文件及其大小、修改时间
+        :return: [(远端路径, 字节数, mtime 秒), ...]
+        """
+        result = self.shell(f"stat -c '%n|%s|%Y' {remote_dir}/*.{extension}")
+        entries = []
+        for line in result.output.splitlines():
+            parts = line.strip().rsplit("|", 2)
+            if len(parts) != 3 or not parts[0].endswith(f".{extension}"):
+                continue
+            try:
+                entries.append((parts[0], int(parts[1]), int(parts[2])))
+            except ValueError:
+                logger.warning(f"无法解析 stat 输出: {line}")
+        return entries
+
+    @trace.traced("adb.pull")
+    def pull_all_file(self, remote_dir: str, extension: str, local_dir: str, batch: bool = True) -> str:
         """
         从指定目录中拉取最新的文件到本地
         :param remote_dir: 手机中的目录，例如 /sdcard/DCIM/Camera
         :param extension: 文件扩展名，例如 'jpg' 或 'mp4'
         :param local_dir: 本地保存目录
+        :param batch: True 时所有文件在一次 adb pull 会话中传输，False 时逐个文件拉取
         :return: 本地文件路径
         """
-        cmd = f"adb -s {self.device_id} shell ls {remote_dir}/*.{extension}"
-        result = os.popen(cmd).read().strip()
+        remote_files = self.list_files(remote_dir, extension)
 
-        if not result:
+        if not remote_files:
             raise FileNotFoundError(f"未找到 {remote_dir} 下的 {extension} 文件")
 
-        remote_files = result.splitlines()
+        if batch:
+            return self.pull_files(remote_files, local_dir)
+
         os.makedirs(local_dir, exist_ok=True)
 
         local_files = []
@@ -29,20 +81,106 @@ class AdbUtils:
             filename = os.path.basename(remote_file)
             local_path = os.path.join(local_dir, filename)
             logger.info(f"拉取文件: {remote_file} -> {local_path}")
-            os.system(f"adb -s {self.device_id} pull {remote_file} {local_path}")
-            if os.path.exists(local_path):
+            proc = self._run("pull", remote_file, local_path)
+            if proc.returncode == 0 and os.path.exists(local_path):
                 local_files.append(local_path)
             else:
-                logger.warning(f"文件拉取失败: {remote_file}")
+                logger.warning(f"文件拉取失败: {remote_file} {proc.stderr.strip()}")
 
         return local_files
-    
+
+    @trace.traced("adb.pull")
+    def pull_files(self, remote_files, local_dir: str, batch_size: int = PULL_BATCH_SIZE):
+        """
+        批量拉取文件：多个路径合并到同一次 adb pull，减少进程启动与 USB 握手
+        传输统计（总字节、bytes/s、每个文件耗时）记录在 self.last_pull_stats
+        :param remote_files: 远端文件路径列表
+        :param local_dir: 本地保存目录
+        :return: 拉取成功的本地文件路径列表（与 remote_files 顺序一致）
+        """
+        os.makedirs(local_dir, exist_ok=True)
+        remote_files = list(remote_files)
+        local_files = []
+        per_file = []
+        processes = 0
+        start = time.time()
+
+        for i in range(0, len(remote_files), batch_size):
+            chunk = remote_files[i:i + batch_size]
+            logger.info(f"批量拉取 {len(chunk)} 个文件 -> {local_dir}")
+            chunk_start = time.time()
+            result = self._run("pull", *chunk, local_dir)
+            processes += 1
+            if result.returncode != 0:
+                logger.warning(f"adb pull 返回 {result.returncode}: {result.stderr.strip()}")
+
+            # adb 按参数顺序依次写入文件，本地 mtime 即各文件完成时间
+            prev = chunk_start
+            for remote_file in chunk:
+                local_path = os.path.join(local_dir, os.path.basename(remote_file))
+                if not os.path.exists(local_path):
+                    logger.warning(f"文件拉取失败: {remote_file}")
+                    continue
+                st = os.stat(local_path)
+                done = max(st.st_mtime, prev)
+                per_file.append({
+                    "remote": remote_file,
+                    "local": local_path,
+                    "bytes": st.st_size,
+                    "seconds": round(done - prev, 4)
+                })
+                prev = done
+                local_files.append(local_path)
+
+        elapsed = time.time() - start
+        total_bytes = sum(item["bytes"] for item in per_file)
+        self.last_pull_stats = {
+            "files": len(local_files),
+            "bytes": total_bytes,
+            "seconds": round(elapsed, 3),
+            "bytes_per_sec": round(total_bytes / elapsed, 1) if elapsed > 0 else 0.0,
+            "processes": processes,
+            "per_file": per_file
+        }
+        logger.info(
+            f"拉取完成: {len(local_files)} 个文件, {total_bytes} bytes, {elapsed:.2f}s, "
+            f"{self.last_pull_stats['bytes_per_sec'] / 1e6:.2f} MB/s, adb 进程数 {processes}"
+        )
+        return local_files
+
+    @trace.traced("adb.head")
+    def read_heads(self, entries, nbytes: int, batch_size: int = PULL_BATCH_SIZE):
+        """
+        读取多个远端文件的前 nbytes 字节：每批文件一次 adb exec-out，直接读 stdout，不落盘
+        :param entries: [(远端路径, 字节数), ...]，字节数来自 stat_files，用于切分连续输出
+        :param nbytes: 每个文件读取的字节数
+        :return: {远端路径: bytes}，输出长度与预期不符（文件已变化）的批次不返回
+        """
+        heads = {}
+        total = 0
+        for i in range(0, len(entries), batch_size):
+            chunk = entries[i:i + batch_size]
+            cmd = "; ".join(f"head -c {nbytes} {remote}" for remote, _ in chunk)
+            result = subprocess.run(self._adb_cmd("exec-out", cmd), capture_output=True)
+            data = result.stdout
+            expected = sum(min(size, nbytes) for _, size in chunk)
+            total += len(data)
+            if len(data) != expected:
+                logger.warning(f"exec-out 输出 {len(data)} bytes, 预期 {expected} bytes，该批文件改为完整拉取")
+                continue
+            pos = 0
+            for remote, size in chunk:
+                n = min(size, nbytes)
+                heads[remote] = data[pos:pos + n]
+                pos += n
+        logger.info(f"读取 {len(heads)}/{len(entries)} 个文件头, 共 {total} bytes")
+        return heads
+
     def clear_files(self, remote_dir: str, extension: str):
         """
         删除手机端指定目录下的某类文件
         """
-        cmd = f"adb -s {self.device_id} shell rm {remote_dir}/*.{extension}"
-        os.system(cmd)
+        return self.shell(f"rm {remote_dir}/*.{extension}")
 
     def clear_local_files(self, local_dir: str, extensions=("jpg", "mp4")):
         """
@@ -57,6 +195,7 @@ class AdbUtils:
                     except Exception as e:
                         logger.warning(f"删除 {file_path} 失败: {e}")
 
+    @trace.traced("adb.clear")
     def clear_media_files(self, remote_dir=None, local_dir=None, extensions=("jpg", "mp4")):
         """
         清理手机端和/或本地的 jpg/mp4 文件
@@ -64,14 +203,56 @@ class AdbUtils:
         :param local_dir: 本地路径，如 /home/wangbo/AID/output
         """
         if remote_dir:
-            for ext in extensions:
-                self.clear_files(remote_dir, ext)
+            self.shell_many([f"rm {remote_dir}/*.{ext}" for ext in extensions])
         if local_dir:
             self.clear_local_files(local_dir, extensions)
 
-    def shell(self, cmd: str):
-        """执行 adb shell 命令"""
-        os.system(f"adb -s {self.device_id} shell {cmd}")
+    def shell(self, cmd: str) -> ShellResult:
+        """
+        执行 adb shell 命令
+        :return: ShellResult(code, output)，output 包含 stdout 和 stderr
+        """
+        return self.shell_many([cmd])[0]
+
+    @trace.traced("adb.shell")
+    def shell_many(self, cmds):
+        """
+        依次执行多条 adb shell 命令；常驻模式下一次性写入、流水线执行
+        :return: 与 cmds 顺序一致的 ShellResult 列表
+        """
+        if self.persistent:
+            if self._session is None:
+                self._session = AdbShellSession(self._adb_cmd())
+            results = self._session.run_many(cmds)
+        else:
+            results = []
+            for cmd in cmds:
+                proc = subprocess.run(self._adb_cmd("shell", cmd), stdout=subprocess.PIPE,
+                                      stderr=subprocess.STDOUT, text=True)
+                results.append(ShellResult(proc.returncode, proc.stdout.rstrip("\n")))
+
+        for cmd, result in zip(cmds, results):
+            logger.debug(f"adb shell {cmd} -> {result.code}")
+        return results
+
+    def iter_shell(self, cmds):
+        """
+        常驻连接上流水线执行多条命令，每条结果返回即产出（非常驻模式逐条启动进程）
+        :return: 迭代 ShellResult
+        """
+        if not self.persistent:
+            for cmd in cmds:
+                yield self.shell(cmd)
+            return
+        if self._session is None:
+            self._session = AdbShellSession(self._adb_cmd())
+        yield from self._session.iter_many(cmds)
+
+    def close(self):
+        """关闭常驻 shell 连接"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
     def keep_screen_on_while_charging(self, enable=True):
         """
@@ -0,0 +1,128 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import device_config
+from config.device_config import ANALYSIS_WORKERS
+from utils import trace
+from utils.opencv_utils import OpenCVUtils
+from utils.image_hash import DuplicateDetector
+
+logger = logging.getLogger("CapturePipeline")
+
+_DONE = object()
+
+
+class CapturePipeline:
+    """
+    拍照 → 拉取 → 分析 三级流水线：
+    主线程拍照，每张照片落盘后通知拉取线程增量同步，拉取到的文件立即提交到分析进程池，
+    三个阶段并发执行，总耗时趋近于最慢的阶段
+    """
+
+    def __init__(self, ui, workers=ANALYSIS_WORKERS, queue_size=4, fail_dir=None,
+                 check_3a=True, check_ae=True, check_awb=True, check_af=True, check_abnormal=True,
+                 check_duplicate=False, duplicate_detector=None, **kwargs):
+        """
+        :param ui: UIAutomatorHelper 实例（使用其 take_picture 与 media_sync）
+        :param workers: 分析进程数，0/None 表示全部 CPU 核心
+        :param queue_size: 拍照→拉取队列长度，以及每个分析进程允许积压的文件数
+        :param check_duplicate: 检查重复帧，duplicate_detector 可传入会话级共享实例
+        :param kwargs: 透传给 check_3a 的阈值参数
+        """
+        self.ui = ui
+        self.workers = workers
+        self.queue_size = queue_size
+        self.fail_dir = fail_dir
+        self.check_flags = (check_ae, check_awb, check_af)
+        self.options = dict(check_3a=check_3a, check_abnormal=check_abnormal, check_video=False,
+                            check_duplicate=check_duplicate, check_kwargs=kwargs)
+        self.duplicates = (duplicate_detector or DuplicateDetector()) if check_duplicate else None
+        self.stats = {}
+
+    @trace.traced("pipeline.run")
+    def run(self, loops):
+        """
+        :return: 与 OpenCVUtils.validate_and_collect 相同的 ("PASS"/"FAIL", comments)
+        """
+        fail_dir = self.fail_dir or device_config.FAIL_DIR
+        landed = queue.Queue(maxsize=self.queue_size)
+        futures = []
+        errors = []
+        timing = {"capture": 0.0, "pull": 0.0}
+        start = time.perf_counter()
+
+        workers = self.workers or os.cpu_count() or 1
+        # 限制已提交但未完成的分析任务数，避免拉取远快于分析时积压
+        in_flight = threading.BoundedSemaphore(workers * self.queue_size)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=OpenCVUtils._init_worker) as pool:
+
+            def submit(local_path):
+                in_flight.acquire()
+                future = pool.submit(OpenCVUtils._analyze_file, local_path, **self.options)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.append(future)
+
+            puller = threading.Thread(target=self._pull_loop, args=(landed, submit, timing, errors),
+                                      name="pipeline-pull", daemon=True)
+            puller.start()
+
+            try:
+                for i in range(loops):
+                    logger.info(f"......pipeline loop {i + 1}/{loops}......")
+                    t = time.perf_counter()
+                    shots = self.ui.take_picture(1)
+                    timing["capture"] += time.perf_counter() - t
+                    landed.put(shots)
+            finally:
+                landed.put(_DONE)
+                puller.join()
+
+            if errors:
+                raise errors[0]
+
+            # 按拉取顺序汇总结果，失败文件的移动与文案与 validate_and_collect 一致
+            failures = []
+            for future in futures:
+                OpenCVUtils._collect_failures(future.result(), fail_dir, failures, *self.check_flags,
+                                              duplicates=self.duplicates)
+
+        self.stats = {
+            "loops": loops,
+            "analysed": len(futures),
+            "captured": self.ui.media_sync.captured("jpg"),
+            "transfer": dict(self.ui.media_sync.transfer),
+            "capture_seconds": round(timing["capture"], 3),
+            "pull_seconds": round(timing["pull"], 3),
+            "wall_seconds": round(time.perf_counter() - start, 3)
+        }
+        logger.info(f"流水线完成: {self.stats}")
+
+        if failures:
+            return "FAIL", ";".join(failures)
+        return "PASS", ""
+
+    def _pull_loop(self, landed, submit, timing, errors):
+        """拉取线程：收到落盘通知后增量同步，新文件立即提交分析"""
+        done = False
+        while not done:
+            item = landed.get()
+            # 合并已积压的通知，一次同步拉取多张
+            while item is not _DONE and not landed.empty():
+                item = landed.get()
+            done = item is _DONE
+            try:
+                t = time.perf_counter()
+                new_files = self.ui.media_sync.sync("jpg")
+                timing["pull"] += time.perf_counter() - t
+                for local_path in new_files:
+                    submit(local_path)
+            except Exception as e:
+                logger.error(f"流水线拉取失败: {e}")
+                errors.append(e)
+                # 继续消费队列，避免拍照线程阻塞在 put 上
+                while not done:
+                    done = landed.get() is _DONE
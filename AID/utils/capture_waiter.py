@@ -0,0 +1,100 @@
+import time
+import logging
+from utils import trace
+
+logger = logging.getLogger("CaptureWaiter")
+
+
+class CaptureWaiter:
+    """
+    轮询手机目录，判断拍照/录像文件是否已落盘，替代固定 sleep
+    文件出现且大小在连续 stable_polls 次轮询中不变，视为写入完成
+    """
+
+    def __init__(self, adb, remote_dir: str, lister=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param adb: AdbUtils 实例
+        :param remote_dir: 手机中的目录，例如 /sdcard/DCIM/Camera
+        :param lister: 自定义列目录函数 (extension) -> {远端路径: 字节数}，用于测试
+        """
+        self.adb = adb
+        self.remote_dir = remote_dir
+        self._lister = lister
+        self._clock = clock
+        self._sleep = sleep
+        self.baseline = {}
+
+    def _list(self, extensions):
+        files = {}
+        for ext in extensions:
+            if self._lister:
+                files.update(self._lister(ext))
+            else:
+                files.update({path: size for path, size, _ in self.adb.stat_files(self.remote_dir, ext)})
+        return files
+
+    def snapshot(self, extensions=("jpg", "mp4")):
+        """记录当前已有文件，之后只等待新出现的文件"""
+        self.baseline = dict(self._list(extensions))
+        return self.baseline
+
+    def _poll(self, extensions, done, timeout, interval, max_interval, backoff):
+        """
+        带退避的轮询，done(files, stable) 返回非 None 时结束
+        :return: done 的返回值；超时抛出 TimeoutError
+        """
+        deadline = self._clock() + timeout
+        last = None
+        stable_count = {}
+
+        while True:
+            files = self._list(extensions)
+            for path, size in files.items():
+                if size > 0 and last is not None and last.get(path) == size:
+                    stable_count[path] = stable_count.get(path, 0) + 1
+                else:
+                    stable_count[path] = 0
+            last = files
+
+            result = done(files, stable_count)
+            if result is not None:
+                return result
+
+            now = self._clock()
+            if now >= deadline:
+                raise TimeoutError(f"等待 {self.remote_dir} 文件落盘超时 ({timeout}s)")
+            self._sleep(min(interval, deadline - now))
+            interval = min(interval * backoff, max_interval)
+
+    @trace.traced("wait_capture")
+    def wait_for_new(self, expected=1, extensions=("jpg",), timeout=15, stable_polls=1,
+                     interval=0.2, max_interval=2.0, backoff=1.5):
+        """
+        等待 expected 个新文件写入完成
+        :param stable_polls: 大小连续不变的次数（1 表示相邻两次轮询大小一致）
+        :return: 新文件远端路径列表（按文件名排序）
+        """
+        def done(files, stable):
+            finished = sorted(p for p in files
+                              if p not in self.baseline and stable.get(p, 0) >= stable_polls)
+            if len(finished) >= expected:
+                return finished
+
+        start = self._clock()
+        finished = self._poll(extensions, done, timeout, interval, max_interval, backoff)
+        self.baseline.update({p: 0 for p in finished})
+        logger.info(f"{len(finished)} 个新文件已落盘, 耗时 {self._clock() - start:.2f}s")
+        return finished
+
+    @trace.traced("wait_stable")
+    def wait_stable(self, extensions=("jpg",), timeout=10, stable_polls=1,
+                    interval=0.2, max_interval=2.0, backoff=1.5):
+        """
+        等待目录下所有文件大小稳定（至少存在一个文件）
+        :return: {远端路径: 字节数}
+        """
+        def done(files, stable):
+            if files and all(stable.get(p, 0) >= stable_polls for p in files):
+                return files
+
+        return self._poll(extensions, done, timeout, interval, max_interval, backoff)
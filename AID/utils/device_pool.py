@@ -0,0 +1,141 @@
+import os
+import re
+import json
+import logging
+import subprocess
+from glob import glob
+from config import device_config
+
+logger = logging.getLogger("DevicePool")
+
+# CI 中没有真机时，用逗号分隔的假设备列表代替 adb devices（配合 fake adb 使用）
+FAKE_DEVICES_ENV = "AID_FAKE_DEVICES"
+
+
+def list_devices():
+    """
+    返回已连接且处于 device 状态的设备序列号
+    """
+    fake = os.environ.get(FAKE_DEVICES_ENV)
+    if fake:
+        return [s.strip() for s in fake.split(",") if s.strip()]
+
+    try:
+        output = subprocess.run(["adb", "devices"], capture_output=True, text=True).stdout
+    except OSError as e:
+        logger.warning(f"adb devices 执行失败: {e}")
+        return []
+
+    serials = []
+    for line in output.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] == "device":
+            serials.append(parts[0])
+    return serials
+
+
+def resolve_devices():
+    """设备池：优先使用配置的 DEVICE_IDS，其次自动发现，最后回退到单设备 DEVICE_ID"""
+    return list(device_config.DEVICE_IDS) or list_devices() or [device_config.DEVICE_ID]
+
+
+def worker_index(worker_id: str) -> int:
+    """xdist worker id（gw0, gw1...）-> 序号"""
+    match = re.search(r"(\d+)$", worker_id)
+    return int(match.group(1)) if match else 0
+
+
+def worker_tag(worker_id: str, serial: str) -> str:
+    """worker 专属目录名，设备序列号中的 : / 等字符替换掉"""
+    return f"{worker_id}_{re.sub(r'[^A-Za-z0-9_.-]', '_', serial) or 'default'}"
+
+
+def apply_worker_config(worker_id: str, serial: str, run_id: str = None):
+    """
+    把当前进程绑定到一台设备：改写 device_config 中的设备 ID 和输出目录，
+    必须在测试模块 import 配置之前调用（pytest_configure 中）
+    :return: worker 的输出目录
+    """
+    tag = worker_tag(worker_id, serial)
+    base_output = device_config.OUTPUT_PATH
+    base_report = os.path.join(device_config.REPORT_PATH, f"run_{run_id}") if run_id else device_config.REPORT_PATH
+
+    device_config.DEVICE_ID = serial
+    device_config.OUTPUT_PATH = os.path.join(base_output, tag)
+    device_config.FAIL_DIR = os.path.join(device_config.OUTPUT_PATH, "pic_fail")
+    device_config.REPORT_PATH = os.path.join(base_report, tag)
+    logger.info(f"[{worker_id}] 绑定设备 {serial}, 输出目录 {device_config.OUTPUT_PATH}")
+    return device_config.OUTPUT_PATH
+
+
+def merge_reports(run_dir: str, report_file: str = None):
+    """
+    合并各 worker 的结果日志并渲染为一个 Excel，用例名后附加设备序列号
+    :param run_dir: 本次运行的报告目录（其下每个子目录为一个 worker）
+    :return: 合并后的 Excel 路径，没有结果时返回 None
+    """
+    from utils.report_utils import SimpleReport
+
+    journals = sorted(glob(os.path.join(run_dir, "*", "*.jsonl")))
+    if not journals:
+        logger.warning(f"未找到 worker 结果日志: {run_dir}")
+        return None
+
+    merged = os.path.join(run_dir, "merged_report.jsonl")
+    rows = 0
+    with open(merged, "w", encoding="utf-8") as out:
+        for journal in journals:
+            for row in SimpleReport.read_journal(journal):
+                if row.get("device"):
+                    row["case_name"] = f"{row['case_name']} [{row['device']}]"
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                rows += 1
+
+    logger.info(f"合并 {len(journals)} 个 worker 的 {rows} 条结果")
+    return SimpleReport.render(merged, report_file)
+
+
+# 会话级连接池：serial -> UIAutomatorHelper；已完成一次性准备（root/remount/亮屏）的设备
+_helpers = {}
+_prepared = set()
+
+
+def get_helper(serial: str = None, **kwargs):
+    """
+    同一设备在整个测试会话中只建立一次 uiautomator2 连接和常驻 adb shell，各用例复用同一个 UIAutomatorHelper
+    :param serial: 设备序列号，默认 device_config.DEVICE_ID（运行时读取，xdist worker 已改写）
+    :param kwargs: 首次创建时透传给 UIAutomatorHelper
+    """
+    from utils.uiautomator_helper import UIAutomatorHelper
+
+    serial = device_config.DEVICE_ID if serial is None else serial
+    helper = _helpers.get(serial)
+    if helper is None:
+        helper = _helpers[serial] = UIAutomatorHelper(serial or None, **kwargs)
+    return helper
+
+
+def release_helpers(home: bool = True):
+    """会话结束：回到主屏并关闭各设备的常驻 adb shell"""
+    for serial, helper in list(_helpers.items()):
+        try:
+            if home:
+                helper.back_to_home()
+        except Exception as e:
+            logger.warning(f"{serial} 返回主屏失败: {e}")
+        helper.adb.close()
+    _helpers.clear()
+
+
+def prepare_device(adb):
+    """
+    root / remount / 充电时保持亮屏：每个会话每台设备只执行一次
+    :return: 本次是否实际执行
+    """
+    if adb.device_id in _prepared:
+        return False
+    adb.shell("root")
+    adb.shell("remount")
+    adb.keep_screen_on_while_charging(True)
+    _prepared.add(adb.device_id)
+    return True
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+from utils._lazy import lazy_import
+
+cv2 = lazy_import("cv2", globals())
+np = lazy_import("numpy", globals(), "np")
+
+logger = logging.getLogger(__name__)
+
+THUMB_SIZE = (64, 36)  # 与视频冻帧检测使用相同尺寸的灰度缩略图
+DUPLICATE_MAX_DISTANCE = 4  # dHash 汉明距离不超过该值才进入像素比对
+# 缩略图平均差异不超过该值视为同一帧。缩略图是块均值，静止场景连拍的传感器噪声被平均后
+# 差异只有 0.02~0.05，任何正阈值都会把对着固定图卡的正常连拍判为重复；
+# 默认只认缩略图逐像素相同（HAL 原样返回旧帧），需要容忍重新编码误差时先用真机样本校准再调大
+DUPLICATE_MAX_DIFF = 0.0
+DUPLICATE_WINDOW = 1  # 只与前 N 张比对，默认只比相邻两张；None 表示与会话内全部照片比对
+DUPLICATE_MAX_CHECKS = 16  # window=None 时每张图最多与多少个候选做像素比对，静止场景下保证不退化为平方复杂度
+
+
+def thumbnail(gray):
+    """灰度图 → THUMB_SIZE 缩略图（INTER_AREA 即块均值，对噪声不敏感）"""
+    return cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def dhash(gray):
+    """
+    64 位差值哈希：缩到 9x8，比较每行相邻像素的大小
+    :return: int
+    """
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class HammingIndex:
+    """
+    分段汉明索引：64 位哈希切成 max_distance + 1 段，距离不超过 max_distance 的两个哈希
+    至少有一段完全相同（抽屉原理），查询只需比较同段桶内的候选，不用两两比较；
+    桶里只存不同的哈希值，静止场景下大量相同哈希不会拖慢查询
+    """
+
+    def __init__(self, max_distance=DUPLICATE_MAX_DISTANCE, bits=64):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        edges = [bits * i // bands for i in range(bands + 1)]
+        self._bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self._buckets = {}
+        self._entries = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _keys(self, h):
+        return [(i, (h >> lo) & mask) for i, (lo, mask) in enumerate(self._bands)]
+
+    def add(self, h):
+        """:return: 条目编号（插入顺序）"""
+        idx = self._size
+        self._size += 1
+        if h not in self._entries:
+            self._entries[h] = []
+            for key in self._keys(h):
+                self._buckets.setdefault(key, []).append(h)
+        self._entries[h].append(idx)
+        return idx
+
+    def query(self, h, limit=None):
+        """
+        :param limit: 最多返回的条目数
+        :return: [(距离, 条目编号)]，按距离升序、同距离新条目在前
+        """
+        found = {}
+        for key in self._keys(h):
+            for other in self._buckets.get(key, ()):
+                if other not in found:
+                    found[other] = hamming(h, other)
+        matches = []
+        for other, d in sorted(found.items(), key=lambda kv: kv[1]):
+            if d > self.max_distance:
+                break
+            entries = self._entries[other][-limit:] if limit else self._entries[other]
+            matches.extend((d, idx) for idx in reversed(entries))
+            if limit and len(matches) >= limit:
+                break
+        return sorted(matches, key=lambda m: (m[0], -m[1]))[:limit]
+
+
+class DuplicateDetector:
+    """
+    会话级重复帧检测：默认只把每张图与上一张比对（dHash 汉明距离预筛，再确认缩略图差异），
+    用于发现相机 HAL 反复返回同一张旧帧；window=None 时通过 HammingIndex 与会话内全部照片比对
+    """
+
+    def __init__(self, max_distance=DUPLICATE_MAX_DISTANCE, max_diff=DUPLICATE_MAX_DIFF,
+                 max_checks=DUPLICATE_MAX_CHECKS, window=DUPLICATE_WINDOW):
+        """
+        :param max_diff: 缩略图平均差异上限，0 表示只认逐像素相同的缩略图
+        :param window: 与前多少张比对，None 表示全部
+        """
+        self.max_distance = max_distance
+        self.max_diff = max_diff
+        self.max_checks = max_checks
+        self.window = window
+        self.index = HammingIndex(max_distance) if window is None else None
+        self._keys = []
+        self._hashes = []
+        self._thumbs = []
+        self._digests = []
+        self._exact = {}
+        self._seen = set()
+
+    def _candidates(self, hash_value):
+        """:return: [(汉明距离, 条目编号)]"""
+        if self.index is not None:
+            return self.index.query(hash_value, self.max_checks)
+        recent = range(len(self._keys) - 1, max(len(self._keys) - self.window, 0) - 1, -1)
+        return [(d, i) for i in recent if (d := hamming(hash_value, self._hashes[i])) <= self.max_distance]
+
+    def check(self, key, hash_value, thumb):
+        """
+        与之前的照片比对后记录；同一 key 重复提交（重新校验同一文件）时不判重复
+        :return: (重复的 key, 汉明距离, 缩略图平均差异)，未重复时 None
+        """
+        if key in self._seen:
+            return None
+        self._seen.add(key)
+        digest = hashlib.blake2b(thumb.tobytes(), digest_size=16).digest()
+        match = None
+        for distance, idx in self._candidates(hash_value):
+            if digest == self._digests[idx]:
+                match = (self._keys[idx], distance, 0.0)
+                break
+            if self.max_diff > 0:
+                diff = cv2.mean(cv2.absdiff(thumb, self._thumbs[idx]))[0]
+                if diff <= self.max_diff:
+                    match = (self._keys[idx], distance, round(diff, 3))
+                    break
+        if match is None and self.index is not None and digest in self._exact:
+            match = (self._exact[digest], 0, 0.0)
+
+        if self.index is not None:
+            self.index.add(hash_value)
+            self._exact.setdefault(digest, key)
+        self._keys.append(key)
+        self._hashes.append(hash_value)
+        self._thumbs.append(thumb if self.max_diff > 0 else None)
+        self._digests.append(digest)
+        return match
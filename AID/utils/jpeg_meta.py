@@ -0,0 +1,265 @@
+import struct
+import logging
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# APP1(EXIF) 段最长 64KB，前面最多还有一个 APP0(JFIF)，读文件前 HEAD_BYTES 字节即可拿到完整 EXIF
+HEAD_BYTES = 66 * 1024
+
+_SOI = b"\xff\xd8"
+_SOS = 0xDA
+_EOI = 0xD9
+_APP1 = 0xE1
+# 不带长度字段的标记：TEM、RST0-7
+_STANDALONE = {0x01} | set(range(0xD0, 0xD8))
+
+# TIFF 字段类型 → (struct 格式, 字节数)
+_TYPES = {1: ("B", 1), 2: ("s", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8),
+          7: ("B", 1), 9: ("i", 4), 10: ("ii", 8)}
+
+TAG_ORIENTATION = 0x0112
+TAG_EXIF_IFD = 0x8769
+TAG_THUMB_OFFSET = 0x0201  # JPEGInterchangeFormat
+TAG_THUMB_LENGTH = 0x0202  # JPEGInterchangeFormatLength
+TAG_EXPOSURE_TIME = 0x829A
+TAG_ISO = 0x8827  # PhotographicSensitivity / ISOSpeedRatings
+TAG_FOCAL_LENGTH = 0x920A
+TAG_PIXEL_X = 0xA002
+TAG_PIXEL_Y = 0xA003
+TAG_DIGITAL_ZOOM = 0xA404
+TAG_FOCAL_35MM = 0xA405
+
+# SOF0-SOF15，除去 DHT(C4)、JPG(C8)、DAC(CC)
+_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_MAX_HEADER_BYTES = 1024 * 1024  # SOF 不在 HEAD_BYTES 内时继续向后读的上限
+
+ASPECT_RATIOS = {"1:1": 1.0, "3:4": 4 / 3, "9:16": 16 / 9}  # set_ratio 画幅 → 长边/短边，full 与机型相关不校验
+ASPECT_TOLERANCE = 0.02
+ZOOM_TOLERANCE = 0.15  # 多摄切换时各镜头的等效焦距与标称倍率有偏差
+
+
+class JpegMeta(NamedTuple):
+    width: Optional[int]  # SOF 中的编码尺寸（未按 orientation 旋转）
+    height: Optional[int]
+    orientation: int  # EXIF Orientation，1 为正常，5-8 表示需要旋转 90°
+    exposure_time: Optional[float]  # 秒
+    iso: Optional[int]
+    focal_length: Optional[float]  # mm
+    focal_length_35mm: Optional[int]  # 35mm 等效焦距，多摄切换镜头时用于计算实际倍率
+    digital_zoom: float  # DigitalZoomRatio，未记录或为 0（未使用数码变焦）时为 1.0
+
+    @property
+    def aspect(self):
+        """长边 / 短边"""
+        if not self.width or not self.height:
+            return None
+        return max(self.width, self.height) / min(self.width, self.height)
+
+
+def iter_segments(data):
+    """
+    遍历 JPEG 头部的标记段，遇到 SOS（图像数据开始）或数据不完整时停止，不解码像素
+    :return: 生成 (标记, 段内容起始偏移, 段内容长度)
+    """
+    if not data.startswith(_SOI):
+        return
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 填充字节
+            pos += 1
+            continue
+        if marker in _STANDALONE:
+            pos += 2
+            continue
+        if marker in (_SOS, _EOI):
+            return
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if length < 2:
+            return
+        yield marker, pos + 4, length - 2
+        pos += 2 + length
+
+
+def _exif_tiff(data):
+    """:return: APP1 EXIF 段中 TIFF 数据的 (起始偏移, 结束偏移, 字节序)，没有 EXIF 时 None"""
+    for marker, start, length in iter_segments(data):
+        if marker == _APP1 and data[start:start + 6] == b"Exif\0\0":
+            tiff = start + 6
+            order = data[tiff:tiff + 2]
+            if order not in (b"II", b"MM"):
+                return None
+            return tiff, min(start + length, len(data)), "<" if order == b"II" else ">"
+    return None
+
+
+def _read_ifd(data, tiff, end, endian, offset):
+    """
+    读取一个 IFD
+    :return: ({tag: 值}, 下一个 IFD 偏移)；值为单个数或元组，ASCII 为 str，RATIONAL 为 (分子, 分母)
+    """
+    pos = tiff + offset
+    if offset <= 0 or pos + 2 > end:
+        return {}, 0
+    count = struct.unpack(endian + "H", data[pos:pos + 2])[0]
+    entries = {}
+    for i in range(count):
+        entry = pos + 2 + i * 12
+        if entry + 12 > end:
+            return entries, 0
+        tag, typ, n = struct.unpack(endian + "HHI", data[entry:entry + 8])
+        if typ not in _TYPES:
+            continue
+        fmt, size = _TYPES[typ]
+        total = size * n
+        if total <= 4:
+            value_at = entry + 8
+        else:
+            value_at = tiff + struct.unpack(endian + "I", data[entry + 8:entry + 12])[0]
+            if value_at + total > end:
+                continue
+        raw = data[value_at:value_at + total]
+        if typ == 2:
+            entries[tag] = raw.split(b"\0", 1)[0].decode("ascii", "replace")
+            continue
+        values = struct.unpack(endian + fmt * n, raw)
+        if typ in (5, 10):
+            values = tuple(zip(values[::2], values[1::2]))
+        entries[tag] = values[0] if n == 1 else values
+    next_at = pos + 2 + count * 12
+    next_ifd = struct.unpack(endian + "I", data[next_at:next_at + 4])[0] if next_at + 4 <= end else 0
+    return entries, next_ifd
+
+
+def _rational(value):
+    if isinstance(value, tuple) and len(value) == 2 and not isinstance(value[0], tuple):
+        return value[0] / value[1] if value[1] else None
+    return None
+
+
+def _first(value):
+    return value[0] if isinstance(value, tuple) else value
+
+
+def parse_meta(data):
+    """
+    从 JPEG 头部数据解析尺寸与拍摄参数，不解码像素
+    :param data: JPEG 文件内容或其头部（需包含 SOF 段）
+    :return: JpegMeta
+    """
+    width = height = None
+    for marker, start, length in iter_segments(data):
+        if marker in _SOF and start + 5 <= len(data):
+            height, width = struct.unpack(">HH", data[start + 1:start + 5])
+            break
+
+    ifd0, exif = {}, {}
+    found = _exif_tiff(data)
+    if found is not None:
+        tiff, end, endian = found
+        if tiff + 8 <= end:
+            ifd0, _ = _read_ifd(data, tiff, end, endian, struct.unpack(endian + "I", data[tiff + 4:tiff + 8])[0])
+            if isinstance(ifd0.get(TAG_EXIF_IFD), int):
+                exif, _ = _read_ifd(data, tiff, end, endian, ifd0[TAG_EXIF_IFD])
+
+    if width is None:
+        width, height = _first(exif.get(TAG_PIXEL_X)), _first(exif.get(TAG_PIXEL_Y))
+    orientation = _first(ifd0.get(TAG_ORIENTATION))
+    iso = _first(exif.get(TAG_ISO))
+    focal_35mm = _first(exif.get(TAG_FOCAL_35MM))
+    return JpegMeta(
+        width, height,
+        orientation if isinstance(orientation, int) and 1 <= orientation <= 8 else 1,
+        _rational(exif.get(TAG_EXPOSURE_TIME)),
+        iso if isinstance(iso, int) else None,
+        _rational(exif.get(TAG_FOCAL_LENGTH)),
+        focal_35mm if isinstance(focal_35mm, int) and focal_35mm > 0 else None,
+        _rational(exif.get(TAG_DIGITAL_ZOOM)) or 1.0
+    )
+
+
+def read_meta(path):
+    """
+    读取图片文件的元数据：先读 HEAD_BYTES，SOF 不在其中时再向后读取（最多 1MB）
+    :return: JpegMeta
+    """
+    with open(path, "rb") as fp:
+        data = fp.read(HEAD_BYTES)
+        meta = parse_meta(data)
+        while meta.width is None and len(data) < _MAX_HEADER_BYTES:
+            more = fp.read(len(data))
+            if not more:
+                break
+            data += more
+            meta = parse_meta(data)
+    return meta
+
+
+def check_aspect(path, ratio, meta=None, tolerance=ASPECT_TOLERANCE):
+    """
+    校验照片画幅与 set_ratio 设置一致
+    :param ratio: "1:1" / "3:4" / "9:16"，其他值（如 "full"）不校验
+    :return: 失败描述，通过时 None
+    """
+    expected = ASPECT_RATIOS.get(ratio)
+    if expected is None:
+        return None
+    meta = meta or read_meta(path)
+    if meta.aspect is None:
+        return f"RATIO FAIL ({ratio}): {path} 无法读取尺寸"
+    if abs(meta.aspect - expected) > expected * tolerance:
+        return f"RATIO FAIL ({ratio}): {path} {meta.width}x{meta.height}"
+    return None
+
+
+def effective_zoom(meta, base):
+    """
+    相对 1x 照片的实际倍率：35mm 等效焦距之比（覆盖多摄切换）× 数码变焦之比，
+    缺少等效焦距时只看 DigitalZoomRatio
+    """
+    zoom = meta.digital_zoom / base.digital_zoom
+    if meta.focal_length_35mm and base.focal_length_35mm:
+        zoom *= meta.focal_length_35mm / base.focal_length_35mm
+    return zoom
+
+
+def check_zoom(path, zoom, base, meta=None, tolerance=ZOOM_TOLERANCE):
+    """
+    校验照片倍率与 set_zoom 设置一致
+    :param zoom: 期望倍率
+    :param base: 同一会话中 1.0x 照片的 JpegMeta
+    :return: 失败描述，通过时 None
+    """
+    meta = meta or read_meta(path)
+    actual = effective_zoom(meta, base)
+    if abs(actual - zoom) > zoom * tolerance:
+        return f"ZOOM FAIL ({zoom}x): {path} zoom={actual:.2f}x"
+    return None
+
+
+def exif_thumbnail(data):
+    """
+    取 EXIF IFD1 中嵌入的 JPEG 缩略图（通常 160x120，几 KB），只需文件头部数据
+    :param data: JPEG 文件内容或其前 HEAD_BYTES 字节
+    :return: 缩略图 JPEG bytes，没有或不完整时返回 None
+    """
+    found = _exif_tiff(data)
+    if found is None:
+        return None
+    tiff, end, endian = found
+    if tiff + 8 > end:
+        return None
+    ifd0 = struct.unpack(endian + "I", data[tiff + 4:tiff + 8])[0]
+    _, ifd1 = _read_ifd(data, tiff, end, endian, ifd0)
+    tags, _ = _read_ifd(data, tiff, end, endian, ifd1)
+    offset, length = tags.get(TAG_THUMB_OFFSET), tags.get(TAG_THUMB_LENGTH)
+    if not isinstance(offset, int) or not isinstance(length, int) or length <= 0:
+        return None
+    start = tiff + offset
+    if start + length > end:
+        return None
+    thumb = bytes(data[start:start + length])
+    return thumb if thumb.startswith(_SOI) else None
@@ -0,0 +1,133 @@
+import os
+import json
+import logging
+from utils import trace
+
+logger = logging.getLogger("MediaSync")
+
+
+class MediaSync:
+    """
+    增量媒体同步：本地 manifest 记录已拉取文件的远端路径、大小和 mtime，
+    每次同步只拉取新增或变化的文件；配置 prescreen 时照片先做设备端预筛，
+    通过预筛的照片只记入 manifest（local 为 None），不拉取原图
+    """
+
+    MANIFEST_NAME = ".media_manifest.json"
+
+    def __init__(self, adb, remote_dir: str, local_dir: str, manifest_path: str = None, prescreen=None):
+        """
+        :param adb: AdbUtils 实例
+        :param remote_dir: 手机中的目录，例如 /sdcard/DCIM/Camera
+        :param local_dir: 本地保存目录
+        :param manifest_path: manifest 文件路径，默认保存在 local_dir 下
+        :param prescreen: Prescreener 实例，只对 jpg 生效
+        """
+        self.adb = adb
+        self.remote_dir = remote_dir
+        self.local_dir = local_dir
+        self.manifest_path = manifest_path or os.path.join(local_dir, self.MANIFEST_NAME)
+        self.manifest = self._load_manifest()
+        self.prescreen = prescreen
+        self.last_delta = []
+        # 累计传输字节：head 为预筛读取的文件头，pull 为拉取的原图，skipped 为预筛省下的原图
+        self.transfer = {"head_bytes": 0, "pull_bytes": 0, "skipped_bytes": 0}
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, ValueError) as e:
+            logger.warning(f"manifest 读取失败，重新全量同步: {e}")
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(self.manifest, fp, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def _is_synced(self, remote, size, mtime):
+        entry = self.manifest.get(remote)
+        # 本地文件被移走（例如移入 FAIL_DIR）时重新拉取；预筛跳过的文件没有本地副本
+        return (entry is not None and entry["size"] == size and entry["mtime"] == mtime
+                and (entry["local"] is None or os.path.exists(entry["local"])))
+
+    @trace.traced("media_sync")
+    def sync(self, extension: str):
+        """
+        同步某类文件，只传输新增或变化的文件
+        :param extension: 文件扩展名，例如 'jpg' 或 'mp4'
+        :return: 本次新拉取的本地文件路径（自上次同步以来的增量）
+        """
+        remote_entries = self.adb.stat_files(self.remote_dir, extension)
+
+        # 远端已删除的文件从 manifest 中移除
+        current = {remote for remote, _, _ in remote_entries}
+        suffix = f".{extension}"
+        removed = [r for r in self.manifest if r.endswith(suffix) and r not in current]
+        for remote in removed:
+            del self.manifest[remote]
+
+        pending = [(r, size, mtime) for r, size, mtime in remote_entries
+                   if not self._is_synced(r, size, mtime)]
+        logger.info(f"同步 {extension}: 远端 {len(remote_entries)} 个, 需拉取 {len(pending)} 个")
+
+        screened = 0
+        if pending and self.prescreen is not None and extension == "jpg":
+            to_pull = self._screen(pending)
+            screened = len(pending) - len(to_pull)
+            pending = to_pull
+
+        delta = []
+        if pending:
+            pulled = self.adb.pull_files([r for r, _, _ in pending], self.local_dir)
+            self.transfer["pull_bytes"] += self.adb.last_pull_stats["bytes"]
+            pulled_set = set(pulled)
+            for remote, size, mtime in pending:
+                local_path = os.path.join(self.local_dir, os.path.basename(remote))
+                if local_path in pulled_set:
+                    self.manifest[remote] = {"size": size, "mtime": mtime, "local": local_path}
+                    delta.append(local_path)
+
+        if delta or removed or screened:
+            self._save_manifest()
+
+        self.last_delta = delta
+        return delta
+
+    def _screen(self, pending):
+        """预筛：通过的文件直接记入 manifest，返回仍需拉取的文件"""
+        mtimes = {r: mtime for r, _, mtime in pending}
+        results = self.prescreen.screen([(r, size) for r, size, _ in pending])
+        for r in results:
+            if not r.pull:
+                self.manifest[r.remote] = {"size": r.size, "mtime": mtimes[r.remote], "local": None,
+                                           "prescreen": r.metrics}
+        stats = self.prescreen.last_stats
+        self.transfer["head_bytes"] += stats["head_bytes"]
+        self.transfer["skipped_bytes"] += stats["skipped_bytes"]
+        keep = {r.remote for r in results if r.pull}
+        return [p for p in pending if p[0] in keep]
+
+    def captured(self, extension: str):
+        """manifest 中某类文件的数量（含预筛跳过、未拉取原图的文件），即设备上已同步的拍摄数"""
+        suffix = f".{extension}"
+        return sum(1 for remote in self.manifest if remote.endswith(suffix))
+
+    def local_files(self, extension: str):
+        """manifest 中某类文件当前在本地存在的路径"""
+        suffix = f".{extension}"
+        return sorted(entry["local"] for remote, entry in self.manifest.items()
+                      if remote.endswith(suffix) and entry["local"] and os.path.exists(entry["local"]))
+
+    def reset(self):
+        """清空 manifest，下一次同步重新全量拉取"""
+        self.manifest = {}
+        self.last_delta = []
+        self.transfer = dict.fromkeys(self.transfer, 0)
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
@@ -1,51 +1,372 @@
-import cv2
-import numpy as np
-import logging, os, shutil
+from __future__ import annotations
+import logging, os, shutil, time
+from typing import NamedTuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from glob import glob
-from config.device_config import FAIL_DIR
+from config import device_config
+from config.device_config import ANALYSIS_WORKERS
+from utils.image_hash import DuplicateDetector, dhash, thumbnail, THUMB_SIZE
+from utils.result_cache import ResultCache
+from utils import trace
+from utils._lazy import lazy_import, basic_logging
+
+cv2 = lazy_import("cv2", globals())
+np = lazy_import("numpy", globals(), "np")
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+VIDEO_EXTS = (".mp4", ".mov", ".avi", ".mkv")
+LOW_MEMORY_STRIP_ROWS = 256  # 低内存模式下按行条带计算灰度与 Laplacian 的条带高度
+
+# 缩放倍数 -> imread 标志名（JPEG 在 DCT 域直接缩小，解码耗时和内存随之下降）；按名字取值，import 时不加载 cv2
+REDUCED_DECODE_FLAGS = {
+    1: "IMREAD_COLOR",
+    2: "IMREAD_REDUCED_COLOR_2",
+    4: "IMREAD_REDUCED_COLOR_4",
+    8: "IMREAD_REDUCED_COLOR_8",
+}
+
+
+class ImageMetrics(NamedTuple):
+    """单张图片的原始指标，check_3a / check_abnormal_image 均基于它判定"""
+    brightness: float
+    mean_r: float
+    mean_g: float
+    mean_b: float
+    sharpness: Optional[float]
+    abnormal: Optional[str]
+    dhash: Optional[int] = None  # 64 位差值哈希，重复帧检测用
+    thumb: Optional[np.ndarray] = None  # THUMB_SIZE 灰度缩略图，确认重复帧用
+
+
+class TileMetrics(NamedTuple):
+    """网格分块指标，每个字段为 (行数, 列数) 数组"""
+    grid: tuple
+    brightness: np.ndarray
+    mean_r: np.ndarray
+    mean_g: np.ndarray
+    mean_b: np.ndarray
+    sharpness: Optional[np.ndarray]
+
+
+def peak_rss_mb():
+    """
+    当前进程与已结束子进程的峰值常驻内存（MB），不支持 resource 模块的平台返回 None
+    :return: {"self": MB, "children": MB} 或 None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Linux 上 ru_maxrss 单位为 KB，macOS 为字节
+    unit = 1 if os.uname().sysname == "Darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2 ** 20, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 2 ** 20, 1)
+    }
 
 
 class OpenCVUtils:
+    # 低内存模式的条带缓冲区，按名称复用（每个进程一份，尺寸变化时重新分配）
+    _buffers = {}
+    # 最近一次 iter_validate / validate_and_collect 的统计：文件数、耗时、峰值内存
+    last_stats = {}
 
     @staticmethod
-    def _load_image(image_path):
+    def _load_image(image_path, scale=1):
+        """
+        :param scale: JPEG DCT 域缩放解码倍数（1/2/4/8），1 为原图
+        """
+        if scale not in REDUCED_DECODE_FLAGS:
+            raise ValueError(f"Unsupported decode scale: {scale}, expected one of {list(REDUCED_DECODE_FLAGS)}")
         if not os.path.exists(image_path):
             raise FileNotFoundError(f"The image does not exist: {image_path}")
-        img = cv2.imread(image_path)
+        img = cv2.imread(image_path, getattr(cv2, REDUCED_DECODE_FLAGS[scale]))
         if img is None:
             raise RuntimeError(f"Unable to read image: {image_path}")
         return img
 
+    # -------------------------------------------------------
+    # 融合指标计算：一次解码、一次灰度转换，得到全部图片指标
+    # -------------------------------------------------------
+
+    @staticmethod
+    def compute_metrics(img, brightness_threshold=30, color_ratio=1.5, with_sharpness=True,
+                        decode_scale=1, sharpness_scale=None, with_hash=False, low_memory=False):
+        """
+        在一次遍历中计算亮度、RGB 均值、Laplacian 方差和异常颜色分类
+        :param img: BGR 图像数组或图片路径
+        :param with_sharpness: False 时跳过 Laplacian（仅做异常图检查时）
+        :param with_hash: True 时同时计算 dHash 与缩略图（重复帧检测），复用同一份灰度图
+        :param low_memory: True 时按行条带计算灰度与 float32 Laplacian，不分配整图灰度和 CV_64F 缓冲
+        :param decode_scale: 快速模式缩放倍数（1/2/4/8），亮度/颜色均值在该分辨率上统计
+        :param sharpness_scale: 清晰度计算使用的缩放倍数，默认同 decode_scale，且不能大于 decode_scale；
+                                清晰度阈值与分辨率相关，开启前请用 tools.calibrate_fast_mode 校准
+        :return: ImageMetrics
+        """
+        load_scale = (sharpness_scale or decode_scale) if with_sharpness else decode_scale
+        if load_scale > decode_scale:
+            raise ValueError(f"sharpness_scale ({sharpness_scale}) must not exceed decode_scale ({decode_scale})")
+
+        if isinstance(img, str):
+            img = OpenCVUtils._load_image(img, load_scale)
+
+        if low_memory:
+            brightness, sharpness = OpenCVUtils._strip_metrics(img, with_sharpness)
+            mean_b, mean_g, mean_r = cv2.mean(img)[:3]
+            hash_value = thumb = None
+            if with_hash:
+                thumb = cv2.cvtColor(cv2.resize(img, THUMB_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+                hash_value = dhash(thumb)
+            return ImageMetrics(
+                brightness, mean_r, mean_g, mean_b, sharpness,
+                OpenCVUtils._classify_abnormal(brightness, mean_r, mean_g, mean_b,
+                                               brightness_threshold, color_ratio),
+                hash_value, thumb
+            )
+
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        # 清晰度需要更高分辨率时，均值类指标在跨步采样上统计
+        stride = decode_scale // load_scale
+        if stride > 1:
+            brightness = float(np.mean(gray[::stride, ::stride]))
+            mean_b, mean_g, mean_r = np.mean(img[::stride, ::stride], axis=(0, 1)).tolist()
+        else:
+            brightness = cv2.mean(gray)[0]
+            mean_b, mean_g, mean_r = cv2.mean(img)[:3]
+
+        sharpness = None
+        if with_sharpness:
+            _, std = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_64F))
+            sharpness = float(std[0, 0]) ** 2
+
+        hash_value = thumb = None
+        if with_hash:
+            thumb = thumbnail(gray)
+            hash_value = dhash(thumb)
+
+        return ImageMetrics(
+            brightness, mean_r, mean_g, mean_b, sharpness,
+            OpenCVUtils._classify_abnormal(brightness, mean_r, mean_g, mean_b,
+                                           brightness_threshold, color_ratio),
+            hash_value, thumb
+        )
+
+    @staticmethod
+    def _buffer(name, shape, dtype):
+        """取可复用的缓冲区，形状或类型变化时重新分配"""
+        buf = OpenCVUtils._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = OpenCVUtils._buffers[name] = np.empty(shape, dtype)
+        return buf
+
+    @staticmethod
+    def _strip_metrics(img, with_sharpness=True, strip_rows=LOW_MEMORY_STRIP_ROWS):
+        """
+        按行条带计算平均亮度与 Laplacian 方差：每个条带上下各多取一行作为邻域，
+        结果与整图计算一致；灰度和 float32 Laplacian 只占两个条带大小的缓冲区，跨图片复用
+        :return: (brightness, sharpness)，with_sharpness=False 时 sharpness 为 None
+        """
+        h, w = img.shape[:2]
+        gray_buf = OpenCVUtils._buffer("gray", (strip_rows + 2, w), np.uint8)
+        lap_buf = OpenCVUtils._buffer("lap", (strip_rows + 2, w), np.float32) if with_sharpness else None
+
+        gray_sum = lap_sum = lap_sq = 0.0
+        for y0 in range(0, h, strip_rows):
+            y1 = min(y0 + strip_rows, h)
+            top, bottom = (1 if y0 > 0 else 0), (1 if y1 < h else 0)
+            rows = y1 - y0 + top + bottom
+            gray = gray_buf[:rows]
+            cv2.cvtColor(img[y0 - top:y1 + bottom], cv2.COLOR_BGR2GRAY, dst=gray)
+            gray_sum += cv2.sumElems(gray[top:rows - bottom])[0]
+            if with_sharpness:
+                lap = lap_buf[:rows]
+                cv2.Laplacian(gray, cv2.CV_32F, dst=lap)
+                valid = lap[top:rows - bottom]
+                mean, std = cv2.meanStdDev(valid)
+                mean, std = float(mean[0, 0]), float(std[0, 0])
+                lap_sum += mean * valid.size
+                lap_sq += (std ** 2 + mean ** 2) * valid.size
+
+        n = h * w
+        sharpness = lap_sq / n - (lap_sum / n) ** 2 if with_sharpness else None
+        return gray_sum / n, sharpness
+
+    @staticmethod
+    def _classify_abnormal(brightness, mean_r, mean_g, mean_b, brightness_threshold=30, color_ratio=1.5):
+        if brightness < brightness_threshold:
+            return "black"
+        elif mean_g > mean_r * color_ratio and mean_g > mean_b * color_ratio:
+            return "green"
+        elif (mean_r + mean_b) / 2 > mean_g * color_ratio:
+            return "purple"
+        return None
+
+    # -------------------------------------------------------
+    # 网格分块检查：半张模糊、角落偏色等全局均值发现不了的问题
+    # -------------------------------------------------------
+
+    @staticmethod
+    def _block_sums(arr, grid, dtype):
+        """
+        按网格求块内元素和：先把每个块带内的行逐行相加（连续内存、按行向量化），
+        再在列方向分段求和；行列不能整除时丢弃末尾不足一块的像素
+        :return: (行数, 列数[, 通道数]) 数组
+        """
+        rows, cols = grid
+        th, tw = arr.shape[0] // rows, arr.shape[1] // cols
+        channels = arr.shape[2:]
+        bands = np.add.reduce(arr[:rows * th].reshape(rows, th, -1), axis=1, dtype=dtype)
+        bands = bands.reshape((rows, arr.shape[1]) + channels)[:, :cols * tw]
+        return bands.reshape((rows, cols, tw) + channels).sum(axis=2), th * tw
+
+    @staticmethod
+    def compute_tile_metrics(img, grid=(4, 4), with_sharpness=True, decode_scale=1):
+        """
+        分块计算亮度、RGB 均值和 Laplacian 方差，全部为整块向量化求和，没有逐块循环
+        块内方差用 E[lap²] - E[lap]² 计算；uint8 图像的 Laplacian 为整数，float32 可精确表示
+        :param grid: (行数, 列数)
+        :return: TileMetrics
+        """
+        if isinstance(img, str):
+            img = OpenCVUtils._load_image(img, decode_scale)
+        rows, cols = grid
+        if img.shape[0] < rows or img.shape[1] < cols:
+            raise ValueError(f"Image {img.shape[1]}x{img.shape[0]} is smaller than grid {cols}x{rows}")
+
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        color, n = OpenCVUtils._block_sums(img, grid, np.uint32)
+        mean_b, mean_g, mean_r = np.moveaxis(color / n, -1, 0)
+        brightness = OpenCVUtils._block_sums(gray, grid, np.uint32)[0] / n
+
+        sharpness = None
+        if with_sharpness:
+            lap = cv2.Laplacian(gray, cv2.CV_32F)
+            s1 = OpenCVUtils._block_sums(lap, grid, np.float64)[0]
+            cv2.multiply(lap, lap, dst=lap)  # 原地平方，不再分配一张整图缓冲
+            s2 = OpenCVUtils._block_sums(lap, grid, np.float64)[0]
+            sharpness = s2 / n - (s1 / n) ** 2
+
+        return TileMetrics(tuple(grid), brightness, mean_r, mean_g, mean_b, sharpness)
+
+    @staticmethod
+    def _eval_3a_tiles(t, image_path, brightness_range=(50, 200), wb_tolerance=25, sharpness_threshold=80,
+                       max_bad_tiles=0, worst=3):
+        """
+        逐块套用与 _eval_3a 相同的阈值，某一项失败的块数超过 max_bad_tiles 即该项失败
+        :return: 与 _eval_3a 相同的字典（metrics 为全图指标），另含 bad_tiles 与 worst_tiles
+        """
+        ae_bad = (t.brightness < brightness_range[0]) | (t.brightness > brightness_range[1])
+        spread = np.maximum(np.maximum(np.abs(t.mean_r - t.mean_g), np.abs(t.mean_g - t.mean_b)),
+                            np.abs(t.mean_r - t.mean_b))
+        awb_bad = spread >= wb_tolerance
+        af_bad = t.sharpness < sharpness_threshold
+        bad = {key: [tuple(int(i) for i in rc) for rc in np.argwhere(mask)]
+               for key, mask in (("AE", ae_bad), ("AWB", awb_bad), ("AF", af_bad))}
+
+        order = np.argsort(t.sharpness, axis=None)[:worst]
+        worst_tiles = [{
+            "tile": (int(r), int(c)),
+            "sharpness": round(float(t.sharpness[r, c]), 2),
+            "brightness": round(float(t.brightness[r, c]), 2),
+            "rgb_means": (round(float(t.mean_r[r, c]), 2), round(float(t.mean_g[r, c]), 2),
+                          round(float(t.mean_b[r, c]), 2))
+        } for r, c in zip(*np.unravel_index(order, t.sharpness.shape))]
+
+        # 块大小相同，块均值的均值即全图均值；清晰度取最模糊的块
+        metrics = {
+            "brightness": round(float(t.brightness.mean()), 2),
+            "rgb_means": (round(float(t.mean_r.mean()), 2), round(float(t.mean_g.mean()), 2),
+                          round(float(t.mean_b.mean()), 2)),
+            "sharpness": round(float(np.min(t.sharpness)), 2)
+        }
+        return {
+            "path": image_path,
+            "exposure": len(bad["AE"]) <= max_bad_tiles,
+            "white_balance": len(bad["AWB"]) <= max_bad_tiles,
+            "focus": len(bad["AF"]) <= max_bad_tiles,
+            "metrics": metrics,
+            "bad_tiles": {key: tiles for key, tiles in bad.items() if tiles},
+            "worst_tiles": worst_tiles
+        }
+
+    @staticmethod
+    def check_3a_tiles(image_path, grid=(4, 4), brightness_range=(50, 200), wb_tolerance=25,
+                       sharpness_threshold=80, max_bad_tiles=0, heatmap_path=None):
+        """
+        分块 3A 检查
+        :param max_bad_tiles: 每一项允许失败的块数
+        :param heatmap_path: 保存清晰度热力图（PNG）的路径
+        """
+        img = OpenCVUtils._load_image(image_path)
+        t = OpenCVUtils.compute_tile_metrics(img, grid)
+        result = OpenCVUtils._eval_3a_tiles(t, image_path, brightness_range, wb_tolerance,
+                                            sharpness_threshold, max_bad_tiles)
+        if heatmap_path:
+            result["heatmap"] = OpenCVUtils.save_tile_heatmap(img, t, heatmap_path, result["bad_tiles"])
+        return result
+
+    @staticmethod
+    def save_tile_heatmap(img, t, heatmap_path, bad_tiles=None, width=640):
+        """
+        在缩小的原图上叠加分块清晰度热力图（对数刻度，蓝=模糊、红=清晰），失败块画框并标注数值
+        :return: heatmap_path
+        """
+        if isinstance(img, str):
+            img = OpenCVUtils._load_image(img, 8)
+        rows, cols = t.grid
+        h = max(int(img.shape[0] * width / img.shape[1]), rows)
+        base = cv2.resize(img, (width, h), interpolation=cv2.INTER_AREA)
+
+        level = np.log1p(t.sharpness)
+        span = float(level.max() - level.min()) or 1.0
+        level = ((level - level.min()) / span * 255).astype(np.uint8)
+        heat = cv2.applyColorMap(cv2.resize(level, (width, h), interpolation=cv2.INTER_NEAREST), cv2.COLORMAP_JET)
+        out = cv2.addWeighted(base, 0.5, heat, 0.5, 0)
+
+        flagged = {rc for tiles in (bad_tiles or {}).values() for rc in tiles}
+        th, tw = h / rows, width / cols
+        for r in range(rows):
+            for c in range(cols):
+                x0, y0 = int(c * tw), int(r * th)
+                if (r, c) in flagged:
+                    cv2.rectangle(out, (x0, y0), (int((c + 1) * tw) - 1, int((r + 1) * th) - 1), (0, 0, 255), 2)
+                cv2.putText(out, f"{t.sharpness[r, c]:.0f}", (x0 + 4, y0 + 16), cv2.FONT_HERSHEY_SIMPLEX,
+                            0.45, (255, 255, 255), 1, cv2.LINE_AA)
+
+        os.makedirs(os.path.dirname(os.path.abspath(heatmap_path)), exist_ok=True)
+        cv2.imwrite(heatmap_path, out)
+        return heatmap_path
+
     # -------------------------------------------------------
     # 图片基础检查
     # -------------------------------------------------------
 
     @staticmethod
     def check_3a(image_path, brightness_range=(50, 200), wb_tolerance=25, sharpness_threshold=80):
-        img = OpenCVUtils._load_image(image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        m = OpenCVUtils.compute_metrics(image_path)
+        return OpenCVUtils._eval_3a(m, image_path, brightness_range, wb_tolerance, sharpness_threshold)
 
+    @staticmethod
+    def _eval_3a(m, image_path, brightness_range=(50, 200), wb_tolerance=25, sharpness_threshold=80):
+        """根据 ImageMetrics 判定 3A"""
         # AE
-        brightness = float(np.mean(gray))
-        exposure_ok = brightness_range[0] <= brightness <= brightness_range[1]
+        exposure_ok = brightness_range[0] <= m.brightness <= brightness_range[1]
 
         # AWB
-        mean_b, mean_g, mean_r = cv2.mean(img)[:3]
-        wb_ok = (abs(mean_r - mean_g) < wb_tolerance and
-                 abs(mean_g - mean_b) < wb_tolerance and
-                 abs(mean_r - mean_b) < wb_tolerance)
+        wb_ok = (abs(m.mean_r - m.mean_g) < wb_tolerance and
+                 abs(m.mean_g - m.mean_b) < wb_tolerance and
+                 abs(m.mean_r - m.mean_b) < wb_tolerance)
 
         # AF
-        laplacian_var = float(cv2.Laplacian(gray, cv2.CV_64F).var())
-        focus_ok = laplacian_var >= sharpness_threshold
+        focus_ok = m.sharpness >= sharpness_threshold
 
         metrics = {
-            "brightness": round(brightness, 2),
-            "rgb_means": (round(mean_r, 2), round(mean_g, 2), round(mean_b, 2)),
-            "sharpness": round(laplacian_var, 2)
+            "brightness": round(m.brightness, 2),
+            "rgb_means": (round(m.mean_r, 2), round(m.mean_g, 2), round(m.mean_b, 2)),
+            "sharpness": round(m.sharpness, 2)
         }
 
         return {
@@ -58,21 +379,8 @@ class OpenCVUtils:
 
     @staticmethod
     def check_abnormal_image(image_path, brightness_threshold=30, color_ratio=1.5):
-        img = OpenCVUtils._load_image(image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        brightness = float(np.mean(gray))
-        mean_b, mean_g, mean_r = cv2.mean(img)[:3]
-
-        abnormal = None
-
-        if brightness < brightness_threshold:
-            abnormal = "black"
-        elif mean_g > mean_r * color_ratio and mean_g > mean_b * color_ratio:
-            abnormal = "green"
-        elif (mean_r + mean_b) / 2 > mean_g * color_ratio:
-            abnormal = "purple"
-
-        return abnormal
+        m = OpenCVUtils.compute_metrics(image_path, brightness_threshold, color_ratio, with_sharpness=False)
+        return m.abnormal
 
     # -------------------------------------------------------
     # 视频检查
@@ -115,6 +423,314 @@ class OpenCVUtils:
             "height": height
         }
 
+    @staticmethod
+    def iter_video_frames(video_path):
+        """
+        逐帧解码视频的生成器，内存中只保留当前帧
+        :return: 迭代 (帧序号, 时间戳毫秒, BGR 帧)
+        """
+        cap = cv2.VideoCapture(video_path)
+        try:
+            index = 0
+            while cap.grab():
+                pts = cap.get(cv2.CAP_PROP_POS_MSEC)
+                ok, frame = cap.retrieve()
+                if not ok or frame is None:
+                    break
+                yield index, pts, frame
+                index += 1
+        finally:
+            cap.release()
+
+    @staticmethod
+    def analyze_video_stream(video_path, black_threshold=20, frozen_threshold=0.0, gap_factor=1.5,
+                             max_frozen_seconds=1.0, max_black_ratio=0.1, min_fps_ratio=0.9):
+        """
+        全帧流式检查：时间戳断档（丢帧）、冻帧、黑帧、尾部损坏、实际帧率
+        :param black_threshold: 帧平均亮度低于该值视为黑帧
+        :param frozen_threshold: 与前一帧缩略图平均差异不超过该值视为冻帧；默认只认逐像素相同的帧，
+                                 静止场景的正常噪声在缩略图上也有 0.01~0.3 的差异，调大前请用真机录像校准
+        :param gap_factor: 相邻时间戳间隔超过 gap_factor 倍标称帧间隔视为断档
+        :param max_frozen_seconds / max_black_ratio / min_fps_ratio: 判定失败的阈值
+        :return: 结果字典，issues 为失败原因列表
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video does not exist: {video_path}")
+
+        cap = cv2.VideoCapture(video_path)
+        open_ok = cap.isOpened()
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+
+        result = {
+            "path": video_path,
+            "open_ok": open_ok,
+            "read_ok": False,
+            "fps": fps,
+            "frame_count": frame_count,
+            "width": width,
+            "height": height,
+            "issues": []
+        }
+        if not open_ok:
+            return result
+
+        start = time.perf_counter()
+        stats = OpenCVUtils._analyze_frames(
+            OpenCVUtils.iter_video_frames(video_path), fps,
+            black_threshold, frozen_threshold, gap_factor
+        )
+        stats["decode_seconds"] = round(time.perf_counter() - start, 3)
+        result.update(stats)
+        result["read_ok"] = stats["frames_decoded"] > 0
+
+        issues = result["issues"]
+        if frame_count and stats["frames_decoded"] < frame_count * 0.98:
+            issues.append(f"truncated (decoded {stats['frames_decoded']}/{frame_count} frames)")
+        if stats["dropped_frames"]:
+            issues.append(f"dropped frames ({stats['dropped_frames']} in {stats['pts_gaps']} gaps)")
+        if fps and stats["longest_frozen"] / fps > max_frozen_seconds:
+            issues.append(f"frozen {stats['longest_frozen']} frames")
+        if stats["frames_decoded"] and stats["black_frames"] / stats["frames_decoded"] > max_black_ratio:
+            issues.append(f"black frames ({stats['black_frames']}/{stats['frames_decoded']})")
+        if fps and stats["fps_effective"] and stats["fps_effective"] < fps * min_fps_ratio:
+            issues.append(f"effective fps {stats['fps_effective']} < claimed {round(fps, 2)}")
+        return result
+
+    @staticmethod
+    def iter_sampled_frames(video_path, samples=None, stride=None):
+        """
+        抽帧生成器：samples 为均匀分布的 N 个位置（seek），stride 为每 k 帧解码一帧（其余帧只 grab）
+        :return: 迭代 (帧序号, 时间戳毫秒, BGR 帧)
+        """
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if stride:
+                index = 0
+                while cap.grab():
+                    if index % stride == 0:
+                        ok, frame = cap.retrieve()
+                        if not ok or frame is None:
+                            break
+                        yield index, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+                    index += 1
+                return
+
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+            samples = min(samples or 10, frame_count)
+            for i in range(samples):
+                index = int(i * frame_count / samples)
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    break
+                yield index, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+        finally:
+            cap.release()
+
+    @staticmethod
+    def analyze_video_sampled(video_path, samples=None, stride=None, brightness_range=(50, 200),
+                              wb_tolerance=25, sharpness_threshold=80, brightness_threshold=30, color_ratio=1.5):
+        """
+        抽帧检查：在抽样帧上执行与图片相同的亮度/白平衡/清晰度/异常色检查
+        :param samples: 均匀抽取的帧数（默认 10）
+        :param stride: 每隔 stride 帧解码一帧，指定后忽略 samples
+        :return: 结果字典，包含 frames_analysed / wall_time / frames_per_sec 与 issues
+        """
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"Video does not exist: {video_path}")
+
+        result = OpenCVUtils.check_video_basic(video_path)
+        result["issues"] = []
+        if not result["open_ok"]:
+            return result
+
+        start = time.perf_counter()
+        failed = {"AE": [], "AWB": [], "AF": [], "Abnormal": []}
+        sampled = []
+        for index, pts, frame in OpenCVUtils.iter_sampled_frames(video_path, samples, stride):
+            m = OpenCVUtils.compute_metrics(frame, brightness_threshold, color_ratio)
+            r = OpenCVUtils._eval_3a(m, video_path, brightness_range, wb_tolerance, sharpness_threshold)
+            sampled.append({"frame": index, "pts": round(pts, 1), "metrics": r["metrics"], "abnormal": m.abnormal})
+            for key, ok in (("AE", r["exposure"]), ("AWB", r["white_balance"]),
+                            ("AF", r["focus"]), ("Abnormal", not m.abnormal)):
+                if not ok:
+                    failed[key].append(index)
+        wall_time = time.perf_counter() - start
+
+        result.update({
+            "mode": f"stride={stride}" if stride else f"samples={samples or 10}",
+            "frames_analysed": len(sampled),
+            "wall_time": round(wall_time, 3),
+            "frames_per_sec": round(len(sampled) / wall_time, 2) if wall_time > 0 else 0.0,
+            "samples": sampled
+        })
+        for key, frames in failed.items():
+            if frames:
+                result["issues"].append(f"{key} FAIL on {len(frames)}/{len(sampled)} sampled frames {frames[:10]}")
+        return result
+
+    @staticmethod
+    def _analyze_frames(frames, fps, black_threshold=20, frozen_threshold=0.0, gap_factor=1.5,
+                        max_events=50):
+        """
+        在帧迭代器上累计统计量，只保留上一帧的缩略图，内存与视频长度无关
+        :param frames: 迭代 (帧序号, 时间戳毫秒, BGR 帧)
+        """
+        interval = 1000.0 / fps if fps else 0
+        frames_decoded = black_frames = frozen_frames = 0
+        pts_gaps = dropped_frames = 0
+        run = longest_frozen = 0
+        first_pts = last_pts = None
+        prev_thumb = None
+        gap_events, frozen_segments = [], []
+
+        for index, pts, frame in frames:
+            frames_decoded += 1
+            thumb = thumbnail(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+
+            if cv2.mean(thumb)[0] < black_threshold:
+                black_frames += 1
+
+            if prev_thumb is not None and cv2.mean(cv2.absdiff(thumb, prev_thumb))[0] <= frozen_threshold:
+                frozen_frames += 1
+                run += 1
+            else:
+                if run and len(frozen_segments) < max_events:
+                    frozen_segments.append((index - run - 1, index - 1))
+                run = 0
+            longest_frozen = max(longest_frozen, run)
+            prev_thumb = thumb
+
+            if last_pts is not None and interval:
+                delta = pts - last_pts
+                if delta > interval * gap_factor:
+                    pts_gaps += 1
+                    dropped_frames += max(1, round(delta / interval) - 1)
+                    if len(gap_events) < max_events:
+                        gap_events.append((index, round(last_pts, 1), round(pts, 1)))
+            if first_pts is None:
+                first_pts = pts
+            last_pts = pts
+
+        if run and len(frozen_segments) < max_events:
+            frozen_segments.append((frames_decoded - run - 1, frames_decoded - 1))
+
+        duration = (last_pts - first_pts) / 1000.0 if frames_decoded > 1 else 0.0
+        return {
+            "frames_decoded": frames_decoded,
+            "duration": round(duration, 3),
+            "fps_effective": round((frames_decoded - 1) / duration, 2) if duration > 0 else 0.0,
+            "pts_gaps": pts_gaps,
+            "dropped_frames": dropped_frames,
+            "gap_events": gap_events,
+            "frozen_frames": frozen_frames,
+            "longest_frozen": longest_frozen,
+            "frozen_segments": frozen_segments,
+            "black_frames": black_frames
+        }
+
+    # -------------------------------------------------------
+    # 单文件分析（可在子进程中执行）
+    # -------------------------------------------------------
+
+    @staticmethod
+    def _init_worker():
+        # 子进程内禁用 OpenCV 自身的多线程，避免与进程池争抢 CPU
+        cv2.setNumThreads(1)
+
+    @staticmethod
+    def _analyze_file(f, check_3a=True, check_abnormal=True, check_video=True, check_kwargs=None,
+                      decode_scale=1, sharpness_scale=None, video_mode="basic", video_kwargs=None,
+                      check_duplicate=False, tile_grid=None, max_bad_tiles=0, heatmap_dir=None, low_memory=False):
+        """
+        分析单个文件，图片只解码一次，所有检查共用同一份像素数据
+        :return: 结果字典，失败判定与文件移动由主进程统一处理
+        """
+        result = {"path": f}
+        lower = f.lower()
+
+        if lower.endswith(".jpg") and check_3a and tile_grid:
+            # 分块模式：一次解码，全图指标（异常色/重复帧）与分块 3A 共用同一份像素
+            img = OpenCVUtils._load_image(f, decode_scale)
+            m = OpenCVUtils.compute_metrics(img, with_sharpness=False, with_hash=check_duplicate)
+            t = OpenCVUtils.compute_tile_metrics(img, tile_grid)
+            result.update(OpenCVUtils._eval_3a_tiles(t, f, max_bad_tiles=max_bad_tiles, **(check_kwargs or {})))
+            if heatmap_dir and result["bad_tiles"]:
+                name = os.path.splitext(os.path.basename(f))[0] + "_heatmap.png"
+                result["heatmap"] = OpenCVUtils.save_tile_heatmap(img, t, os.path.join(heatmap_dir, name),
+                                                                  result["bad_tiles"])
+            if check_abnormal:
+                result["abnormal"] = m.abnormal
+            if check_duplicate:
+                result["dhash"], result["thumb"] = m.dhash, m.thumb
+
+        elif lower.endswith(".jpg"):
+            if check_3a or check_abnormal or check_duplicate:
+                m = OpenCVUtils.compute_metrics(f, with_sharpness=check_3a, with_hash=check_duplicate,
+                                                decode_scale=decode_scale, sharpness_scale=sharpness_scale,
+                                                low_memory=low_memory)
+                if check_3a:
+                    result.update(OpenCVUtils._eval_3a(m, f, **(check_kwargs or {})))
+                if check_abnormal:
+                    result["abnormal"] = m.abnormal
+                if check_duplicate:
+                    result["dhash"], result["thumb"] = m.dhash, m.thumb
+
+        elif lower.endswith(VIDEO_EXTS) and check_video:
+            if video_mode == "stream":
+                result["video"] = OpenCVUtils.analyze_video_stream(f, **(video_kwargs or {}))
+            elif video_mode == "sampled":
+                result["video"] = OpenCVUtils.analyze_video_sampled(f, **(video_kwargs or {}))
+            else:
+                result["video"] = OpenCVUtils.check_video_basic(f)
+
+        return result
+
+    @staticmethod
+    def _iter_analysis(files, workers, **options):
+        """
+        按输入顺序返回每个文件的分析结果
+        :param workers: 进程数，1 表示在当前进程串行执行，0/None 表示使用全部 CPU 核心
+        """
+        analyze = partial(OpenCVUtils._analyze_file, **options)
+        workers = workers or os.cpu_count() or 1
+        workers = min(workers, len(files))
+
+        if workers <= 1:
+            yield from map(analyze, files)
+            return
+
+        logger.info(f"Analyzing {len(files)} files with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers, initializer=OpenCVUtils._init_worker) as pool:
+            # map 保证结果顺序与 files 一致
+            yield from pool.map(analyze, files)
+
+    @staticmethod
+    def _iter_cached_analysis(files, workers, cache, **options):
+        """
+        先查缓存，只分析未命中的文件，新结果写回缓存；返回顺序与 files 一致
+        """
+        params = ResultCache.params_key(options)
+        cached = [cache.get(f, params) for f in files]
+        misses = [f for f, result in zip(files, cached) if result is None]
+        logger.info(f"分析缓存命中 {len(files) - len(misses)}/{len(files)}")
+
+        fresh = OpenCVUtils._iter_analysis(misses, workers, **options)
+        try:
+            for f, result in zip(files, cached):
+                if result is None:
+                    result = next(fresh)
+                    cache.put(f, params, result)
+                yield result
+        finally:
+            # 调用方中途停止迭代或分析出错时，已算出的结果也写回缓存
+            fresh.close()
+            cache.flush()
+
     # -------------------------------------------------------
     # 失败统一处理
     # -------------------------------------------------------
@@ -131,23 +747,120 @@ class OpenCVUtils:
         failures.append(f"{reason}: {new_f}")
         return new_f
 
+    @staticmethod
+    def _collect_failures(result, fail_dir, failures, check_ae=True, check_awb=True, check_af=True,
+                          duplicates=None):
+        """
+        根据分析结果判定失败项，失败文件移动到 fail_dir
+        :param duplicates: DuplicateDetector，按分析顺序逐张比对（需 _analyze_file 开启 check_duplicate）
+        """
+        f = result["path"]
+
+        # ---------------- 图片检查 ----------------
+        # --- 3A ---
+        if "metrics" in result:
+            # 分块模式下附带失败块坐标 (行, 列)
+            bad = result.get("bad_tiles", {})
+            tiles = {key: f", tiles={bad[key]}" if key in bad else "" for key in ("AE", "AWB", "AF")}
+
+            if check_ae and not result["exposure"]:
+                f = OpenCVUtils._handle_fail(
+                    f, fail_dir, failures,
+                    f"AE FAIL (brightness={result['metrics']['brightness']}{tiles['AE']})"
+                )
+
+            if check_awb and not result["white_balance"]:
+                f = OpenCVUtils._handle_fail(
+                    f, fail_dir, failures,
+                    f"AWB FAIL (rgb={result['metrics']['rgb_means']}{tiles['AWB']})"
+                )
+
+            if check_af and not result["focus"]:
+                f = OpenCVUtils._handle_fail(
+                    f, fail_dir, failures,
+                    f"AF FAIL (sharpness={result['metrics']['sharpness']}{tiles['AF']})"
+                )
+
+        # --- 异常图 ---
+        if result.get("abnormal"):
+            f = OpenCVUtils._handle_fail(
+                f, fail_dir, failures,
+                f"Abnormal FAIL ({result['abnormal']})"
+            )
+
+        # --- 重复帧（HAL 返回旧帧） ---
+        if duplicates is not None and result.get("dhash") is not None:
+            match = duplicates.check(result["path"], result["dhash"], result["thumb"])
+            if match:
+                same_as, distance, diff = match
+                f = OpenCVUtils._handle_fail(
+                    f, fail_dir, failures,
+                    f"DUPLICATE FAIL (same as {os.path.basename(same_as)}, distance={distance}, diff={diff})"
+                )
+
+        # ---------------- 视频检查 ----------------
+        v = result.get("video")
+        if v is not None:
+            if not v["open_ok"]:
+                failures.append(f"VIDEO FAIL: cannot open → {f}")
+
+            if not v["read_ok"]:
+                failures.append(f"VIDEO FAIL: cannot read first frame → {f}")
+
+            for issue in v.get("issues", []):
+                failures.append(f"VIDEO FAIL: {issue} → {f}")
+
+        return f
+
     # -------------------------------------------------------
     # 核心入口：自动识别图片/视频并执行检查
     # -------------------------------------------------------
 
     @staticmethod
-    def validate_and_collect(
+    def iter_validate(
             image_path,
-            fail_dir=FAIL_DIR,
+            fail_dir=None,
             check_3a=True,
             check_ae=True,
             check_awb=True,
             check_af=True,
             check_abnormal=True,
             check_video=True,
+            check_duplicate=False,
+            duplicate_detector=None,
+            cache=None,
+            tile_grid=None,
+            max_bad_tiles=0,
+            low_memory=False,
+            workers=ANALYSIS_WORKERS,
+            decode_scale=1,
+            sharpness_scale=None,
+            video_mode="basic",
+            video_kwargs=None,
             **kwargs
     ):
-        results = []
+        """
+        逐个产出分析结果的生成器，失败判定与文件移动在产出前完成，内存中不保留历史结果
+        每个结果字典的 failures 为该文件的失败描述列表
+        :param fail_dir: 失败文件收集目录，默认 device_config.FAIL_DIR
+        :param check_duplicate: 检查重复帧（相机反复返回同一张旧帧），按文件顺序与上一张照片比对
+        :param duplicate_detector: 共享的 DuplicateDetector，跨多次调用（整个测试会话）比对；默认每次调用新建
+        :param cache: 分析结果缓存，ResultCache 实例或 True（使用默认路径）；None 时按 device_config.ANALYSIS_CACHE，
+                      文件内容与检查参数都不变时直接返回上次的结果
+        :param tile_grid: 分块 3A 模式的网格 (行数, 列数)，逐块套用同样的阈值，失败图的清晰度热力图保存到 fail_dir；
+                          None 为全图检查
+        :param max_bad_tiles: 分块模式下每一项允许失败的块数
+        :param low_memory: 低内存模式，条带计算灰度与 float32 Laplacian 方差，缓冲区跨图片复用
+        :param workers: 分析进程数，1 为串行，0/None 为全部 CPU 核心；结果顺序与文件顺序一致
+        :param decode_scale: 快速模式，JPEG 缩放解码倍数（1/2/4/8），默认 1 为原图
+        :param sharpness_scale: 清晰度计算的缩放倍数，默认同 decode_scale
+        :param video_mode: "basic" 只检查能否打开和读取首帧；"stream" 全帧流式检查丢帧/冻帧/黑帧；
+                           "sampled" 抽帧执行图片同款 3A/异常色检查（video_kwargs 传 samples 或 stride）
+        :param video_kwargs: 透传给视频检查的阈值参数
+        :param kwargs: 透传给 check_3a 的阈值参数
+        """
+        basic_logging()
+        fail_dir = fail_dir or device_config.FAIL_DIR
         os.makedirs(fail_dir, exist_ok=True)
 
         # ---------------- 文件发现逻辑 ----------------
@@ -170,73 +883,91 @@ class OpenCVUtils:
         else:
             raise FileNotFoundError(f"Invalid path: {image_path}")
 
-        failures = []
-
         # -------------------------------------------------------
-        # 遍历所有图片/视频
+        # 遍历所有图片/视频（可多进程并行分析，失败处理按顺序在主进程执行）
         # -------------------------------------------------------
 
-        for f in files:
-            original_f = f
-            img_failed = False
-            result = {"path": f}
-
-            is_image = f.lower().endswith(".jpg")
-            is_video = f.lower().endswith((".mp4", ".mov", ".avi", ".mkv"))
-
-            # ---------------- 图片检查 ----------------
-            if is_image:
-
-                # --- 3A ---
-                if check_3a:
-                    r3a = OpenCVUtils.check_3a(f, **kwargs)
-                    result.update(r3a)
-
-                    if check_ae and not r3a["exposure"]:
-                        f = OpenCVUtils._handle_fail(
-                            f, fail_dir, failures,
-                            f"AE FAIL (brightness={r3a['metrics']['brightness']})"
-                        )
-                        img_failed = True
-
-                    if check_awb and not r3a["white_balance"]:
-                        f = OpenCVUtils._handle_fail(
-                            f, fail_dir, failures,
-                            f"AWB FAIL (rgb={r3a['metrics']['rgb_means']})"
-                        )
-                        img_failed = True
-
-                    if check_af and not r3a["focus"]:
-                        f = OpenCVUtils._handle_fail(
-                            f, fail_dir, failures,
-                            f"AF FAIL (sharpness={r3a['metrics']['sharpness']})"
-                        )
-                        img_failed = True
-
-                # --- 异常图 ---
-                if check_abnormal:
-                    abnormal = OpenCVUtils.check_abnormal_image(f)
-                    result["abnormal"] = abnormal
-                    if abnormal:
-                        f = OpenCVUtils._handle_fail(
-                            f, fail_dir, failures,
-                            f"Abnormal FAIL ({abnormal})"
-                        )
-                        img_failed = True
-
-            # ---------------- 视频检查 ----------------
-            if is_video and check_video:
-                v = OpenCVUtils.check_video_basic(f)
-
-                if not v["open_ok"]:
-                    failures.append(f"VIDEO FAIL: cannot open → {f}")
-
-                if not v["read_ok"]:
-                    failures.append(f"VIDEO FAIL: cannot read first frame → {f}")
-
-                result["video"] = v
+        options = dict(
+            check_3a=check_3a,
+            check_abnormal=check_abnormal,
+            check_video=check_video,
+            check_duplicate=check_duplicate,
+            check_kwargs=kwargs,
+            decode_scale=decode_scale,
+            sharpness_scale=sharpness_scale,
+            video_mode=video_mode,
+            video_kwargs=video_kwargs
+        )
+        if low_memory:
+            options["low_memory"] = True
+        if tile_grid:
+            options.update(tile_grid=tuple(tile_grid), max_bad_tiles=max_bad_tiles, heatmap_dir=fail_dir)
+        if cache is None:
+            cache = device_config.ANALYSIS_CACHE
+        own_cache = cache is True
+        if own_cache:
+            cache = ResultCache()
+        if cache:
+            analysis = OpenCVUtils._iter_cached_analysis(files, workers, cache, **options)
+        else:
+            analysis = OpenCVUtils._iter_analysis(files, workers, **options)
+
+        duplicates = (duplicate_detector or DuplicateDetector()) if check_duplicate else None
+        start, count = time.perf_counter(), 0
+        try:
+            for result in analysis:
+                failures = []
+                OpenCVUtils._collect_failures(result, fail_dir, failures, check_ae, check_awb, check_af, duplicates)
+                result["failures"] = failures
+                count += 1
+                yield result
+        finally:
+            if own_cache:
+                cache.close()
+            OpenCVUtils.last_stats = {
+                "files": count,
+                "seconds": round(time.perf_counter() - start, 3),
+                "peak_rss_mb": peak_rss_mb()
+            }
+            logger.info(f"Analyzed {count} files: {OpenCVUtils.last_stats}")
 
-            results.append(result)
+    @staticmethod
+    @trace.traced("validate")
+    def validate_and_collect(
+            image_path,
+            fail_dir=None,
+            check_3a=True,
+            check_ae=True,
+            check_awb=True,
+            check_af=True,
+            check_abnormal=True,
+            check_video=True,
+            check_duplicate=False,
+            duplicate_detector=None,
+            cache=None,
+            tile_grid=None,
+            max_bad_tiles=0,
+            low_memory=False,
+            workers=ANALYSIS_WORKERS,
+            decode_scale=1,
+            sharpness_scale=None,
+            video_mode="basic",
+            video_kwargs=None,
+            **kwargs
+    ):
+        """
+        校验目录/文件并汇总失败项，参数说明见 iter_validate
+        :return: ("PASS", "") 或 ("FAIL", 以 ; 分隔的失败描述)
+        """
+        failures = []
+        for result in OpenCVUtils.iter_validate(
+                image_path, fail_dir=fail_dir, check_3a=check_3a, check_ae=check_ae, check_awb=check_awb,
+                check_af=check_af, check_abnormal=check_abnormal, check_video=check_video,
+                check_duplicate=check_duplicate, duplicate_detector=duplicate_detector, cache=cache,
+                tile_grid=tile_grid, max_bad_tiles=max_bad_tiles, low_memory=low_memory, workers=workers,
+                decode_scale=decode_scale, sharpness_scale=sharpness_scale, video_mode=video_mode,
+                video_kwargs=video_kwargs, **kwargs):
+            failures.extend(result["failures"])
 
         # -------------------------------------------------------
         # 最终结果
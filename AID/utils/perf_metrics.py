@@ -0,0 +1,257 @@
+import os
+import re
+import json
+import time
+import logging
+from datetime import datetime
+from config import device_config
+
+logger = logging.getLogger("PerfMetrics")
+
+PERCENTILES = (50, 90, 99)
+REGRESSION_TOLERANCE = 0.10  # p50 比基线慢超过 10% 判为性能回退
+LAUNCH_FIELDS = ("ThisTime", "TotalTime", "WaitTime")
+
+_AM_LINE_RE = re.compile(r"^\s*(\w+):\s*(.+?)\s*$", re.MULTILINE)
+
+
+def parse_am_start(output):
+    """
+    解析 am start -W 的输出
+    :return: {"ThisTime": ms, "TotalTime": ms, "WaitTime": ms, "Status": "ok", "LaunchState": "COLD"}，
+             缺失的字段不出现在结果中
+    """
+    result = {}
+    for key, value in _AM_LINE_RE.findall(output or ""):
+        if key in LAUNCH_FIELDS:
+            if value.isdigit():
+                result[key] = int(value)
+        elif key in ("Status", "LaunchState"):
+            result[key] = value
+    return result
+
+
+def percentile(values, p):
+    """线性插值分位数（与 numpy.percentile 默认算法一致）"""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of empty sequence")
+    pos = (len(ordered) - 1) * p / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize(values):
+    """
+    :param values: 单个指标 N 次测量值（毫秒）
+    :return: {"runs", "mean", "min", "max", "p50", "p90", "p99"}
+    """
+    summary = {"runs": len(values)}
+    if not values:
+        return summary
+    summary.update(mean=round(sum(values) / len(values), 1), min=round(min(values), 1), max=round(max(values), 1))
+    for p in PERCENTILES:
+        summary[f"p{p}"] = round(percentile(values, p), 1)
+    return summary
+
+
+def format_summary(metric, summary):
+    """报告中一行：launch_total_time: p50=812.0 p90=850.0 p99=861.0 ms (n=10)"""
+    if not summary.get("runs"):
+        return f"{metric}: no samples"
+    pcts = " ".join(f"p{p}={summary[f'p{p}']}" for p in PERCENTILES)
+    return f"{metric}: {pcts} ms (n={summary['runs']})"
+
+
+def compare(baseline, current, stat="p50", tolerance=REGRESSION_TOLERANCE):
+    """
+    对比两个 build 的汇总结果
+    :param baseline: {指标: summary}，上一个 build 的结果
+    :param current: {指标: summary}，本次结果
+    :return: 回退描述列表，例如 "PERF REGRESSION: launch_total_time p50 800.0→950.0ms (+18.8%)"
+    """
+    regressions = []
+    for metric, summary in current.items():
+        old, new = baseline.get(metric, {}).get(stat), summary.get(stat)
+        if not old or new is None:
+            continue
+        delta = (new - old) / old
+        if delta > tolerance:
+            regressions.append(f"PERF REGRESSION: {metric} {stat} {old}→{new}ms ({delta:+.1%})")
+    return regressions
+
+
+def build_fingerprint(adb):
+    """当前设备 build 标识（ro.build.fingerprint），取不到时返回 "unknown" """
+    result = adb.shell("getprop ro.build.fingerprint")
+    return result.output.strip() if result.ok and result.output.strip() else "unknown"
+
+
+class PerfStore:
+    """
+    按 build 保存性能结果：REPORT_PATH/perf/<fingerprint>.json，每次运行追加一条记录，
+    用于回答“这个相机 build 是否变慢了”
+    """
+
+    def __init__(self, perf_dir=None):
+        self.perf_dir = perf_dir or os.path.join(device_config.REPORT_PATH, "perf")
+
+    def path(self, build):
+        return os.path.join(self.perf_dir, re.sub(r"[^\w.-]+", "_", build) + ".json")
+
+    def load(self, build):
+        path = self.path(build)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as fp:
+            return json.load(fp)
+
+    def save(self, build, summary, samples=None):
+        """追加一次运行结果，原子写入"""
+        os.makedirs(self.perf_dir, exist_ok=True)
+        data = self.load(build) or {"build": build, "runs": []}
+        data["runs"].append({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "device": device_config.DEVICE_ID,
+            "summary": summary,
+            "samples": samples or {}
+        })
+        path = self.path(build)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(data, fp, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+        return path
+
+    def baseline(self, build):
+        """
+        其他 build 中最近一次运行的汇总结果，作为对比基线
+        :return: (build, summary)，没有历史结果时 (None, None)
+        """
+        latest = (None, None, "")
+        if not os.path.isdir(self.perf_dir):
+            return None, None
+        for name in os.listdir(self.perf_dir):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.perf_dir, name), encoding="utf-8") as fp:
+                data = json.load(fp)
+            if data.get("build") == build or not data.get("runs"):
+                continue
+            run = data["runs"][-1]
+            if run["time"] > latest[2]:
+                latest = (data["build"], run["summary"], run["time"])
+        return latest[0], latest[1]
+
+
+class CameraPerfSuite:
+    """
+    相机性能测试：冷启动耗时、快门到文件出现的延迟、录像开始/停止延迟，
+    每项测 N 次后按分位数汇总
+    """
+
+    def __init__(self, ui, store=None, poll_interval=0.05):
+        """
+        :param ui: UIAutomatorHelper 实例
+        :param poll_interval: 等待文件出现的轮询间隔（秒），决定延迟测量的分辨率
+        """
+        self.ui = ui
+        self.store = store or PerfStore()
+        self.poll_interval = poll_interval
+        self.samples = {}
+
+    def _add(self, metric, value_ms):
+        self.samples.setdefault(metric, []).append(round(value_ms, 1))
+
+    def _shutter_tap(self):
+        """快门坐标只解析一次，之后直接注入点击，排除控件查询耗时"""
+        x, y = self.ui.shutter_point()
+        return f"input tap {x} {y}"
+
+    def _wait_file(self, extension, timeout, stable_polls=0):
+        return self.ui.capture_waiter.wait_for_new(
+            1, (extension,), timeout=timeout, stable_polls=stable_polls,
+            interval=self.poll_interval, max_interval=self.poll_interval, backoff=1.0)
+
+    def measure_launch(self, runs):
+        """冷启动 runs 次，记录 am start -W 的 ThisTime/TotalTime/WaitTime 和快门可见耗时"""
+        for i in range(runs):
+            launch = self.ui.open_camera(cold=True)
+            logger.info(f"launch {i + 1}/{runs}: {launch}")
+            for field in LAUNCH_FIELDS:
+                if field in launch:
+                    self._add(f"launch_{field}", launch[field])
+            if "ready_ms" in launch:
+                self._add("launch_ready", launch["ready_ms"])
+        return {k: summarize(v) for k, v in self.samples.items() if k.startswith("launch_")}
+
+    def measure_shot_latency(self, runs, timeout=10):
+        """
+        顺序拍照 runs 次，每张等照片落盘后再点下一次：
+        shot_to_file 为点击完成到新照片出现在相册目录的耗时；
+        shot_cycle 为相邻两张照片出现的间隔，即 点击 → 落盘 → 再点击 的一个完整周期
+        （约等于 shot_to_file 加一次点击注入耗时），不是连拍时相机能达到的最小拍摄间隔
+        """
+        tap = self._shutter_tap()
+        self.ui.capture_waiter.snapshot(("jpg",))
+        last_landed = None
+        for _ in range(runs):
+            self.ui.adb.shell(tap)
+            sent = time.monotonic()
+            self._wait_file("jpg", timeout)
+            landed = time.monotonic()
+            self._add("shot_to_file", (landed - sent) * 1000)
+            if last_landed is not None:
+                self._add("shot_cycle", (landed - last_landed) * 1000)
+            last_landed = landed
+        return {k: summarize(self.samples.get(k, [])) for k in ("shot_to_file", "shot_cycle")}
+
+    def measure_video_latency(self, runs, duration=2.0, timeout=15):
+        """
+        录像 runs 次（需已切换到录像模式）：video_start 为点击到 mp4 文件出现的耗时，
+        video_stop 为点击停止到文件大小稳定的耗时（包含一个轮询周期的稳定判定窗口）
+        """
+        tap = self._shutter_tap()
+        for _ in range(runs):
+            self.ui.capture_waiter.snapshot(("mp4",))
+            self.ui.adb.shell(tap)
+            sent = time.monotonic()
+            self._wait_file("mp4", timeout)
+            self._add("video_start", (time.monotonic() - sent) * 1000)
+            time.sleep(duration)
+
+            self.ui.adb.shell(tap)
+            sent = time.monotonic()
+            self.ui.capture_waiter.wait_stable(("mp4",), timeout=timeout, interval=self.poll_interval,
+                                               max_interval=self.poll_interval, backoff=1.0)
+            self._add("video_stop", (time.monotonic() - sent) * 1000)
+        return {k: summarize(self.samples.get(k, [])) for k in ("video_start", "video_stop")}
+
+    def summary(self):
+        return {metric: summarize(values) for metric, values in self.samples.items()}
+
+    def publish(self, report=None, case_prefix="perf", tolerance=REGRESSION_TOLERANCE):
+        """
+        保存本次结果并与上一个 build 对比，每个指标写一行报告
+        :param report: SimpleReport 实例，None 时只保存不写报告
+        :return: 性能回退描述列表
+        """
+        build = build_fingerprint(self.ui.adb)
+        summary = self.summary()
+        base_build, base_summary = self.store.baseline(build)
+        path = self.store.save(build, summary, self.samples)
+        logger.info(f"性能结果已保存: {path}")
+
+        regressions = []
+        for metric, stats in summary.items():
+            issues = compare({metric: base_summary.get(metric, {})}, {metric: stats}, tolerance=tolerance) \
+                if base_summary else []
+            if issues:
+                issues.append(f"baseline build: {base_build}")
+            regressions.extend(issues)
+            if report is not None:
+                # 通过的指标 comments 只是统计信息，不标红
+                report.add_result(f"{case_prefix}_{metric}", stats["runs"], "FAIL" if issues else "PASS",
+                                  [format_summary(metric, stats)] + issues, highlight=bool(issues))
+        return regressions
@@ -0,0 +1,116 @@
+import os
+import hashlib
+import logging
+from typing import NamedTuple, Optional
+from config import device_config
+from utils import trace
+from utils._lazy import lazy_import
+from utils.jpeg_meta import HEAD_BYTES, exif_thumbnail
+from utils.opencv_utils import OpenCVUtils
+
+cv2 = lazy_import("cv2", globals())
+np = lazy_import("numpy", globals(), "np")
+
+logger = logging.getLogger("Prescreen")
+
+MIN_CAPTURE_BYTES = 100 * 1024  # 小于该大小的照片视为截断/空文件，必须拉取
+# 缩略图指标离阈值较近时也拉取原图：各阈值向“更严格”方向收紧的比例
+PRESCREEN_MARGIN = 0.1
+
+
+class ScreenResult(NamedTuple):
+    remote: str
+    size: int
+    pull: bool
+    reason: str  # too_small / no_thumbnail / abnormal:black / AE / AWB / sampled / ok
+    metrics: Optional[dict]
+
+
+class Prescreener:
+    """
+    设备端预筛：只读取每张照片的文件头（EXIF 缩略图，几 KB），在本地用缩略图计算亮度/颜色，
+    可疑或被抽样的照片才拉取原图做完整校验，明显正常的照片不再经过 USB 传输；
+    清晰度（AF）无法在缩略图上判断，由抽样拉取覆盖
+    """
+
+    def __init__(self, adb, sample_rate=None, min_bytes=MIN_CAPTURE_BYTES, margin=PRESCREEN_MARGIN,
+                 brightness_range=(50, 200), wb_tolerance=25, brightness_threshold=30, color_ratio=1.5):
+        """
+        :param adb: AdbUtils 实例
+        :param sample_rate: 缩略图正常的照片中仍拉取原图的比例（0~1），默认 device_config.PRESCREEN_SAMPLE_RATE；
+                            按文件名哈希抽样，同一文件的结果可复现
+        :param min_bytes: 小于该字节数的照片直接拉取
+        :param margin: 阈值收紧比例，缩略图与原图的均值略有偏差，留出余量
+        其余阈值与 OpenCVUtils.check_3a / check_abnormal_image 的默认值一致
+        """
+        self.adb = adb
+        self.sample_rate = device_config.PRESCREEN_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.min_bytes = min_bytes
+        lo, hi = brightness_range
+        self.brightness_range = (lo * (1 + margin), hi * (1 - margin))
+        self.wb_tolerance = wb_tolerance * (1 - margin)
+        self.brightness_threshold = brightness_threshold * (1 + margin)
+        self.color_ratio = 1 + (color_ratio - 1) * (1 - margin)
+        self.last_stats = None
+
+    def sampled(self, remote):
+        """按文件名哈希抽样，结果与运行次数无关"""
+        if self.sample_rate >= 1:
+            return True
+        digest = hashlib.blake2b(os.path.basename(remote).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") < self.sample_rate * 2 ** 64
+
+    def judge(self, head):
+        """
+        根据文件头判断照片是否可疑
+        :return: (原因, 缩略图指标)，原因为 "ok" 表示缩略图正常
+        """
+        thumb = exif_thumbnail(head)
+        img = cv2.imdecode(np.frombuffer(thumb, np.uint8), cv2.IMREAD_COLOR) if thumb else None
+        if img is None:
+            return "no_thumbnail", None
+
+        m = OpenCVUtils.compute_metrics(img, self.brightness_threshold, self.color_ratio, with_sharpness=False)
+        metrics = {"brightness": round(m.brightness, 2),
+                   "rgb_means": (round(m.mean_r, 2), round(m.mean_g, 2), round(m.mean_b, 2))}
+        if m.abnormal:
+            return f"abnormal:{m.abnormal}", metrics
+        if not self.brightness_range[0] <= m.brightness <= self.brightness_range[1]:
+            return "AE", metrics
+        spread = max(abs(m.mean_r - m.mean_g), abs(m.mean_g - m.mean_b), abs(m.mean_r - m.mean_b))
+        if spread >= self.wb_tolerance:
+            return "AWB", metrics
+        return "ok", metrics
+
+    @trace.traced("prescreen")
+    def screen(self, entries):
+        """
+        :param entries: [(远端路径, 字节数), ...]
+        :return: [ScreenResult]，与 entries 顺序一致
+        """
+        heads = self.adb.read_heads([(r, s) for r, s in entries if s >= self.min_bytes], HEAD_BYTES)
+        results = []
+        for remote, size in entries:
+            metrics = None
+            if size < self.min_bytes:
+                reason = "too_small"
+            elif remote not in heads:
+                reason = "no_thumbnail"
+            else:
+                reason, metrics = self.judge(heads[remote])
+            if reason == "ok" and self.sampled(remote):
+                reason = "sampled"
+            results.append(ScreenResult(remote, size, reason != "ok", reason, metrics))
+
+        reasons = {}
+        for r in results:
+            reasons[r.reason] = reasons.get(r.reason, 0) + 1
+        self.last_stats = {
+            "files": len(results),
+            "pulled": sum(r.pull for r in results),
+            "head_bytes": sum(len(h) for h in heads.values()),
+            "skipped_bytes": sum(r.size for r in results if not r.pull),
+            "reasons": reasons
+        }
+        logger.info(f"预筛: {self.last_stats}")
+        return results
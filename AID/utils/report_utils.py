@@ -1,54 +1,69 @@
 import os
+import json
+import atexit
 import logging
+import functools
 from datetime import datetime
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import PatternFill, Alignment, Border, Side, Font
-from config.device_config import REPORT_PATH
+from types import SimpleNamespace
+from config import device_config
+from utils import trace
+from utils._lazy import basic_logging
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+HEADERS = ["Case_Name", "Loops", "Result", "Comments", "Stages"]
+
+
+@functools.lru_cache(maxsize=None)
+def _xl():
+    """openpyxl 及样式对象，第一次渲染报告时才导入和创建"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    from openpyxl.styles import PatternFill, Alignment, Border, Side, Font
+    return SimpleNamespace(
+        Workbook=Workbook, WriteOnlyCell=WriteOnlyCell, get_column_letter=get_column_letter,
+        Alignment=Alignment, Font=Font,
+        # 格子边框
+        BORDER=Border(
+            left=Side(style="thin"),
+            right=Side(style="thin"),
+            top=Side(style="thin"),
+            bottom=Side(style="thin")
+        ),
+        YELLOW=PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"),
+        GREEN=PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid"),
+        RED=PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid"),
+    )
 
 
 class SimpleReport:
+    """
+    测试结果先逐行追加到 JSONL 日志（每行落盘，进程被杀也不丢已完成的结果），
+    会话结束时一次性渲染成带样式的 Excel
+    """
     _instance = None  
     _report_file = None  
+    _journal_file = None
+    _dirty = False
 
-    def __new__(cls, report_dir=REPORT_PATH):
+    def __new__(cls, report_dir=None):
         """单例模式，保证 pytest 一次运行只有一个 Excel 报告"""
         if cls._instance is None:
+            basic_logging()
             cls._instance = super(SimpleReport, cls).__new__(cls)
+            report_dir = report_dir or device_config.REPORT_PATH
 
             os.makedirs(report_dir, exist_ok=True)
 
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             cls._report_file = os.path.join(report_dir, f"test_report_{timestamp}.xlsx")
+            cls._journal_file = os.path.splitext(cls._report_file)[0] + ".jsonl"
+            open(cls._journal_file, "a", encoding="utf-8").close()
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "TestReport"
-            headers = ["Case_Name", "Loops", "Result", "Comments"]
-            ws.append(headers)
-
-            # 表头样式：黄色背景、加粗、居中、加边框
-            header_font = Font(bold=True)
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin")
-            )
-
-            for i, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=i)
-                cell.fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="left", vertical="center")
-                cell.border = border
-                ws.column_dimensions[get_column_letter(i)].width = 30
-
-            wb.save(cls._report_file)
-            logger.info(f"[Report Init] Excel 报告生成: {cls._report_file}")
+            # 正常退出时自动渲染；被强杀时可用 SimpleReport.render 从 jsonl 恢复
+            atexit.register(cls.close)
+            logger.info(f"[Report Init] 结果日志: {cls._journal_file}, Excel 报告: {cls._report_file}")
 
         return cls._instance
 
@@ -56,46 +71,111 @@ class SimpleReport:
     def report_file(self):
         return self._report_file
 
-    def add_result(self, case_name, loops, result, comments=""):
-        """写入一条测试结果到 Excel"""
+    @property
+    def journal_file(self):
+        return self._journal_file
+
+    @trace.traced("report.add_result")
+    def add_result(self, case_name, loops, result, comments="", highlight=True):
+        """
+        追加一条测试结果（O(1)，立即 fsync 落盘）
+        :param highlight: comments 有内容时是否标红；comments 只是说明信息（如性能统计）时传 False
+        """
         if isinstance(comments, (list, tuple)):
             comments = "\n".join(str(c) for c in comments)
         else:
             comments = comments.replace(";", "\n")
 
-        wb = load_workbook(self._report_file)
-        ws = wb.active
+        # 开启埋点（AID_TRACE=1）时附带当前用例截至此刻的阶段耗时
+        stages = trace.format_stages() if trace.enabled() else ""
+        row = {"case_name": case_name, "loops": loops, "result": result, "comments": comments, "stages": stages,
+               "highlight": highlight, "device": device_config.DEVICE_ID, "time": datetime.now().isoformat(timespec="seconds")}
+        with open(self._journal_file, "a", encoding="utf-8") as fp:
+            fp.write(json.dumps(row, ensure_ascii=False) + "\n")
+            fp.flush()
+            os.fsync(fp.fileno())
+        SimpleReport._dirty = True
 
-        ws.append([case_name, loops, result, comments])
+        logger.info(f"Report updated: {case_name} | {loops} | {result} | {comments}")
 
-        result_cell = ws.cell(row=ws.max_row, column=3)
-        comments_cell = ws.cell(row=ws.max_row, column=4)
+    @classmethod
+    def close(cls):
+        """把本次运行的结果日志渲染成 Excel（可重复调用）"""
+        if cls._instance is None or not cls._dirty:
+            return None
+        cls._dirty = False
+        return cls.render(cls._journal_file, cls._report_file)
+
+    @staticmethod
+    def read_journal(journal_file):
+        """逐行读取结果日志，跳过进程被杀时写了一半的最后一行"""
+        with open(journal_file, encoding="utf-8") as fp:
+            for line_no, line in enumerate(fp, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"跳过损坏的结果行 {journal_file}:{line_no}")
+
+    @staticmethod
+    def render(journal_file, report_file=None):
+        """
+        从 JSONL 结果日志生成 Excel 报告（openpyxl write-only 模式，内存与行数无关）
+        :return: Excel 文件路径
+        """
+        report_file = report_file or os.path.splitext(journal_file)[0] + ".xlsx"
+
+        xl = _xl()
+        wb = xl.Workbook(write_only=True)
+        ws = wb.create_sheet("TestReport")
+        for i in range(1, len(HEADERS) + 1):
+            ws.column_dimensions[xl.get_column_letter(i)].width = 30
+
+        # 表头样式：黄色背景、加粗、居中、加边框
+        header = []
+        for title in HEADERS:
+            cell = xl.WriteOnlyCell(ws, value=title)
+            cell.fill = xl.YELLOW
+            cell.font = xl.Font(bold=True)
+            cell.alignment = xl.Alignment(horizontal="left", vertical="center")
+            cell.border = xl.BORDER
+            header.append(cell)
+        ws.append(header)
+
+        rows = 0
+        for row in SimpleReport.read_journal(journal_file):
+            ws.append(SimpleReport._styled_row(ws, row))
+            rows += 1
+
+        tmp = report_file + ".tmp"
+        wb.save(tmp)
+        os.replace(tmp, report_file)
+        logger.info(f"[Report] Excel 报告已生成: {report_file} ({rows} 条结果)")
+        return report_file
+
+    @staticmethod
+    def _styled_row(ws, row):
+        result, comments = row["result"], row["comments"]
+        xl = _xl()
+        values = (row["case_name"], row["loops"], result, comments, row.get("stages", ""))
+        cells = [xl.WriteOnlyCell(ws, value=v) for v in values]
+
+        # 整行加边框
+        for cell in cells:
+            cell.border = xl.BORDER
 
         # 换行
-        comments_cell.alignment = Alignment(wrap_text=True)
-
-        # 格子边框
-        border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin")
-        )
-
-        # 整行加边框（四列）
-        for col in range(1, 5):
-            ws.cell(row=ws.max_row, column=col).border = border
+        cells[3].alignment = xl.Alignment(wrap_text=True)
+        cells[4].alignment = xl.Alignment(wrap_text=True)
 
         # 结果背景色
         if result.upper() == "PASS":
-            result_cell.fill = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")
+            cells[2].fill = xl.GREEN
         elif result.upper() == "FAIL":
-            result_cell.fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
+            cells[2].fill = xl.RED
 
         # comments 有内容 → 标红
-        if comments.strip():
-            comments_cell.fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
-
-        wb.save(self._report_file)
-
-        logger.info(f"Report updated: {case_name} | {loops} | {result} | {comments}")
+        if comments.strip() and row.get("highlight", True):
+            cells[3].fill = xl.RED
+        return cells
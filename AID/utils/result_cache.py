@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+from config import device_config
+
+logger = logging.getLogger(__name__)
+
+# 分析逻辑变化（指标算法、结果字段）时递增，旧缓存自动失效
+CACHE_VERSION = 1
+_HASH_CHUNK = 1 << 20
+
+
+class ResultCache:
+    """
+    分析结果磁盘缓存（SQLite）：键为 文件内容哈希 + 检查参数哈希，
+    同一张图换路径（移入 FAIL_DIR）仍命中，阈值变化自动失效；按总字节数做 LRU 淘汰
+    """
+
+    def __init__(self, path=None, max_mb=None):
+        """
+        :param path: 缓存数据库路径，默认 device_config.ANALYSIS_CACHE_PATH
+        :param max_mb: 结果总大小上限（MB），默认 device_config.ANALYSIS_CACHE_MB
+        """
+        self.path = path or device_config.ANALYSIS_CACHE_PATH
+        self.max_bytes = int((max_mb or device_config.ANALYSIS_CACHE_MB) * 1024 * 1024)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # 多个 xdist worker 可能共用同一个缓存文件
+        self._db = sqlite3.connect(self.path, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT);
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, value BLOB, size INTEGER, last_used REAL);
+            CREATE INDEX IF NOT EXISTS results_lru ON results (last_used);
+        """)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def params_key(options):
+        """检查参数（含阈值）→ 稳定的哈希"""
+        payload = json.dumps({"version": CACHE_VERSION, "options": options}, sort_keys=True, default=repr)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def content_hash(self, path):
+        """文件内容哈希；路径、大小、mtime 未变时直接取上次的结果，不重新读文件"""
+        st = os.stat(path)
+        row = self._db.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(_HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                         (path, st.st_size, st.st_mtime_ns, digest))
+        return digest
+
+    def _key(self, path, params):
+        return f"{self.content_hash(path)}:{params}"
+
+    def get(self, path, params):
+        """
+        :param params: params_key 的返回值
+        :return: 分析结果字典（path 为当前路径），未命中返回 None
+        """
+        key = self._key(path, params)
+        row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+        result = pickle.loads(row[0])
+        result["path"] = path
+        return result
+
+    def put(self, path, params, result):
+        value = pickle.dumps({k: v for k, v in result.items() if k != "path"}, protocol=pickle.HIGHEST_PROTOCOL)
+        self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                         (self._key(path, params), value, len(value), time.time()))
+        self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        """总大小超过上限时按最近使用时间淘汰，降到上限的 90%"""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - int(self.max_bytes * 0.9)
+        victims, freed = [], 0
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if freed >= target:
+                break
+            victims.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM results WHERE key = ?", victims)
+        logger.info(f"分析缓存淘汰 {len(victims)} 条, 释放 {freed} 字节")
+
+    def flush(self):
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
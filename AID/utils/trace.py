@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import logging
+import threading
+import functools
+
+logger = logging.getLogger(__name__)
+
+
+class _State:
+    enabled = False
+    test = None
+    origin = 0.0
+    events = []  # Chrome trace 事件
+    records = []  # (名称, 自身耗时秒, 总耗时秒, 嵌套深度, 线程 id)，用于阶段汇总
+
+
+_state = _State()
+_local = threading.local()
+_clock = time.perf_counter  # 计时时钟，单元测试替换为可控时钟
+
+
+def enable(flag=True):
+    """开启/关闭埋点；关闭时 span / traced 只多一次布尔判断"""
+    _state.enabled = bool(flag)
+
+
+def enabled():
+    return _state.enabled
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start", "child")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.child = 0.0
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        end = _clock()
+        stack = _local.stack
+        stack.pop()
+        dur = end - self.start
+        if stack:
+            stack[-1].child += dur
+        tid = threading.get_ident()
+        _state.events.append({
+            "name": self.name, "cat": self.cat, "ph": "X", "pid": os.getpid(), "tid": tid,
+            "ts": round((self.start - _state.origin) * 1e6, 1), "dur": round(dur * 1e6, 1),
+            "args": self.args
+        })
+        _state.records.append((self.name, dur - self.child, dur, len(stack), tid))
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, cat="aid", **args):
+    """
+    计时上下文管理器，关闭时返回共享的空对象
+    用法：with trace.span("pull", files=3): ...
+    """
+    if not _state.enabled:
+        return _NOOP
+    return _Span(name, cat, args)
+
+
+def traced(name=None, cat="aid"):
+    """函数计时装饰器，默认以 类名.函数名 作为阶段名"""
+    def decorator(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sleep(seconds):
+    """带埋点的 time.sleep，固定等待单独计为 sleep 阶段"""
+    if not _state.enabled:
+        time.sleep(seconds)
+        return
+    with _Span("sleep", "wait", {"seconds": seconds}):
+        time.sleep(seconds)
+
+
+def begin(test_name):
+    """开始记录一条用例的时间线"""
+    _state.test = test_name
+    _state.events = []
+    _state.records = []
+    _state.origin = _clock()
+
+
+def stages():
+    """
+    当前用例按阶段名汇总的自身耗时（不含嵌套子阶段），按耗时降序；
+    untraced 为测试线程上未被任何阶段覆盖的时间。后台线程（如流水线拉取）与主线程并发，合计可能超过墙钟时间
+    :return: [(阶段名, 秒)]
+    """
+    wall = _clock() - _state.origin
+    totals = {}
+    covered = 0.0
+    main = threading.get_ident()
+    for name, self_time, dur, depth, tid in list(_state.records):
+        totals[name] = totals.get(name, 0.0) + self_time
+        if depth == 0 and tid == main:
+            covered += dur
+    result = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+    result.append(("untraced", max(wall - covered, 0.0)))
+    return result
+
+
+def format_stages(items=None, limit=8):
+    """报告 Stages 列：每行 “阶段名 耗时s”，超出 limit 的阶段合并为 others"""
+    items = stages() if items is None else items
+    untraced = [i for i in items if i[0] == "untraced"]
+    items = [i for i in items if i[0] != "untraced"]
+    head, tail = items[:limit], items[limit:]
+    if tail:
+        head.append(("others", sum(t for _, t in tail)))
+    return "\n".join(f"{name} {seconds:.2f}s" for name, seconds in head + untraced)
+
+
+def export(path):
+    """把当前用例的时间线写成 Chrome trace JSON（chrome://tracing 或 Perfetto 打开）"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    meta = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": _state.test or "aid"}}]
+    with open(path, "w", encoding="utf-8") as fp:
+        json.dump({"traceEvents": meta + list(_state.events), "displayTimeUnit": "ms",
+                   "otherData": {"test": _state.test, "stages": dict(stages())}}, fp, ensure_ascii=False)
+    logger.info(f"[Trace] {_state.test} 时间线已导出: {path}")
+    return path
+
+
+def end(path=None):
+    """结束当前用例：可选导出时间线，返回阶段汇总"""
+    summary = stages()
+    if path:
+        export(path)
+    _state.test = None
+    _state.events = []
+    _state.records = []
+    return summary
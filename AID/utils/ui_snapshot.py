@@ -0,0 +1,135 @@
+import re
+import time
+import logging
+import xml.etree.ElementTree as ET
+from utils import trace
+
+logger = logging.getLogger("UISnapshot")
+
+# uiautomator2 选择器参数 -> dump_hierarchy 节点属性
+SELECTOR_ATTRS = {
+    "resourceId": "resource-id",
+    "text": "text",
+    "description": "content-desc",
+}
+
+_BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+def _selector_key(selector):
+    unknown = set(selector) - set(SELECTOR_ATTRS)
+    if unknown:
+        raise ValueError(f"不支持的选择器参数: {sorted(unknown)}，仅支持 {list(SELECTOR_ATTRS)}")
+    return tuple(sorted(selector.items()))
+
+
+class DirectSelector:
+    """直接使用 uiautomator2 选择器，每次 exists/click 都是一次 RPC 往返（旧行为）"""
+
+    def __init__(self, device):
+        self.device = device
+
+    @trace.traced("ui.rpc")
+    def exists(self, **selector):
+        return self.device(**selector).exists
+
+    @trace.traced("ui.rpc")
+    def click(self, **selector):
+        self.device(**selector).click()
+
+    @trace.traced("ui.rpc")
+    def wait(self, timeout=10.0, **selector):
+        """等待控件出现，超时返回 False"""
+        return self.device(**selector).wait(timeout=timeout)
+
+    @trace.traced("ui.rpc")
+    def bounds(self, **selector):
+        node = self.device(**selector)
+        if not node.exists:
+            return None
+        b = node.info["bounds"]
+        return b["left"], b["top"], b["right"], b["bottom"]
+
+    def invalidate(self):
+        pass
+
+
+class UISnapshot:
+    """
+    界面快照：一次 dump_hierarchy 拉取整棵控件树，按 resource-id / text / content-desc
+    建本地索引，之后的 exists / bounds 查询都在本地完成；点击后界面会变化，缓存随之失效
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self._index = None
+        self._resolved = {}
+        self.dumps = 0
+
+    def invalidate(self):
+        """界面发生变化（点击、按键、等待动画）后调用，下次查询重新 dump"""
+        self._index = None
+        self._resolved = {}
+
+    @trace.traced("ui.dump")
+    def refresh(self):
+        xml = self.device.dump_hierarchy()
+        self.dumps += 1
+        index = {}
+        for node in ET.fromstring(xml).iter("node"):
+            match = _BOUNDS_RE.match(node.get("bounds", ""))
+            if not match:
+                continue
+            bounds = tuple(int(v) for v in match.groups())
+            for attr in SELECTOR_ATTRS.values():
+                value = node.get(attr)
+                if value:
+                    index.setdefault((attr, value), []).append(bounds)
+        self._index = index
+        self._resolved = {}
+        return index
+
+    def bounds(self, **selector):
+        """
+        多个条件同时满足（同一节点）时返回其 (left, top, right, bottom)，否则 None
+        """
+        key = _selector_key(selector)
+        if key in self._resolved:
+            return self._resolved[key]
+        if self._index is None:
+            self.refresh()
+
+        candidates = None
+        for name, value in selector.items():
+            found = set(self._index.get((SELECTOR_ATTRS[name], value), ()))
+            candidates = found if candidates is None else candidates & found
+        result = min(candidates) if candidates else None
+        self._resolved[key] = result
+        return result
+
+    def exists(self, **selector):
+        return self.bounds(**selector) is not None
+
+    @trace.traced("ui.wait")
+    def wait(self, timeout=10.0, interval=0.2, **selector):
+        """
+        轮询等待控件出现（每轮重新 dump），超时返回 False
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.invalidate()
+            if self.exists(**selector):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+
+    @trace.traced("ui.click")
+    def click(self, **selector):
+        bounds = self.bounds(**selector)
+        if bounds is None:
+            raise RuntimeError(f"界面中未找到控件: {selector}")
+        left, top, right, bottom = bounds
+        self.device.click((left + right) // 2, (top + bottom) // 2)
+        self.invalidate()
@@ -1,38 +1,56 @@
 # utils/uiautomator_helper.py
-import uiautomator2 as u2
 import time
 import os
 import logging
+import statistics
+from utils import trace
+from utils._lazy import lazy_import
 from utils.adb_utils import AdbUtils
-from config.device_config import CAMERA_APP_ACTIVITY, DATA_PATH, OUTPUT_PATH
+from utils.media_sync import MediaSync
+from utils.prescreen import Prescreener
+from utils.capture_waiter import CaptureWaiter
+from utils.ui_snapshot import UISnapshot, DirectSelector
+from utils.perf_metrics import parse_am_start
+from config import device_config
+from config.device_config import CAMERA_APP_ACTIVITY, DATA_PATH
+
+u2 = lazy_import("uiautomator2", globals(), "u2")
 
 WAIT = 2
+CAPTURE_TIMEOUT = 15  # 等待单个拍照/录像文件落盘的超时时间（秒）
+SETTLE_TIMEOUT = 10  # 拉取前等待目录稳定的最长时间（秒），对应原来的固定 sleep(10)
+LAUNCH_TIMEOUT = 5  # 启动相机后等待快门按钮出现的最长时间（秒），对应原来的固定 sleep(5)
 
 # 日志配置
 logger = logging.getLogger("UIAutomatorHelper")
 logger.setLevel(logging.DEBUG)  # 控制日志最低级别
 
-# 控制台输出
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-
-# 文件输出（保存到 logs/uiautomator.log）
-os.makedirs("logs", exist_ok=True)
-file_handler = logging.FileHandler("logs/uiautomator.log", encoding="utf-8")
-file_handler.setLevel(logging.DEBUG)
 
-# 日志格式
-formatter = logging.Formatter(
-    "%(asctime)s [%(levelname)s] %(name)s: %(message)s", 
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
-console_handler.setFormatter(formatter)
-file_handler.setFormatter(formatter)
-
-# 避免重复添加 handler
-if not logger.handlers:
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+def _setup_logging(to_file=True):
+    """
+    第一次创建 UIAutomatorHelper 时才添加 handler 并创建 logs/，import 本身不产生文件
+    :param to_file: 是否写 logs/uiautomator.log
+    """
+    # 日志格式
+    formatter = logging.Formatter(
+        "%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    )
+
+    # 控制台输出（避免重复添加 handler）
+    if not logger.handlers:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.DEBUG)
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+
+    # 文件输出（保存到 logs/uiautomator.log）
+    if to_file and not any(isinstance(h, logging.FileHandler) for h in logger.handlers):
+        os.makedirs("logs", exist_ok=True)
+        file_handler = logging.FileHandler("logs/uiautomator.log", encoding="utf-8")
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
 
 #id
 pic_vid_button = "com.android.camera:id/snap_layout"
@@ -41,117 +59,298 @@ more_mode_button = "com.android.camera:id/menu_indicator"
 
 
 class UIAutomatorHelper:
-    def __init__(self, device_id=None):
-        self.device = u2.connect(device_id) if device_id else u2.connect()
+    def __init__(self, device_id=None, use_snapshot=True, device=None, prescreen=False, warm=None, log_file=None):
+        """
+        :param use_snapshot: True 时控件查询基于 dump_hierarchy 快照在本地完成，减少 RPC 往返
+        :param device: 已连接的 uiautomator2 设备对象，不传则按 device_id 连接
+        :param prescreen: True 时照片同步先做 EXIF 缩略图预筛，只拉取可疑或抽样的原图（压测用）
+        :param warm: True 时相机处于基线状态就热启动（不结束进程），默认 device_config.WARM_CAMERA
+        :param log_file: 是否写 logs/uiautomator.log，默认 device_config.UI_LOG_FILE
+        """
+        _setup_logging(to_file=device_config.UI_LOG_FILE if log_file is None else log_file)
+        if device is None:
+            device = u2.connect(device_id) if device_id else u2.connect()
+        self.device = device
+        self.ui = UISnapshot(self.device) if use_snapshot else DirectSelector(self.device)
         self.device_id = self.device.serial
-        self.adb = AdbUtils(device_id or self.device.serial)
+        self.adb = AdbUtils(device_id or self.device.serial, persistent=True)
+        # 多设备并行时每个 worker 的 OUTPUT_PATH 不同，运行时读取
+        self.media_sync = MediaSync(self.adb, DATA_PATH, device_config.OUTPUT_PATH,
+                                    prescreen=Prescreener(self.adb) if prescreen else None)
+        self.capture_waiter = CaptureWaiter(self.adb, DATA_PATH)
+        self.shot_timestamps = []
+        self.last_burst_stats = None
+        self.last_launch = None
+        self.warm = device_config.WARM_CAMERA if warm is None else warm
+        # 偏离基线（拍照模式、1x、未录像、菜单已关闭）的状态项；None 表示未知（尚未由本实例启动过相机）
+        self._dirty = None
         logger.info(f"已连接设备: {self.device_id}")
 
+    def use_prescreen(self, enable):
+        """会话级复用实例时按用例开关照片预筛"""
+        self.media_sync.prescreen = Prescreener(self.adb) if enable else None
+
+    @property
+    def at_baseline(self):
+        return self._dirty is not None and not self._dirty
 
-    def open_camera(self):
-        """打开相机应用"""
-        logger.info("正在打开相机应用...")
-        self.device.press("home")
-        time.sleep(1)
-        os.system(f"adb -s {self.device_id} shell am start -S -W -n {CAMERA_APP_ACTIVITY}")
-        time.sleep(5)
-        logger.debug("相机应用已启动")
 
+    @trace.traced("open_camera")
+    def open_camera(self, ready_timeout=LAUNCH_TIMEOUT, cold=None):
+        """
+        打开相机应用：am start -S -W 冷启动，解析启动耗时，之后等待快门按钮出现（替代固定 sleep 5 秒）；
+        热启动模式下相机仍处于基线状态时不结束进程、不回主屏，直接 am start -W 拉到前台
+        :param cold: True 强制冷启动，False 尽量热启动，None 按 self.warm；热启动等不到快门按钮时回退冷启动
+        :return: {"ThisTime", "TotalTime", "WaitTime", "Status", "LaunchState", "ready_ms"}，
+                 ready_ms 为从发起启动到快门可见的主机端耗时（毫秒）；同时保存在 self.last_launch
+        """
+        if cold is None:
+            cold = not self.warm
+        if not cold and self.at_baseline:
+            logger.info("相机处于基线状态，热启动...")
+            launch = self._launch(ready_timeout, force_stop=False)
+            if "ready_ms" in launch:
+                return launch
+            logger.warning("热启动未回到拍照界面，改为冷启动")
 
-    def take_picture(self, loops):
-        """拍照"""
+        logger.info("正在打开相机应用...")
+        self.device.press("home")
+        self.ui.invalidate()
+        trace.sleep(1)
+        return self._launch(ready_timeout, force_stop=True)
+
+    def _launch(self, ready_timeout, force_stop):
+        start = time.monotonic()
+        result = self.adb.shell(f"am start {'-S ' if force_stop else ''}-W -n {CAMERA_APP_ACTIVITY}")
+        self.ui.invalidate()
+        launch = parse_am_start(result.output)
+        if launch.get("Status") != "ok":
+            logger.warning(f"am start 状态异常: {result.output}")
+        if self.ui.wait(timeout=ready_timeout, resourceId=pic_vid_button):
+            launch["ready_ms"] = round((time.monotonic() - start) * 1000, 1)
+            # 冷启动后模式、倍率回到默认；热启动只在已处于基线时进行
+            self._dirty = set()
+        else:
+            logger.warning(f"{ready_timeout}s 内未等到快门按钮")
+            self._dirty = None
+        self.last_launch = launch
+        logger.debug(f"相机应用已启动: {launch}")
+        return launch
+
+    def _mark(self, item, dirty=True):
+        """记录偏离/回到基线的状态项（状态未知时保持未知）"""
+        if self._dirty is not None:
+            if dirty:
+                self._dirty.add(item)
+            else:
+                self._dirty.discard(item)
+
+
+    @trace.traced("take_picture")
+    def take_picture(self, loops, adaptive=True):
+        """
+        拍照
+        :param adaptive: True 时每次点击后轮询相册目录，照片落盘即进入下一张；False 时固定等待 WAIT 秒
+        :return: 已落盘的新照片远端路径（adaptive=False 时为空）
+        """
         logger.info("正在拍照...")
+        landed = []
+        if adaptive:
+            self.capture_waiter.snapshot(("jpg",))
         for i in range(loops):
             logger.info(f"......loop {i+1}......")
             self.device(resourceId=pic_vid_button).click()
-            time.sleep(WAIT)
+            if adaptive:
+                landed.extend(self._wait_capture("jpg"))
+            else:
+                trace.sleep(WAIT)
+        self.ui.invalidate()
         logger.debug("拍照完成")
+        return landed
+
+    @trace.traced("burst_shots")
+    def burst_shots(self, loops, interval=None, adaptive=False, method="input"):
+        """
+        快速连拍：快门坐标只解析一次，之后按坐标直接注入点击，每张记录主机端时间戳
+        :param interval: 相邻两次点击的发送间隔（秒，从上一次发送时刻算起，不含点击本身耗时）；None 表示一次性批量注入
+        :param adaptive: True 时每张等待照片落盘后再拍下一张（忽略 interval）
+        :param method: "input" 通过常驻 adb shell 执行 input tap；"u2" 通过 uiautomator2 按坐标点击
+        :return: 每张的时间戳记录 [{"shot", "sent", "acked", "landed"}]，同时保存在 self.shot_timestamps
+        """
+        x, y = self.shutter_point()
+        logger.info(f"连拍 {loops} 张, 快门坐标 ({x}, {y}), interval={interval}, adaptive={adaptive}")
+
+        def tap():
+            if method == "u2":
+                self.device.click(x, y)
+            else:
+                self.adb.shell(f"input tap {x} {y}")
+
+        records = []
+        if adaptive:
+            self.capture_waiter.snapshot(("jpg",))
+
+        if interval is None and not adaptive and method == "input":
+            # 批量注入：所有点击一次写入常驻 shell，逐条记录完成时间
+            sent = time.time()
+            for i, _ in enumerate(self.adb.iter_shell([f"input tap {x} {y}"] * loops)):
+                records.append({"shot": i + 1, "sent": sent, "acked": time.time(), "landed": None})
+        else:
+            next_at = time.time()
+            for i in range(loops):
+                if interval and not adaptive:
+                    delay = next_at - time.time()
+                    if delay > 0:
+                        trace.sleep(delay)
+                record = {"shot": i + 1, "sent": time.time()}
+                next_at = record["sent"] + (interval or 0)
+                tap()
+                record["acked"] = time.time()
+                record["landed"] = time.time() if adaptive and self._wait_capture("jpg") else None
+                records.append(record)
+
+        self.ui.invalidate()
+        self.shot_timestamps = records
+        self.last_burst_stats = self.shot_latency_stats(records)
+        logger.info(f"连拍完成: {self.last_burst_stats}")
+        return records
+
+    def shutter_point(self):
+        """快门按钮中心坐标，按坐标注入点击时使用"""
+        bounds = self.ui.bounds(resourceId=pic_vid_button)
+        if bounds is None:
+            logger.error("未找到快门按钮")
+            raise RuntimeError("未找到快门按钮")
+        return (bounds[0] + bounds[2]) // 2, (bounds[1] + bounds[3]) // 2
+
+    @staticmethod
+    def shot_latency_stats(records):
+        """
+        根据连拍时间戳计算拍摄间隔（相邻两张 acked 之差）
+        :return: {"shots", "mean", "min", "max", "median"}，单位秒
+        """
+        acked = [r["acked"] for r in records]
+        gaps = [b - a for a, b in zip(acked, acked[1:])]
+        if not gaps:
+            return {"shots": len(records)}
+        return {
+            "shots": len(records),
+            "mean": round(statistics.fmean(gaps), 4),
+            "min": round(min(gaps), 4),
+            "max": round(max(gaps), 4),
+            "median": round(statistics.median(gaps), 4)
+        }
+
+    def _wait_capture(self, extension):
+        """等待一个新文件落盘，超时只记录告警，由后续校验发现缺失"""
+        try:
+            return self.capture_waiter.wait_for_new(1, (extension,), timeout=CAPTURE_TIMEOUT)
+        except TimeoutError as e:
+            logger.warning(e)
+            return []
 
 
+    @trace.traced("back_to_home")
     def back_to_home(self):
         """返回主屏幕"""
         logger.info("返回主屏幕")
         self.device.press("home")
-        time.sleep(WAIT)
+        self.ui.invalidate()
+        trace.sleep(WAIT)
 
 
+    @trace.traced("start_recording")
     def start_recording(self):
         """开始录像"""
         logger.info("开始录像...")
-        if self.device(resourceId=pic_vid_button).exists:
-            self.device(resourceId=pic_vid_button).click()
+        self._mark("recording")
+        if self.ui.exists(resourceId=pic_vid_button):
+            self.capture_waiter.snapshot(("mp4",))
+            self.ui.click(resourceId=pic_vid_button)
         else:
             logger.error("未找到录像开始按钮")
             raise RuntimeError("未找到录像开始按钮")
 
 
+    @trace.traced("stop_recording")
     def stop_recording(self):
         """停止录像"""
         logger.info("停止录像...")
-        if self.device(resourceId=pic_vid_button).exists:
-            self.device(resourceId=pic_vid_button).click()
+        if self.ui.exists(resourceId=pic_vid_button):
+            self.ui.click(resourceId=pic_vid_button)
+            self._wait_capture("mp4")
+            self._mark("recording", False)
         else:
             logger.error("未找到录像停止按钮")
             raise RuntimeError("未找到录像停止按钮")
 
 
+    @trace.traced("switch_video_mode")
     def switch_video_mode(self):
         """切换视频模式"""
         logger.info("切换视频模式")
-        if self.device(text="录像").exists:
-            self.device(text="录像").click()
+        self._mark("mode")
+        if self.ui.exists(text="录像"):
+            self.ui.click(text="录像")
         else:
             logger.error("未找到视频按钮")
             raise RuntimeError("未找到视频按钮")
-        time.sleep(5)
+        trace.sleep(5)
 
 
+    @trace.traced("switch_camera_mode")
     def switch_camera_mode(self):
         """切换拍照模式"""
         logger.info("切换拍照模式")
-        if self.device(text="拍照").exists:
-            self.device(text="拍照").click()
+        if self.ui.exists(text="拍照"):
+            self.ui.click(text="拍照")
+            self._mark("mode", False)
         else:
             logger.error("未找到拍照按钮")
             raise RuntimeError("未找到拍照按钮")
-        time.sleep(5)
+        trace.sleep(5)
 
 
+    @trace.traced("switch_protrait_mode")
     def switch_protrait_mode(self):
         """切换人像模式"""
         logger.info("切换人像模式")
-        if self.device(text="人像").exists:
-            self.device(text="人像").click()
-            time.sleep(WAIT)
+        self._mark("mode")
+        if self.ui.exists(text="人像"):
+            self.ui.click(text="人像")
+            trace.sleep(WAIT)
         else:
             logger.error("未找到人像按钮")
             raise RuntimeError("未找到人像按钮")
-        time.sleep(5)
+        trace.sleep(5)
 
 
+    @trace.traced("switch_more_mode")
     def switch_more_mode(self):
         """切换到功能菜单"""
         logger.info("切换到功能菜单")
-        if self.device(resourceId=more_mode_button).exists:
-            self.device(resourceId=more_mode_button).click()
-            time.sleep(WAIT)
+        self._mark("menu")
+        if self.ui.exists(resourceId=more_mode_button):
+            self.ui.click(resourceId=more_mode_button)
+            trace.sleep(WAIT)
         else:
             logger.error("未找到功能菜单按钮")
             raise RuntimeError("未找到功能菜单按钮")
-        time.sleep(3)
+        trace.sleep(3)
 
 
+    @trace.traced("set_live_photo")
     def set_live_photo(self, enable=None):
         """
         控制动态照片Live Photo开关
         """
-        btn_off = self.device(description="动态照片，关闭状态")
-        btn_on = self.device(description="动态照片，开启状态")
+        btn_off = {"description": "动态照片，关闭状态"}
+        btn_on = {"description": "动态照片，开启状态"}
 
         # --- 读取当前状态 ---
-        if btn_off.exists:
+        if self.ui.exists(**btn_off):
             current_state = False
-        elif btn_on.exists:
+        elif self.ui.exists(**btn_on):
             current_state = True
         else:
             logger.error("未找到动态照片按钮")
@@ -160,25 +359,26 @@ class UIAutomatorHelper:
         # --- live photo auto ---
         if enable is None:
             logger.info("自动切换 Live Photo 状态")
-            (btn_off if btn_off.exists else btn_on).click()
-            time.sleep(WAIT)
+            self.ui.click(**(btn_on if current_state else btn_off))
+            trace.sleep(WAIT)
             return
 
         # --- live photo on ---
         if enable and not current_state:
             logger.info("开启 Live Photo")
-            btn_off.click()
-            time.sleep(WAIT)
+            self.ui.click(**btn_off)
+            trace.sleep(WAIT)
             return
 
         # --- live photo off ---
         if not enable and current_state:
             logger.info("关闭 Live Photo")
-            btn_on.click()
-            time.sleep(WAIT)
+            self.ui.click(**btn_on)
+            trace.sleep(WAIT)
             return
 
 
+    @trace.traced("set_zoom")
     def set_zoom(self, zoom_level):
         """
         切换zoom倍率
@@ -191,23 +391,26 @@ class UIAutomatorHelper:
         target_desc = f"{zoom_str}倍变焦"
 
         logger.info(f"切换到Zoom: {target_desc}")
+        self._mark("zoom")
 
-        node = self.device(description=target_desc)
-
-        if node.exists:
-            node.click()
-            time.sleep(1)
+        if self.ui.exists(description=target_desc):
+            self.ui.click(description=target_desc)
+            trace.sleep(1)
+            self._mark("zoom", zoom_str != "1.0")
             return True
         else:
-            time.sleep(1)
-            if node.exists:
-                node.click()
+            trace.sleep(1)
+            self.ui.invalidate()
+            if self.ui.exists(description=target_desc):
+                self.ui.click(description=target_desc)
                 logger.info(f"Zoom 设置成功(第2次): {target_desc}")
+                self._mark("zoom", zoom_str != "1.0")
                 return True
 
             logger.error(f"未找到 Zoom UI 元素：{target_desc}")
             raise RuntimeError(f"找不到 zoom UI:{target_desc}")
         
+    @trace.traced("set_ratio")
     def set_ratio(self, ratio: str = "3:4"):
         """
         切换画幅
@@ -230,36 +433,65 @@ class UIAutomatorHelper:
         self.switch_more_mode()
 
         # 2. 点击“画幅”按钮
-        if not self.device(text="画幅").exists:
+        if not self.ui.exists(text="画幅"):
             logger.error("未找到画幅入口 UI 元素")
             raise RuntimeError("未找到画幅入口")
-        self.device(text="画幅").click()
-        time.sleep(WAIT)
+        self.ui.click(text="画幅")
+        trace.sleep(WAIT)
 
         # 3. 点击对应画幅
         logger.info(f"点击画幅选项: {target_desc}")
-        el = self.device(description=target_desc)
-        if not el.exists:
+        if not self.ui.exists(description=target_desc):
             logger.error(f"未找到 UI 元素: {target_desc}")
             raise RuntimeError(f"画幅选项不存在: {target_desc}")
 
-        el.click()
-        time.sleep(WAIT)
+        self.ui.click(description=target_desc)
+        trace.sleep(WAIT)
+        # 选中画幅后菜单收起；画幅本身是持久设置，冷启动也不会复位，不算偏离基线
+        self._mark("menu", False)
         logger.info(f"画幅切换成功: {ratio}")
 
 
+    @trace.traced("pull_all_photo")
     def pull_all_photo(self):
-        """拉取所有照片"""
-        time.sleep(10)
+        """拉取所有照片（已拉取且未变化的文件不会重复传输）"""
+        self._wait_settled("jpg")
         logger.info("拉取所有照片...")
-        path = self.adb.pull_all_file(DATA_PATH, "jpg", OUTPUT_PATH)
+        self._sync_media("jpg")
+        path = self.media_sync.local_files("jpg")
         logger.debug(f"照片已保存到: {path}")
         return path
 
+    @trace.traced("pull_all_video")
     def pull_all_video(self):
-        """拉取所有视频"""
-        time.sleep(10)
+        """拉取所有视频（已拉取且未变化的文件不会重复传输）"""
+        self._wait_settled("mp4")
         logger.info("拉取所有视频...")
-        path = self.adb.pull_all_file(DATA_PATH, "mp4", OUTPUT_PATH)
+        self._sync_media("mp4")
+        path = self.media_sync.local_files("mp4")
         logger.debug(f"视频已保存到: {path}")
-        return path
\ No newline at end of file
+        return path
+
+    @trace.traced("pull_new_photo")
+    def pull_new_photo(self):
+        """只拉取上次同步之后新增的照片，返回新增的本地文件"""
+        return self._sync_media("jpg")
+
+    @trace.traced("pull_new_video")
+    def pull_new_video(self):
+        """只拉取上次同步之后新增的视频，返回新增的本地文件"""
+        return self._sync_media("mp4")
+
+    def _wait_settled(self, extension):
+        """拉取前等待目录中文件大小稳定，最多 SETTLE_TIMEOUT 秒"""
+        try:
+            self.capture_waiter.wait_stable((extension,), timeout=SETTLE_TIMEOUT)
+        except TimeoutError as e:
+            logger.warning(e)
+
+    def _sync_media(self, extension):
+        delta = self.media_sync.sync(extension)
+        if not delta and not self.media_sync.captured(extension):
+            raise FileNotFoundError(f"未找到 {DATA_PATH} 下的 {extension} 文件")
+        logger.info(f"新增 {len(delta)} 个 {extension} 文件")
+        return delta